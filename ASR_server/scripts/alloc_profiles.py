@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Force allocation profiling for a task and inspect stored profiles.
+
+Usage:
+    python scripts/alloc_profiles.py force <task_id>      # profile the task when a worker runs it
+    python scripts/alloc_profiles.py list                 # most recent profiles
+    python scripts/alloc_profiles.py list --count 5 --top 3
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.profiling import force_profile, recent_profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Allocation profiling control")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    force = sub.add_parser("force", help="Profile a specific task ID")
+    force.add_argument("task_id")
+    force.add_argument("--ttl", type=int, default=86400, help="Seconds the flag stays armed")
+
+    listing = sub.add_parser("list", help="Show recent profiles")
+    listing.add_argument("--count", type=int, default=10)
+    listing.add_argument("--top", type=int, default=5, help="Allocation sites shown per profile")
+    args = parser.parse_args()
+
+    if args.command == "force":
+        force_profile(args.task_id, ttl=args.ttl)
+        print(f"✅ Task {args.task_id} will be profiled when a worker picks it up")
+        return
+
+    profiles = recent_profiles(args.count)
+    if not profiles:
+        print("No profiles stored")
+        return
+    for p in profiles:
+        print(
+            f"📊 {p['task_id']} [{p['kind']}, {p['reason']}] duration={p['duration_s']}s "
+            f"peak={p['peak_mb']}MB current={p['current_mb']}MB rss_delta={p['rss_delta_mb']}MB"
+        )
+        for site in p["top"][:args.top]:
+            print(f"     {site['size_kb']:>10.1f} KB {site['count']:>8} blocks  {site['site']}")
+
+
+if __name__ == "__main__":
+    main()
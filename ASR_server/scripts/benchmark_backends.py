@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compare inference backends (torch vs onnx / onnx int8) on the same audio.
+
+Each backend runs in a fresh subprocess so RSS numbers are not polluted by
+the other backend's weights. Reports load time, RTF and RSS.
+
+Usage:
+    python scripts/benchmark_backends.py path/to/audio.wav --runs 5
+    python scripts/benchmark_backends.py audio.wav --backends torch onnx-int8 --threads 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+# backend label -> environment overrides
+BACKENDS = {
+    "torch": {"ASR_BACKEND": "torch"},
+    "onnx": {"ASR_BACKEND": "onnx", "ASR_ONNX_QUANTIZE": "false"},
+    "onnx-int8": {"ASR_BACKEND": "onnx", "ASR_ONNX_QUANTIZE": "true"},
+}
+
+
+def run_child(audio_path: str, runs: int) -> dict:
+    """Measure one backend inside this process (selected via env)."""
+    import psutil
+
+    proc = psutil.Process()
+    rss_start = proc.memory_info().rss / 1024 / 1024
+
+    t0 = time.perf_counter()
+    from src.asr.recognizer import SpeechRecognizer
+    recognizer = SpeechRecognizer()
+    load_time = time.perf_counter() - t0
+    rss_loaded = proc.memory_info().rss / 1024 / 1024
+
+    # Warm-up (first call pays lazy init / graph optimization)
+    result = recognizer.recognize(audio_path)
+    duration = result.get("duration", 0.0)
+
+    rss_peak = rss_loaded
+    timings = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        result = recognizer.recognize(audio_path)
+        timings.append(time.perf_counter() - t)
+        rss_peak = max(rss_peak, proc.memory_info().rss / 1024 / 1024)
+
+    avg = sum(timings) / len(timings)
+    return {
+        "load_time_s": round(load_time, 2),
+        "audio_s": round(duration, 2),
+        "avg_time_s": round(avg, 3),
+        "rtf": round(avg / duration, 4) if duration > 0 else None,
+        "rss_start_mb": round(rss_start, 1),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "rss_peak_mb": round(rss_peak, 1),
+        "text": result.get("text", "")[:60],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ASR inference backends")
+    parser.add_argument("audio", help="Audio file used for every backend")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per backend")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--threads", type=int, default=4, help="onnxruntime intra-op threads")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.audio, args.runs)))
+        return
+
+    results = {}
+    for name in args.backends:
+        print(f"⏱️  Benchmarking {name} ...")
+        env = dict(os.environ, ASR_USE_GPU="false", ASR_ONNX_INTRA_OP_THREADS=str(args.threads))
+        env.update(BACKENDS[name])
+        proc = subprocess.run(
+            [sys.executable, __file__, args.audio, "--runs", str(args.runs), "--child"],
+            env=env, capture_output=True, text=True
+        )
+        # The last stdout line is the JSON report; model loading prints before it
+        lines = [l for l in proc.stdout.strip().splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"❌ {name} failed:\n{proc.stderr[-2000:]}")
+            continue
+        results[name] = json.loads(lines[-1])
+
+    print()
+    print(f"{'backend':<10} {'load(s)':>8} {'avg(s)':>8} {'RTF':>8} {'RSS loaded':>11} {'RSS peak':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['load_time_s']:>8} {r['avg_time_s']:>8} {str(r['rtf']):>8} "
+            f"{r['rss_loaded_mb']:>9}MB {r['rss_peak_mb']:>7}MB"
+        )
+    for name, r in results.items():
+        print(f"  {name}: {r['text']}")
+
+
+if __name__ == "__main__":
+    main()
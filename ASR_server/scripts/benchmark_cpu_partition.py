@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Find the best workers x threads split of a CPU budget for a reference clip.
+
+For every split, N pinned worker processes (each with budget/N threads)
+recognize the clip concurrently; aggregate throughput is audio seconds
+recognized per wall-clock second. Use the winner as WORKER_COUNT with
+CPU_PARTITION=1.
+
+Usage:
+    python scripts/benchmark_cpu_partition.py ref.wav
+    python scripts/benchmark_cpu_partition.py ref.wav --budget 0-15 --runs 10 --numa
+    python scripts/benchmark_cpu_partition.py ref.wav --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.utils.cpu import available_cores, format_cpulist, numa_nodes, parse_cpulist, partition_cores
+
+
+def run_child(audio_path: str, cores: str, runs: int, start_at: float) -> dict:
+    """One pinned worker: load, wait for the common start, then recognize `runs` times."""
+    from src.utils.cpu import apply_cpu_partition
+    threads = apply_cpu_partition(parse_cpulist(cores))
+
+    from src.asr.recognizer import SpeechRecognizer
+    recognizer = SpeechRecognizer()
+    duration = recognizer.recognize(audio_path).get("duration", 0.0)  # warm-up
+
+    # Line up with the other workers so they really run concurrently
+    time.sleep(max(0.0, start_at - time.time()))
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        recognizer.recognize(audio_path)
+    elapsed = time.perf_counter() - t0
+    return {"threads": threads, "audio_s": duration * runs, "elapsed_s": elapsed}
+
+
+def measure(audio_path: str, partition, runs: int, load_timeout: float) -> dict:
+    start_at = time.time() + load_timeout
+    procs = [
+        subprocess.Popen(
+            [sys.executable, __file__, audio_path, "--child", format_cpulist(cores),
+             "--runs", str(runs), "--start-at", str(start_at)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            env=dict(os.environ, ASR_USE_GPU="false"),
+        )
+        for cores in partition
+    ]
+    reports = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        lines = [l for l in out.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            raise RuntimeError("worker process failed")
+        reports.append(json.loads(lines[-1]))
+
+    wall = max(r["elapsed_s"] for r in reports)
+    audio = sum(r["audio_s"] for r in reports)
+    per_call = sum(r["elapsed_s"] for r in reports) / (len(reports) * runs)
+    return {"throughput": audio / wall if wall else 0.0, "latency_s": per_call}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workers x threads splits of a CPU budget")
+    parser.add_argument("audio", help="Reference clip")
+    parser.add_argument("--budget", default="", help="cpulist to split (default: all available cores)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Worker counts to try (default: divisors of the budget)")
+    parser.add_argument("--runs", type=int, default=5, help="Recognitions per worker")
+    parser.add_argument("--numa", action="store_true", help="NUMA-aware partitions")
+    parser.add_argument("--load-timeout", type=float, default=60, help="Seconds allowed for model loading")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_child(args.audio, args.child, args.runs, args.start_at)))
+        return
+
+    cores = parse_cpulist(args.budget) if args.budget else available_cores()
+    counts = args.workers or [n for n in range(1, len(cores) + 1) if len(cores) % n == 0]
+    nodes = numa_nodes() if args.numa else None
+
+    print(f"⏱️  Budget {format_cpulist(cores)} ({len(cores)} cores), splits: {counts}")
+    results = {}
+    for n in counts:
+        partition = partition_cores(cores, n, nodes)
+        label = f"{n}x{len(partition[0])}"
+        print(f"   {label} ...", flush=True)
+        try:
+            results[label] = measure(args.audio, partition, args.runs, args.load_timeout)
+        except RuntimeError as e:
+            print(f"❌ {label} failed: {e}")
+
+    if not results:
+        return
+    print()
+    print(f"{'workers x threads':>18} {'audio s / s':>12} {'latency(s)':>11}")
+    for label, r in results.items():
+        print(f"{label:>18} {r['throughput']:>12.2f} {r['latency_s']:>11.3f}")
+    best = max(results, key=lambda k: results[k]["throughput"])
+    workers = best.split("x")[0]
+    print(f"\n🏆 Best throughput: {best} -> WORKER_COUNT={workers} CPU_PARTITION=1")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Measure how hotword list size affects per-call latency.
+
+For each list size the same audio is recognized with the hotword list
+recompiled on every call (FunASR's default) and with the compiled cache.
+
+Usage:
+    python scripts/benchmark_hotwords.py path/to/audio.wav --runs 5
+    python scripts/benchmark_hotwords.py audio.wav --sizes 0 100 500 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def timed(recognizer, audio_path: str, runs: int) -> float:
+    recognizer.recognize(audio_path)  # warm-up / compile
+    start = time.perf_counter()
+    for _ in range(runs):
+        recognizer.recognize(audio_path)
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hotword list size vs latency")
+    parser.add_argument("audio", help="Audio file to recognize")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per configuration")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 100, 500, 1000, 3000])
+    args = parser.parse_args()
+
+    from src.asr.config import config
+    from src.asr.hotwords import load_hotwords_file
+    from src.asr.recognizer import SpeechRecognizer
+
+    config.hotwords_reload_interval_s = 0
+    recognizer = SpeechRecognizer()
+    inner = recognizer.model.model
+    compiled = (inner.generate_hotwords_list, inner._hotword_representation)
+    # The class attributes are the uncached originals
+    uncached = (
+        type(inner).generate_hotwords_list.__get__(inner),
+        type(inner)._hotword_representation.__get__(inner),
+    )
+
+    words = load_hotwords_file(config.hotwords_path).split()
+    while words and len(words) < max(args.sizes):
+        words = words + words
+
+    print(f"{'hotwords':>9} {'uncached(s)':>12} {'compiled(s)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        recognizer.hotwords = " ".join(words[:size])
+        recognizer.hotword_store.text = recognizer.hotwords
+
+        inner.generate_hotwords_list, inner._hotword_representation = uncached
+        slow = timed(recognizer, args.audio, args.runs)
+        inner.generate_hotwords_list, inner._hotword_representation = compiled
+        fast = timed(recognizer, args.audio, args.runs)
+
+        print(f"{size:>9} {slow:>12.3f} {fast:>12.3f} {slow / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare the silence prefilter with fsmn-vad on real recordings.
+
+The audio is cut into stream-sized chunks. Each chunk is classified by
+fsmn-vad (speech if it finds any segment at least --min-speech-ms long) and
+by the energy prefilter at several thresholds. "missed" counts chunks the
+prefilter would skip although VAD found speech: that text would be lost, so
+pick the highest threshold where it stays at zero.
+
+Usage:
+    python scripts/benchmark_silence.py recording1.wav recording2.mp3
+    python scripts/benchmark_silence.py audio.wav --chunk-s 0.6 --thresholds -60 -50 -40
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def chunks(samples, sample_rate: int, chunk_s: float):
+    size = int(sample_rate * chunk_s)
+    for start in range(0, len(samples) - size + 1, size):
+        yield samples[start:start + size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the silence prefilter against fsmn-vad")
+    parser.add_argument("audio", nargs="+", help="Audio files (any accepted upload format)")
+    parser.add_argument("--chunk-s", type=float, default=1.0, help="Chunk length in seconds")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[-60, -55, -50, -45, -40, -35])
+    parser.add_argument("--min-speech-ms", type=float, default=None,
+                        help="Speech needed to pass (default: ASR_SILENCE_MIN_SPEECH_MS)")
+    args = parser.parse_args()
+
+    import numpy as np
+
+    from src.asr.audio import TARGET_SAMPLE_RATE
+    from src.asr.config import config
+    from src.asr.decoding import decode_to_pcm
+    from src.asr.recognizer import SpeechRecognizer
+    from src.asr.silence import is_silent
+
+    min_speech_ms = config.silence_min_speech_ms if args.min_speech_ms is None else args.min_speech_ms
+    recognizer = SpeechRecognizer()
+
+    clips = []
+    for path in args.audio:
+        clips.extend(chunks(decode_to_pcm(path), TARGET_SAMPLE_RATE, args.chunk_s))
+    if not clips:
+        print("❌ No audio long enough for one chunk")
+        return
+
+    start = time.perf_counter()
+    vad_speech = []
+    for clip in clips:
+        segments = recognizer.detect_segments(np.asarray(clip))
+        vad_speech.append(any(end - beg >= min_speech_ms for beg, end in segments))
+    vad_ms = (time.perf_counter() - start) * 1000 / len(clips)
+
+    print(f"{len(clips)} chunks of {args.chunk_s}s, fsmn-vad speech in {sum(vad_speech)} "
+          f"({vad_ms:.2f} ms/chunk)")
+    print(f"{'threshold':>10} {'skipped':>8} {'agree':>7} {'missed':>7} {'ms/chunk':>9}")
+    for threshold in args.thresholds:
+        start = time.perf_counter()
+        silent = [is_silent(clip, TARGET_SAMPLE_RATE, threshold, min_speech_ms) for clip in clips]
+        prefilter_ms = (time.perf_counter() - start) * 1000 / len(clips)
+        agree = sum(s != v for s, v in zip(silent, vad_speech))
+        missed = sum(s and v for s, v in zip(silent, vad_speech))
+        print(f"{threshold:>10.1f} {sum(silent):>8} {agree / len(clips):>7.1%} {missed:>7} {prefilter_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
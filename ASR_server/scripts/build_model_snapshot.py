@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+构建预加载模型快照 (ASR_MODEL_SNAPSHOT)
+
+按当前配置 (ASR_MODEL_NAME / ASR_VAD_MODEL / ASR_PUNC_MODEL / ASR_MODEL_HUB)
+在 CPU 上组装完整管线, 保存为 torch 快照, 并重新加载一次进行校验.
+worker 启动时以 mmap 方式加载权重, 无需重新构建模型.
+
+升级 funasr / torch 或更换模型后需重新构建.
+
+Usage:
+    python scripts/build_model_snapshot.py models/snapshot
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from funasr import AutoModel  # noqa: E402
+
+from src.asr.config import config  # noqa: E402
+from src.asr.model_loader import resolve_all  # noqa: E402
+from src.asr.snapshot import PIPELINE_FILE, load_snapshot, mismatch, read_manifest, write_snapshot  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build a pre-built model pipeline snapshot")
+    parser.add_argument("directory", help="Snapshot directory (point ASR_MODEL_SNAPSHOT here)")
+    args = parser.parse_args()
+
+    models = {"asr": config.model_name, "vad": config.vad_model, "punc": config.punc_model}
+    hubs = [config.model_hub] if config.model_hub in ("ms", "hf") else ["ms", "hf"]
+    hub, local = resolve_all(models.values(), hubs)
+    if hub is None:
+        hub = "hf" if config.model_hub == "hf" else "ms"
+        print(f"⚠️  模型未全部在本地缓存中, 将从 {hub} 下载")
+
+    print(f"🔄 在 CPU 上构建管线: {models}")
+    start = time.perf_counter()
+    pipeline = AutoModel(
+        model=local.get(config.model_name, config.model_name),
+        vad_model=local.get(config.vad_model, config.vad_model),
+        punc_model=local.get(config.punc_model, config.punc_model),
+        vad_kwargs={"device": "cpu", "hub": hub},
+        punc_kwargs={"device": "cpu", "hub": hub},
+        device="cpu",
+        hub=hub,
+        disable_update=True,
+    )
+    print(f"✅ 构建耗时 {time.perf_counter() - start:.2f}s")
+
+    manifest = write_snapshot(pipeline, args.directory, models, hub)
+    print(f"💾 快照已写入 {Path(args.directory) / PIPELINE_FILE} ({manifest['bytes'] / 1024 / 1024:.0f} MB)")
+
+    # 校验: 重新加载快照
+    start = time.perf_counter()
+    load_snapshot(args.directory)
+    reason = mismatch(read_manifest(args.directory), models)
+    if reason:
+        print(f"❌ 快照校验失败: {reason}")
+        return 1
+    print(f"✅ 快照加载耗时 {time.perf_counter() - start:.2f}s")
+    print(f"\n🎉 完成! 设置 ASR_MODEL_SNAPSHOT={args.directory} 以启用")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
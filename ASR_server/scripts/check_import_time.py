@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the API process.
+
+Imports a module in a fresh interpreter with ``python -X importtime`` and
+fails (exit code 1) when it takes longer than the budget or pulls in a
+module that only workers need (torch, funasr, numpy, ...).
+
+Usage:
+    python scripts/check_import_time.py                      # src.api.main, 1500 ms
+    python scripts/check_import_time.py --budget-ms 800 --top 20
+    python scripts/check_import_time.py --module src.worker.unified_worker --allow-heavy
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# Worker-only dependencies the API must not import
+HEAVY_MODULES = ("torch", "torchaudio", "funasr", "modelscope", "onnxruntime", "numpy", "soundfile")
+
+
+def measure(module: str) -> List[Tuple[int, int, str]]:
+    """(cumulative us, nesting depth, module) for every import, from -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), len(name) - len(name.lstrip()), name.strip()))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check a module's import time against a budget")
+    parser.add_argument("--module", default="src.api.main")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--allow-heavy", action="store_true", help="Don't fail on worker-only modules")
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    total_ms = next((us for us, _, name in rows if name == args.module), 0) / 1000
+    heavy = sorted({name.split(".")[0] for _, _, name in rows} & set(HEAVY_MODULES))
+
+    print(f"{args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms), {len(rows)} modules")
+    for us, depth, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"  {us / 1000:>8.1f} ms  {' ' * (depth - 1)}{name}")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"❌ Over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if heavy and not args.allow_heavy:
+        print(f"❌ Imports worker-only modules: {', '.join(heavy)}")
+        failed = True
+    if not failed:
+        print("✅ Within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,6 +47,10 @@ if [ -z "$WORKER_COUNT" ]; then
     fi
 fi
 STREAM_NAME="${STREAM_NAME:-asr_tasks}"
+# CPU_PARTITION=1 pins each worker to its own slice of CPU_BUDGET (default: all
+# cores) and sizes torch/onnxruntime threads to match; CPU_NUMA=1 keeps slices
+# within one NUMA node
+CPU_PARTITION="${CPU_PARTITION:-0}"
 GROUP_NAME="${CONSUMER_GROUP:-asr_workers}"
 PYTHON="${PYTHON:-python3}"
 
@@ -55,6 +59,9 @@ echo "================================"
 echo "📡 Stream: $STREAM_NAME"
 echo "👥 Group: $GROUP_NAME"
 echo "🔢 Workers: $WORKER_COUNT"
+if [ "$CPU_PARTITION" = "1" ]; then
+    echo "🧩 CPU partitioning: budget=${CPU_BUDGET:-all} numa=${CPU_NUMA:-0}"
+fi
 echo ""
 
 # P1 Fix: Ensure Redis Persistence (AOF) is enabled
@@ -164,17 +171,42 @@ cleanup() {
 trap cleanup SIGINT SIGTERM EXIT
 
 # Start workers
+# WORKER_MODE=prefork loads the models once and forks children that share
+# the weights copy-on-write (CPU only); default starts independent processes
+WORKER_MODE="${WORKER_MODE:-process}"
 echo ""
-echo "🚀 Starting $WORKER_COUNT Unified Workers..."
-for i in $(seq 1 $WORKER_COUNT); do
-    WORKER_NAME="worker-$i"
-    echo "   Starting $WORKER_NAME..."
-    $PYTHON src/worker/unified_worker.py \
-        --name "$WORKER_NAME" \
+if [ "$WORKER_MODE" = "prefork" ]; then
+    if [ "$HAS_GPU" = true ] && [ "${ASR_USE_GPU:-true}" != "false" ]; then
+        echo "❌ Error: WORKER_MODE=prefork requires ASR_USE_GPU=false (CUDA cannot be forked)."
+        exit 1
+    fi
+    echo "🚀 Starting pre-fork supervisor with $WORKER_COUNT children..."
+    PARTITION_ARGS=""
+    if [ "$CPU_PARTITION" = "1" ]; then
+        PARTITION_ARGS="--partition-cores"
+    fi
+    $PYTHON src/worker/supervisor.py \
+        --workers "$WORKER_COUNT" $PARTITION_ARGS \
+        --name "worker" \
         --stream "$STREAM_NAME" \
         --group "$GROUP_NAME" &
-    sleep 0.5  # Stagger startup slightly
-done
+    echo "📊 Child status: $PYTHON src/worker/supervisor.py --status"
+else
+    echo "🚀 Starting $WORKER_COUNT Unified Workers..."
+    for i in $(seq 1 $WORKER_COUNT); do
+        WORKER_NAME="worker-$i"
+        echo "   Starting $WORKER_NAME..."
+        PARTITION_ARGS=""
+        if [ "$CPU_PARTITION" = "1" ]; then
+            PARTITION_ARGS="--cpu-index $((i - 1)) --cpu-workers $WORKER_COUNT"
+        fi
+        $PYTHON src/worker/unified_worker.py \
+            --name "$WORKER_NAME" $PARTITION_ARGS \
+            --stream "$STREAM_NAME" \
+            --group "$GROUP_NAME" &
+        sleep 0.5  # Stagger startup slightly
+    done
+fi
 
 echo ""
 echo "✅ All workers started"
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Push hotwords to all running workers through Redis (no restart needed).
+
+Workers re-check every ASR_HOTWORDS_RELOAD_INTERVAL_S seconds.
+
+Usage:
+    python scripts/update_hotwords.py my_hotwords.txt   # override with a file
+    python scripts/update_hotwords.py --reset           # back to ASR_HOTWORDS_PATH
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.asr.hotwords import parse_hotwords, publish_hotwords
+from src.utils.redis_client import redis_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update worker hotwords via Redis")
+    parser.add_argument("file", nargs="?", help="Hotwords file (one or more words per line)")
+    parser.add_argument("--reset", action="store_true", help="Drop the override and use the configured file")
+    args = parser.parse_args()
+
+    if args.reset:
+        version = publish_hotwords(redis_client.client, None)
+        print(f"✅ Hotword override removed (version {version})")
+        return
+    if not args.file:
+        parser.error("a hotwords file or --reset is required")
+
+    text = Path(args.file).read_text(encoding="utf-8")
+    version = publish_hotwords(redis_client.client, text)
+    print(f"✅ Published {len(parse_hotwords(text).split())} hotwords (version {version})")
+
+
+if __name__ == "__main__":
+    main()
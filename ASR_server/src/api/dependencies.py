@@ -1,8 +1,10 @@
 """Dependency Injection for FastAPI"""
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 from redis import Redis
 from ..utils.redis_client import redis_client
-from ..asr.recognizer import SpeechRecognizer
+
+if TYPE_CHECKING:
+    from ..asr.recognizer import SpeechRecognizer
 
 
 def get_redis() -> Generator[Redis, None, None]:
@@ -10,6 +12,7 @@ def get_redis() -> Generator[Redis, None, None]:
     yield redis_client.client
 
 
-def get_recognizer() -> SpeechRecognizer:
-    """Get speech recognizer (singleton)"""
+def get_recognizer() -> "SpeechRecognizer":
+    """Get speech recognizer (singleton; imports torch/funasr on first use)"""
+    from ..asr.recognizer import SpeechRecognizer
     return SpeechRecognizer()
@@ -1,4 +1,5 @@
 """FastAPI Application Entry Point"""
+import sys
 import uuid
 import time
 from fastapi import FastAPI, Request
@@ -18,7 +19,10 @@ async def lifespan(app: FastAPI):
     
     yield
     
-    # Shutdown
+    # Shutdown (the decoder pool only exists once an upload was pre-decoded)
+    decoding = sys.modules.get(f"{__package__.rpartition('.')[0]}.asr.decoding")
+    if decoding is not None:
+        decoding.decoder_pool.shutdown()
     log_api("🛑 Shutting down ASR Service")
 
 
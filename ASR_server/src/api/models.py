@@ -69,6 +69,49 @@ class StatsResponse(BaseModel):
     storage_used: str  # disk space used
     
 
+class HotwordSetRequest(BaseModel):
+    """Hotword set registration"""
+    hotwords: List[str] = Field(..., description="Hotwords, one entry per word or phrase")
+
+
+class HotwordSetResponse(BaseModel):
+    """Registered hotword set"""
+    set_id: str
+    count: int
+    version: int
+
+
+class StreamTranscriptResponse(BaseModel):
+    """Punctuated transcript of a stream session (deferred punctuation mode)"""
+    session_id: str
+    text: str
+    segments: int
+
+
+class DeadLetter(BaseModel):
+    """Message moved to the dead-letter stream after too many deliveries"""
+    id: str
+    task_type: str
+    task_id: str
+    original_id: str
+    deliveries: int
+    consumer: str
+    dead_at: int  # ms since epoch
+    payload: dict = {}
+
+
+class DeadLetterResponse(BaseModel):
+    """Dead-letter stream contents (newest first)"""
+    total: int
+    entries: List[DeadLetter]
+
+
+class ReplayResponse(BaseModel):
+    """Dead-lettered messages put back on the task stream"""
+    replayed: List[str]  # dead-letter IDs
+    message_ids: List[str]  # new task stream IDs
+
+
 class ErrorResponse(BaseModel):
     """Error response"""
     error: str
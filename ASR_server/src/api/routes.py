@@ -1,26 +1,56 @@
 """API Routes for ASR Service"""
+import hashlib
+import json
 import os
 import uuid
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from redis import Redis
 from rq import Queue, Worker  # Keep for health check during transition
 
 from .models import (
     SubmitResponse, TaskResult, HistoryResponse, HistoryRecord,
-    QueueStatus, HealthResponse, StatsResponse, ErrorResponse
+    QueueStatus, HealthResponse, StatsResponse, ErrorResponse,
+    HotwordSetRequest, HotwordSetResponse, StreamTranscriptResponse,
+    DeadLetter, DeadLetterResponse, ReplayResponse
 )
 from .dependencies import get_redis
-from ..utils.streams import publish_task
+from ..utils.streams import publish_task, streams_client
 from ..utils.file_handler import file_handler
 from ..utils.redis_client import redis_client
+from ..utils.result_cache import build_cache_key, result_cache
 from ..utils.logger import log_api
 from ..asr.config import config
+from ..asr.hotwords import DEFAULT_SET_ID
 
 router = APIRouter(prefix="/api/v1")
 
+# Upload read size; the content hash is updated per chunk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def predecode(audio_path: str, content_hash: str):
+    """Start decoding an upload into the PCM cache (best effort; workers decode on a miss)"""
+    if config.pcm_cache_mb <= 0 or config.decode_workers <= 0:
+        return
+    # Imported on first upload: decoding (numpy) is not needed to serve anything else
+    from ..asr.decoding import decoder_pool
+    try:
+        future = decoder_pool.submit(audio_path, content_hash)
+    except Exception as e:
+        log_api(f"Pre-decode of {audio_path} not started: {e}", level="WARNING")
+        return
+    
+    def report(done):
+        if done.exception() is not None:
+            log_api(f"Pre-decode of {audio_path} failed: {done.exception()}", level="WARNING")
+    
+    future.add_done_callback(report)
+
 
 # ============================================================================
 # 🔴 CRITICAL APIs
@@ -30,7 +60,10 @@ router = APIRouter(prefix="/api/v1")
 async def submit_task(
     audio: UploadFile = File(...),
     language: str = Query("zh", description="Language code"),
-    batch_size: int = Query(500, description="Batch size in seconds"),
+    batch_size: Optional[int] = Query(None, ge=1, le=3600, description="Batch size in seconds"),
+    merge_length_s: Optional[int] = Query(None, ge=1, le=60, description="Max merged VAD segment length in seconds"),
+    hotword_set: Optional[str] = Query(None, description="Registered hotword set ID"),
+    hotwords: Optional[str] = Query(None, description="Inline hotwords, space separated"),
     redis: Redis = Depends(get_redis)
 ):
     """
@@ -38,7 +71,10 @@ async def submit_task(
     
     - **audio**: Audio file (wav, mp3, m4a, flac)
     - **language**: Language code (default: zh)
-    - **batch_size**: Batch size for processing (default: 500s)
+    - **batch_size**: Seconds of audio decoded per batch (default: ASR_BATCH_SIZE, or sized from free memory with ASR_BATCH_MODE=adaptive)
+    - **merge_length_s**: Max length of merged VAD segments (default: ASR_MERGE_LENGTH_S)
+    - **hotword_set**: Hotword set ID registered via PUT /asr/hotwords/{set_id}
+    - **hotwords**: Inline hotwords (override hotword_set)
     """
     # Validate file format
     if not audio.filename:
@@ -52,40 +88,94 @@ async def submit_task(
             detail=f"Invalid file format. Supported: {supported_formats}"
         )
     
+    if hotword_set and hotword_set != DEFAULT_SET_ID and not hotwords:
+        if redis_client.get_hotword_set_version(hotword_set) is None:
+            raise HTTPException(status_code=404, detail=f"Hotword set not found: {hotword_set}")
+    
     # Generate task ID
     task_id = str(uuid.uuid4())[:8]
     
     try:
-        # Save uploaded file
-        content = await audio.read()
-        audio_path, saved_filename = file_handler.save_upload(
-            content, task_id, audio.filename
-        )
-        
-        log_api(f"POST /api/v1/asr/submit task={task_id} file={saved_filename} size={len(content)/1024/1024:.2f}MB")
+        # Read in chunks, hashing as the upload arrives
+        digest = hashlib.sha256()
+        chunks = []
+        while True:
+            chunk = await audio.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            chunks.append(chunk)
+        content = b"".join(chunks)
+        del chunks
+        content_hash = digest.hexdigest()
         
-        # Cleanup old files
-        deleted = file_handler.cleanup_old_files(max_files=config.max_recordings)
-        if deleted:
-            log_api(f"Cleaned up {len(deleted)} old files")
+        cache_key = None
+        if result_cache.enabled:
+            cache_key = build_cache_key(content_hash, language, hotword_set, hotwords,
+                                        batch_size, merge_length_s)
+            cached, leader = result_cache.lookup_or_claim(cache_key, task_id)
+            if cached is not None:
+                log_api(f"POST /api/v1/asr/submit task={task_id} answered from cache")
+                redis_client.save_task_result(task_id, {
+                    **cached,
+                    "task_id": task_id,
+                    "created_at": datetime.now().isoformat(),
+                    "cached": True,
+                })
+                return SubmitResponse(task_id=task_id, status="done", position=0, estimated_wait=0)
+            if leader is not None:
+                log_api(f"POST /api/v1/asr/submit task={task_id} attached to in-flight task={leader}")
+                redis_client.save_task_result(task_id, {
+                    "task_id": task_id,
+                    "status": "queued",
+                    "created_at": "",
+                    "deduplicated_from": leader,
+                })
+                return SubmitResponse(task_id=task_id, status="queued", position=0, estimated_wait=30)
         
-        # Publish to Redis Streams (replaces RQ Queue)
-        publish_task(
-            task_type="batch",
-            task_id=task_id,
-            payload={
-                "audio_path": audio_path,
+        try:
+            # Save uploaded file
+            audio_path, saved_filename = file_handler.save_upload(
+                content, task_id, audio.filename
+            )
+            
+            log_api(f"POST /api/v1/asr/submit task={task_id} file={saved_filename} size={len(content)/1024/1024:.2f}MB")
+            
+            # Decode to canonical PCM while the task waits in the queue
+            predecode(audio_path, content_hash)
+            
+            # Cleanup old files
+            deleted = file_handler.cleanup_old_files(max_files=config.max_recordings)
+            if deleted:
+                log_api(f"Cleaned up {len(deleted)} old files")
+            
+            # Save initial status, and the parameters a retry needs
+            redis_client.save_task_result(task_id, {
+                "task_id": task_id,
+                "status": "queued",
+                "created_at": "",
+            })
+            request = {
                 "language": language,
-                "batch_size": batch_size
+                "batch_size": batch_size,
+                "merge_length_s": merge_length_s,
+                "hotword_set": hotword_set,
+                "hotwords": hotwords,
+                "content_hash": content_hash,
             }
-        )
-        
-        # Save initial status
-        redis_client.save_task_result(task_id, {
-            "task_id": task_id,
-            "status": "queued",
-            "created_at": "",
-        })
+            redis_client.save_task_request(task_id, request)
+            
+            # Publish to Redis Streams (replaces RQ Queue)
+            publish_task(
+                task_type="batch",
+                task_id=task_id,
+                payload={"audio_path": audio_path, **request, "cache_key": cache_key}
+            )
+        except Exception as e:
+            if cache_key:
+                # Don't leave attached duplicates waiting on a job that never ran
+                result_cache.complete(cache_key, task_id, {"status": "failed", "error": str(e)})
+            raise
         
         # Note: position is not easily determined with Streams, use 0
         return SubmitResponse(
@@ -280,11 +370,15 @@ async def retry_task(task_id: str, redis: Redis = Depends(get_redis)):
     if not audio_path or not os.path.exists(audio_path):
         raise HTTPException(status_code=404, detail="Audio file not found")
     
-    # Re-publish to Redis Streams
+    # Re-publish with the original parameters; the worker reuses the cached PCM
+    request = redis_client.get_task_request(task_id) or {"language": "zh"}
+    if not request.get("content_hash"):
+        from ..asr.decoding import file_sha256
+        request["content_hash"] = await run_in_threadpool(file_sha256, audio_path)
     publish_task(
         task_type="batch",
         task_id=task_id,
-        payload={"audio_path": audio_path, "language": "zh"}
+        payload={"audio_path": audio_path, **request}
     )
     
     # Update status
@@ -300,6 +394,138 @@ async def retry_task(task_id: str, redis: Redis = Depends(get_redis)):
     )
 
 
+def _dead_letter(entry: dict) -> DeadLetter:
+    payload = json.loads(entry.get("payload", "{}"))
+    payload.pop("audio_data", None)  # stream chunk audio, too large to list
+    return DeadLetter(
+        id=entry["id"],
+        task_type=entry.get("type", "batch"),
+        task_id=entry.get("task_id", ""),
+        original_id=entry.get("original_id", ""),
+        deliveries=int(entry.get("deliveries", 0)),
+        consumer=entry.get("consumer", ""),
+        dead_at=int(entry.get("dead_at", 0)),
+        payload=payload,
+    )
+
+
+@router.get("/asr/dlq", response_model=DeadLetterResponse, tags=["System"])
+async def list_dead_letters(limit: int = Query(50, ge=1, le=1000)):
+    """
+    List dead-lettered tasks (newest first)
+    
+    Workers move a task to `asr_tasks:dlq` once it was delivered
+    ASR_RECLAIM_MAX_DELIVERIES times without being acknowledged.
+    """
+    entries = streams_client.get_dead_letters(limit)
+    return DeadLetterResponse(
+        total=streams_client.get_dead_letter_count(),
+        entries=[_dead_letter(e) for e in entries],
+    )
+
+
+def _replay(entry: dict) -> Optional[str]:
+    """Re-publish a dead letter; batch tasks show as queued again"""
+    msg_id = streams_client.replay_dead_letter(entry["id"])
+    if msg_id is not None and entry.get("type") == "batch":
+        redis_client.save_task_result(entry["task_id"], {
+            "task_id": entry["task_id"],
+            "status": "queued",
+        })
+    return msg_id
+
+
+@router.post("/asr/dlq/replay", response_model=ReplayResponse, tags=["System"])
+async def replay_dead_letters(limit: int = Query(100, ge=1, le=1000)):
+    """Put the oldest dead-lettered tasks back on the task stream"""
+    log_api(f"POST /api/v1/asr/dlq/replay limit={limit}")
+    replayed, message_ids = [], []
+    for entry in streams_client.get_dead_letters(limit, oldest_first=True):
+        msg_id = _replay(entry)
+        if msg_id is not None:
+            replayed.append(entry["id"])
+            message_ids.append(msg_id)
+    return ReplayResponse(replayed=replayed, message_ids=message_ids)
+
+
+@router.post("/asr/dlq/{entry_id}/replay", response_model=ReplayResponse, tags=["System"])
+async def replay_dead_letter(entry_id: str):
+    """
+    Put a dead-lettered task back on the task stream
+    
+    It starts over with a fresh delivery count.
+    """
+    log_api(f"POST /api/v1/asr/dlq/{entry_id}/replay")
+    entry = streams_client.get_dead_letter(entry_id)
+    msg_id = _replay(entry) if entry is not None else None
+    if msg_id is None:
+        raise HTTPException(status_code=404, detail=f"Dead letter not found: {entry_id}")
+    return ReplayResponse(replayed=[entry_id], message_ids=[msg_id])
+
+
+@router.delete("/asr/dlq/{entry_id}", tags=["System"])
+async def delete_dead_letter(entry_id: str):
+    """Discard a dead-lettered task"""
+    log_api(f"DELETE /api/v1/asr/dlq/{entry_id}")
+    if not streams_client.delete_dead_letter(entry_id):
+        raise HTTPException(status_code=404, detail=f"Dead letter not found: {entry_id}")
+    return {"message": f"Dead letter {entry_id} deleted"}
+
+
+@router.put("/asr/hotwords/{set_id}", response_model=HotwordSetResponse, tags=["ASR"])
+async def put_hotword_set(set_id: str, body: HotwordSetRequest):
+    """
+    Create or replace a named hotword set
+    
+    Tasks and stream sessions select it with `hotword_set=<set_id>`.
+    Workers pick up changes within ASR_HOTWORDS_RELOAD_INTERVAL_S.
+    """
+    log_api(f"PUT /api/v1/asr/hotwords/{set_id} count={len(body.hotwords)}")
+    
+    if set_id == DEFAULT_SET_ID:
+        raise HTTPException(status_code=400, detail="The default set is managed by the hotwords file")
+    words = [w.strip() for w in body.hotwords if w.strip()]
+    if not words:
+        raise HTTPException(status_code=400, detail="No hotwords provided")
+    
+    version = redis_client.save_hotword_set(set_id, "\n".join(words))
+    return HotwordSetResponse(set_id=set_id, count=len(words), version=version)
+
+
+@router.get("/asr/hotwords", tags=["ASR"])
+async def list_hotword_sets():
+    """List registered hotword set IDs"""
+    return {"sets": redis_client.list_hotword_sets()}
+
+
+@router.delete("/asr/hotwords/{set_id}", tags=["ASR"])
+async def delete_hotword_set(set_id: str):
+    """Delete a named hotword set"""
+    log_api(f"DELETE /api/v1/asr/hotwords/{set_id}")
+    
+    if not redis_client.delete_hotword_set(set_id):
+        raise HTTPException(status_code=404, detail=f"Hotword set not found: {set_id}")
+    return {"message": f"Hotword set {set_id} deleted"}
+
+
+@router.get("/asr/stream/{session_id}/transcript", response_model=StreamTranscriptResponse, tags=["ASR"])
+async def get_stream_transcript(session_id: str):
+    """
+    Punctuated transcript of a stream session
+    
+    Available with ASR_STREAM_PUNC_MODE=deferred; grows segment by segment
+    as workers close them.
+    """
+    finals = redis_client.get_stream_finals(session_id)
+    if not finals:
+        raise HTTPException(status_code=404, detail="No punctuated segments for this session")
+    return StreamTranscriptResponse(
+        session_id=session_id,
+        text="".join(f["text"] for f in finals),
+        segments=len(finals),
+    )
+
+
 @router.delete("/asr/task/{task_id}", tags=["ASR"])
 async def delete_task(task_id: str):
     """
@@ -1,35 +1,14 @@
 """RQ Async Tasks for ASR Processing"""
-import ctypes
-import gc
 import json
 import time
-import tracemalloc
 import psutil
 from datetime import datetime
 from pathlib import Path
 from ..asr.recognizer import SpeechRecognizer
 from ..utils.redis_client import redis_client
 from ..utils.logger import log_worker, log_error
-
-# Try to load libc for malloc_trim (Linux only)
-# malloc_trim() returns freed memory to the OS, reducing RSS
-try:
-    _libc = ctypes.CDLL("libc.so.6")
-    _malloc_trim = _libc.malloc_trim
-    _malloc_trim.argtypes = [ctypes.c_size_t]
-    _malloc_trim.restype = ctypes.c_int
-except (OSError, AttributeError):
-    _malloc_trim = None
-
-
-def force_memory_release():
-    """Force Python GC and return memory to OS via malloc_trim"""
-    gc.collect()
-    gc.collect()  # Run twice to handle weak references and weak containers
-    if _malloc_trim:
-        _malloc_trim(0)  # Trim all free memory blocks
-
-
+from ..utils.memory import get_memory_governor
+from ..utils.profiling import allocation_profiler
 
 
 
@@ -43,8 +22,8 @@ def process_asr_task(task_id: str, audio_path: str):
     """
     log_worker(f"Worker task={task_id} status=started path={audio_path}")
     
-    # Start resource tracking
-    tracemalloc.start()
+    # Start resource tracking (allocation tracing only when this task is selected)
+    profile = allocation_profiler.start(task_id, "rq")
     proc = psutil.Process()
     start_mem_mb = proc.memory_info().rss / 1024 / 1024
     start_cpu_time = proc.cpu_times()
@@ -62,14 +41,11 @@ def process_asr_task(task_id: str, audio_path: str):
         processing_time = time.time() - start_time
         
         # End resource tracking
-        current_mem, peak_mem = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
         end_mem_mb = proc.memory_info().rss / 1024 / 1024
         end_cpu_time = proc.cpu_times()
         
         # Calculate resource deltas
         mem_delta_mb = end_mem_mb - start_mem_mb
-        peak_mem_mb = peak_mem / 1024 / 1024
         cpu_user_delta = end_cpu_time.user - start_cpu_time.user
         cpu_system_delta = end_cpu_time.system - start_cpu_time.system
         
@@ -94,7 +70,7 @@ def process_asr_task(task_id: str, audio_path: str):
                 f"duration={audio_duration:.1f}s "
                 f"rtf={rtf:.3f} "
                 f"mem_start={start_mem_mb:.1f}MB mem_end={end_mem_mb:.1f}MB "
-                f"mem_delta={mem_delta_mb:+.1f}MB mem_peak={peak_mem_mb:.1f}MB "
+                f"mem_delta={mem_delta_mb:+.1f}MB "
                 f"cpu_user={cpu_user_delta:.2f}s cpu_sys={cpu_system_delta:.2f}s"
             )
         else:
@@ -129,10 +105,7 @@ def process_asr_task(task_id: str, audio_path: str):
             with open(json_log, "a", encoding="utf-8") as f:
                 f.write(json.dumps(history_record, ensure_ascii=False) + "\n")
         
-        # Explicit cleanup to release memory
         del result
-        recognizer.cleanup()
-        force_memory_release()
         
         return task_result
         
@@ -149,8 +122,12 @@ def process_asr_task(task_id: str, audio_path: str):
         redis_client.save_task_result(task_id, error_result)
         raise
     finally:
+        try:
+            allocation_profiler.finish(profile)
+        except Exception:
+            log_error(f"Worker task={task_id} profiling failed", exc_info=True)
         # Always attempt cleanup to prevent memory leaks
         try:
-            force_memory_release()
+            get_memory_governor().after_task(heavy=True)
         except Exception:
             pass  # Ignore cleanup errors
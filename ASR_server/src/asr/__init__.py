@@ -1,4 +1,12 @@
 """ASR Core Module"""
-from .recognizer import SpeechRecognizer
 
 __all__ = ["SpeechRecognizer"]
+
+
+def __getattr__(name):
+    # The recognizer pulls in torch/funasr; load it only where it is used
+    # (workers), not in every process that reads src.asr.config
+    if name == "SpeechRecognizer":
+        from .recognizer import SpeechRecognizer
+        return SpeechRecognizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
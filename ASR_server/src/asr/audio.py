@@ -0,0 +1,213 @@
+"""In-Memory Audio Decoding
+
+Parses WAV containers (and headerless PCM) straight from bytes so stream
+chunks can be recognized without a temp-file round trip. Other formats
+(mp3/m4a/flac/ogg) are decoded to 16 kHz mono PCM through ffmpeg.
+"""
+import struct
+import subprocess
+from typing import List, Tuple
+
+import numpy as np
+
+
+# FunASR models expect 16 kHz mono input
+TARGET_SAMPLE_RATE = 16000
+
+# WAV format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioDecodeError(ValueError):
+    """Raised when audio bytes cannot be decoded"""
+
+
+def is_wav(data: bytes) -> bool:
+    """Check for a RIFF/WAVE header"""
+    return len(data) >= 12 and data[0:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit PCM bytes to float32 samples in [-1, 1]"""
+    usable = len(data) - (len(data) % 2)
+    samples = np.frombuffer(data[:usable], dtype="<i2")
+    return samples.astype(np.float32) / 32768.0
+
+
+def _convert_samples(raw: bytes, fmt_tag: int, bits: int, channels: int) -> np.ndarray:
+    """Convert interleaved sample bytes to mono float32"""
+    width = bits // 8
+    if width == 0:
+        raise AudioDecodeError(f"Unsupported bits per sample: {bits}")
+    frame_size = width * channels
+    usable = len(raw) - (len(raw) % frame_size)
+    raw = raw[:usable]
+
+    if fmt_tag == WAVE_FORMAT_IEEE_FLOAT:
+        if bits == 32:
+            samples = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+        elif bits == 64:
+            samples = np.frombuffer(raw, dtype="<f8").astype(np.float32)
+        else:
+            raise AudioDecodeError(f"Unsupported float width: {bits}")
+    elif bits == 8:
+        # 8-bit WAV is unsigned
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif bits == 16:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif bits == 24:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif bits == 32:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise AudioDecodeError(f"Unsupported bits per sample: {bits}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def decode_wav_bytes(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Parse a WAV file held in memory.
+
+    Tolerates streaming writers that leave the RIFF/data sizes at 0 or
+    0xFFFFFFFF by reading to the end of the buffer.
+
+    Args:
+        data: Complete WAV file bytes
+
+    Returns:
+        (mono float32 samples, sample_rate)
+    """
+    if not is_wav(data):
+        raise AudioDecodeError("Not a RIFF/WAVE buffer")
+
+    fmt = None
+    offset = 12
+    total = len(data)
+    while offset + 8 <= total:
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            if chunk_size < 16:
+                raise AudioDecodeError("Truncated fmt chunk")
+            fmt_tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if fmt_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                # First two bytes of the SubFormat GUID carry the real tag
+                fmt_tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (fmt_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioDecodeError("data chunk before fmt chunk")
+            fmt_tag, channels, sample_rate, bits = fmt
+            if fmt_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+                raise AudioDecodeError(f"Unsupported WAV format tag: {fmt_tag:#x}")
+            end = total if chunk_size in (0, 0xFFFFFFFF) else min(total, body + chunk_size)
+            samples = _convert_samples(data[body:end], fmt_tag, bits, max(channels, 1))
+            return samples, sample_rate
+
+        # Chunks are word-aligned
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise AudioDecodeError("No data chunk found")
+
+
+def decode_audio_bytes(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decode audio bytes without touching disk.
+
+    WAV containers are parsed; anything else is treated as headerless
+    16 kHz mono 16-bit PCM (the same convention FunASR uses for bytes).
+
+    Returns:
+        (mono float32 samples, sample_rate)
+    """
+    if is_wav(data):
+        return decode_wav_bytes(data)
+    return pcm16_to_float32(data), TARGET_SAMPLE_RATE
+
+
+def samples_duration(samples: np.ndarray, sample_rate: int) -> float:
+    """Audio duration in seconds derived from the sample count"""
+    if sample_rate <= 0:
+        return 0.0
+    return float(len(samples)) / float(sample_rate)
+
+
+def resample_linear(samples: np.ndarray, sample_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Linear-interpolation resample (adequate for speech recognition input)"""
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * target_rate / sample_rate))
+    positions = np.arange(count) * (sample_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Band-limited (windowed sinc) resample, the same filter FunASR applies to
+    non-16 kHz input. Unlike resample_linear it low-passes before
+    downsampling, so content above the new Nyquist frequency doesn't alias
+    into the speech band. Used for whole files and prefiltered stream chunks;
+    torch is imported on first use.
+    """
+    if sample_rate == target_rate or len(samples) == 0:
+        return samples
+    import torch
+    import torchaudio.functional
+
+    waveform = torch.from_numpy(np.ascontiguousarray(samples, dtype=np.float32))
+    return torchaudio.functional.resample(waveform, sample_rate, target_rate).numpy()
+
+
+def decode_with_ffmpeg(path: str, sample_rate: int = TARGET_SAMPLE_RATE) -> Tuple[np.ndarray, int]:
+    """Decode any ffmpeg-readable file to mono float32 at sample_rate"""
+    cmd = [
+        "ffmpeg", "-nostdin", "-v", "error", "-i", path,
+        "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, check=False)
+    except FileNotFoundError:
+        raise AudioDecodeError("ffmpeg not found")
+    if proc.returncode != 0:
+        raise AudioDecodeError(proc.stderr.decode(errors="ignore").strip() or "ffmpeg failed")
+    return pcm16_to_float32(proc.stdout), sample_rate
+
+
+def read_audio_file(path: str) -> Tuple[np.ndarray, int]:
+    """
+    Read an audio file into memory.
+
+    WAV files are parsed directly; everything else goes through ffmpeg.
+
+    Returns:
+        (mono float32 samples, sample_rate)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if is_wav(data):
+        try:
+            return decode_wav_bytes(data)
+        except AudioDecodeError:
+            pass  # e.g. compressed WAV payloads; let ffmpeg handle it
+    return decode_with_ffmpeg(path)
+
+
+def merge_segments(segments: List[List[int]], max_length_ms: int) -> List[List[int]]:
+    """Merge adjacent VAD segments ([beg_ms, end_ms]) until each span reaches max_length_ms"""
+    merged: List[List[int]] = []
+    for beg, end in segments:
+        if merged and end - merged[-1][0] <= max_length_ms:
+            merged[-1][1] = end
+        else:
+            merged.append([beg, end])
+    return merged
@@ -0,0 +1,76 @@
+"""Per-Task Batching Parameters
+
+``model.generate`` takes two knobs that trade memory for throughput:
+
+- ``batch_size_s``: seconds of VAD segments decoded together
+- ``merge_length_s``: how long merged VAD segments may grow (attention cost
+  grows with the square of a segment's length)
+
+A task may set either one (``batch_size`` / ``merge_length_s`` on
+``/asr/submit``). Otherwise ``batch_mode`` decides: ``fixed`` uses
+``batch_size`` / ``merge_length_s`` from the config, ``adaptive`` sizes the
+batch from the memory free right now (CUDA memory on GPU, available RAM
+otherwise):
+
+    batch_size_s   = free_mb * adaptive_memory_fraction / adaptive_mb_per_s,
+                     clamped to [adaptive_min_batch_s, adaptive_max_batch_s]
+                     and to the audio duration
+    merge_length_s = merge_length_s, shrunk to batch_size_s / 4 (min 5 s)
+                     when memory is tight, so a batch still holds several segments
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import psutil
+
+from .config import config
+
+
+MIN_MERGE_LENGTH_S = 5
+
+
+@dataclass
+class BatchParams:
+    batch_size_s: int
+    merge_length_s: int
+
+
+def free_memory_mb() -> float:
+    """Memory the next inference can use: free CUDA memory on GPU, available RAM otherwise"""
+    if config.use_gpu:
+        try:
+            import torch
+            if torch.cuda.is_available():
+                free, _ = torch.cuda.mem_get_info()
+                return free / 1024 / 1024
+        except ImportError:
+            pass
+    return psutil.virtual_memory().available / 1024 / 1024
+
+
+def plan_batch(
+    duration_s: float = 0.0,
+    batch_size_s: Optional[int] = None,
+    merge_length_s: Optional[int] = None
+) -> BatchParams:
+    """
+    Batching parameters for one recognition call
+
+    Args:
+        duration_s: Audio duration (0 if unknown)
+        batch_size_s: Value requested by the task (wins over the config)
+        merge_length_s: Value requested by the task (wins over the config)
+    """
+    if config.batch_mode != "adaptive":
+        return BatchParams(batch_size_s or config.batch_size, merge_length_s or config.merge_length_s)
+
+    if batch_size_s is None:
+        budget_s = free_memory_mb() * config.adaptive_memory_fraction / config.adaptive_mb_per_s
+        batch_size_s = int(min(max(budget_s, config.adaptive_min_batch_s), config.adaptive_max_batch_s))
+        if duration_s > 0:
+            # More than the whole file buys nothing
+            batch_size_s = max(config.adaptive_min_batch_s, min(batch_size_s, math.ceil(duration_s)))
+    if merge_length_s is None:
+        merge_length_s = max(MIN_MERGE_LENGTH_S, min(config.merge_length_s, batch_size_s // 4))
+    return BatchParams(batch_size_s, merge_length_s)
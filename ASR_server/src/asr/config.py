@@ -21,6 +21,16 @@ class ASRConfig(BaseSettings):
     punc_model: str = "ct-punc"
     model_path: Optional[str] = None
     model_hub: str = "auto"  # "auto", "hf" (HuggingFace), or "ms" (ModelScope)
+    model_source: str = "offline_first"  # offline_first (cached snapshots, hub only if missing) | offline | online
+    model_parallel_load: bool = True  # Load ASR, VAD and punc models concurrently
+    model_snapshot: str = ""  # Pre-built pipeline directory (scripts/build_model_snapshot.py), torch backend only
+    language_models: str = ""  # Extra ASR models by task language, e.g. "en=paraformer-en" (others use model_name)
+    model_memory_mb: int = 0  # Budget for extra resident ASR models, least recently used evicted first (0 = no limit)
+    
+    # Inference Backend Configuration
+    backend: str = "torch"  # "torch" (FunASR AutoModel) or "onnx" (onnxruntime, CPU)
+    onnx_quantize: bool = True  # Use int8-quantized ONNX models
+    onnx_intra_op_threads: int = 4
     
     # Processing Configuration
     use_gpu: bool = True
@@ -28,9 +38,85 @@ class ASRConfig(BaseSettings):
     use_itn: bool = True
     merge_vad: bool = True
     merge_length_s: int = 15
+    batch_mode: str = "fixed"  # fixed (batch_size / merge_length_s) | adaptive (sized per task from free memory)
+    adaptive_mb_per_s: float = 4.0  # Inference memory per second of batched audio
+    adaptive_memory_fraction: float = 0.5  # Share of free memory one task may plan for
+    adaptive_min_batch_s: int = 60
+    adaptive_max_batch_s: int = 1000
+    
+    # Worker Loop Configuration
+    worker_mode: str = "sync"  # "sync" (read, process, ack in turn) or "async" (reads/acks overlap inference)
+    worker_prefetch: int = 2  # Batches read ahead in async mode
+    
+    # Stale Message Reclamation (pending tasks of dead or stuck workers, see worker/reclaimer.py)
+    reclaim_interval_s: int = 30  # How often each worker checks the pending list (0 = off)
+    reclaim_idle_s: int = 60  # Idle time before taking over messages of workers without a heartbeat
+    reclaim_stuck_s: int = 1800  # Idle time before taking over messages of live workers (> longest task)
+    reclaim_max_deliveries: int = 3  # Deliveries before a message is moved to asr_tasks:dlq
+    reclaim_batch: int = 20  # Pending entries examined per check
+    
+    # Stream Micro-Batching Configuration
+    stream_batch_size: int = 8  # Max chunks (across sessions) per batched generate call
+    stream_batch_wait_ms: int = 20  # Max time to wait for a batch to fill
+    
+    # Silence Prefilter (skip the model for silent stream chunks)
+    silence_prefilter: bool = True
+    silence_threshold_db: float = -50.0  # Frame energy (dBFS) above which a 20 ms frame counts as speech
+    silence_min_speech_ms: int = 100  # Chunks with less speech than this get an empty result without recognition
+    
+    # Stream Punctuation Configuration
+    stream_punc_mode: str = "chunk"  # chunk (punctuate every chunk) | deferred (raw chunks, punctuate per segment)
+    stream_punc_segment_chars: int = 200  # Close a deferred segment once this much raw text is pending (0 = pauses/end only)
+    stream_punc_idle_s: float = 3  # Close a deferred segment after this long without chunks
+    
+    # Online Streaming Configuration
+    stream_mode: str = "offline"  # offline (each chunk through VAD+ASR+punc) | online (streaming paraformer with session state)
+    streaming_model_name: str = "paraformer-zh-streaming"
+    streaming_chunk_size: str = "0,10,5"  # Look-back, chunk, look-ahead in 60 ms frames (10 = 600 ms per decode step)
+    streaming_encoder_look_back: int = 4
+    streaming_decoder_look_back: int = 1
+    streaming_session_idle_s: float = 60  # Drop session state after this long without chunks
+    streaming_cache_mb: int = 512  # Cap on total session cache memory, least recently used evicted first
+    streaming_max_sessions: int = 200  # Cap on concurrent sessions per worker
+    
+    # Session Affinity (route every chunk of a session to one worker)
+    stream_affinity: bool = False
+    stream_affinity_lease_s: int = 60  # Session ownership lease, renewed on each chunk
+    
+    # Long Audio Fan-out Configuration
+    fanout_min_duration_s: float = 600  # Split batch tasks at least this long across workers (0 = disabled)
+    fanout_segment_s: int = 60  # Target audio length of each sub-task (VAD-aligned)
+    
+    # Batch Progress Configuration
+    progress_min_duration_s: float = 60  # Report per-segment partial text for tasks at least this long
+    progress_segment_s: int = 30  # Audio length recognized between progress updates
+    
+    # Decoding Configuration (uploads -> 16 kHz mono PCM, cached by content hash)
+    pcm_cache_mb: int = 2048  # Budget of <storage_path>/pcm, least recently used evicted (0 = disabled)
+    decode_workers: int = 2  # Processes the API uses to decode uploads while they are queued
     
     # Hotwords Configuration
     hotwords_path: str = "src/hotwords.txt"
+    hotwords_reload_interval_s: float = 5  # How often workers re-check the file / Redis override (0 disables)
+    hotword_cache_mb: int = 64  # Budget for cached hotword sets and their compiled form
+    
+    # Result Cache Configuration (keyed by audio content hash)
+    result_cache_max_entries: int = 10000  # Cached batch results kept, least recently used evicted (0 = disabled)
+    result_cache_ttl_s: int = 86400  # Lifetime of a cached result
+    result_cache_inflight_ttl_s: int = 3600  # Upper bound on how long duplicates wait for an in-flight job
+    
+    # Memory Governor Configuration (when workers run gc + malloc_trim)
+    memory_mode: str = "adaptive"  # adaptive | always (after every task) | off
+    memory_release_every_n: int = 200  # Release at least every N tasks
+    memory_growth_mb: float = 256  # Release when RSS grows this much above the last post-release level
+    memory_slope_mb_per_task: float = 1.0  # Release when RSS trends up faster than this...
+    memory_slope_window: int = 50  # ...over this many tasks
+
+    # Allocation Profiling (tracemalloc)
+    alloc_profile_mode: str = "off"  # off | sampled (1 in alloc_profile_sample_n tasks); forced tasks are always profiled
+    alloc_profile_sample_n: int = 100
+    alloc_profile_top: int = 10  # Allocation sites kept per profile
+    alloc_profile_stream_maxlen: int = 1000  # Profiles kept in asr:profile:alloc
     
     # Storage Configuration
     storage_path: str = "src/storage"
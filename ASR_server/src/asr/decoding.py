@@ -0,0 +1,203 @@
+"""Pooled Decoding and Canonical-PCM Cache
+
+Every accepted upload format (wav/mp3/m4a/flac/ogg) is converted once to
+16 kHz mono float32 PCM and stored by the SHA-256 of the original file:
+
+    <storage_path>/pcm/<sha256>.npy
+
+Workers load the cached PCM memory-mapped, so retries and re-recognitions of
+the same audio skip decoding and resampling entirely. The cache directory is
+bounded by ``pcm_cache_mb``; least recently used files are removed first.
+
+Decoding runs in a process pool of ``decode_workers`` processes. The API
+starts decoding as soon as an upload is saved, overlapping it with the time
+the task spends queued. Within a process, decoders are tried in order:
+
+1. WAV parsed in-process (band-limited resample if not 16 kHz)
+2. ``soundfile`` (libsndfile: flac/ogg, and mp3 on libsndfile >= 1.1), if installed
+3. ``ffmpeg`` (everything else, e.g. m4a)
+"""
+import hashlib
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .audio import (
+    TARGET_SAMPLE_RATE, AudioDecodeError, decode_wav_bytes, decode_with_ffmpeg, is_wav, resample
+)
+from .config import config
+
+try:
+    import soundfile
+except ImportError:  # optional
+    soundfile = None
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _to_mono(samples: np.ndarray) -> np.ndarray:
+    return samples.mean(axis=1) if samples.ndim > 1 else samples
+
+
+def decode_to_pcm(path: str) -> np.ndarray:
+    """Decode any accepted audio file to 16 kHz mono float32"""
+    with open(path, "rb") as f:
+        head = f.read(12)
+    if is_wav(head):
+        try:
+            with open(path, "rb") as f:
+                samples, sample_rate = decode_wav_bytes(f.read())
+            return resample(samples, sample_rate, TARGET_SAMPLE_RATE)
+        except AudioDecodeError:
+            pass  # e.g. compressed WAV payloads
+
+    if soundfile is not None:
+        try:
+            samples, sample_rate = soundfile.read(path, dtype="float32", always_2d=False)
+            return resample(_to_mono(samples), sample_rate, TARGET_SAMPLE_RATE)
+        except Exception:
+            pass  # format not supported by this libsndfile build
+
+    samples, _ = decode_with_ffmpeg(path, TARGET_SAMPLE_RATE)
+    return samples
+
+
+class PcmCache:
+    """Size-bounded directory of decoded PCM files keyed by content hash"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or Path(config.storage_path) / "pcm")
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return config.pcm_cache_mb > 0
+
+    def path_for(self, content_hash: str) -> Path:
+        return self.directory / f"{content_hash}.npy"
+
+    def get(self, content_hash: str) -> Optional[np.ndarray]:
+        """Cached PCM (memory-mapped, read-only) or None"""
+        path = self.path_for(content_hash)
+        try:
+            samples = np.load(path, mmap_mode="r")
+            os.utime(path)  # LRU position
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return samples
+
+    def put(self, content_hash: str, samples: np.ndarray):
+        """Store PCM atomically, then trim the directory to its budget"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{content_hash}.{uuid.uuid4().hex}.tmp.npy"
+        np.save(tmp, np.asarray(samples, dtype=np.float32))
+        os.replace(tmp, self.path_for(content_hash))
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used files beyond pcm_cache_mb; returns files removed"""
+        budget = config.pcm_cache_mb * 1024 * 1024
+        entries = []
+        for path in self.directory.glob("*.npy"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= budget:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def _decode_job(path: str, directory: str, content_hash: str) -> int:
+    """Pool task: decode and write straight into the cache (PCM never crosses the pipe)"""
+    cache = PcmCache(directory)
+    if cache.path_for(content_hash).exists():
+        return 0
+    samples = decode_to_pcm(path)
+    cache.put(content_hash, samples)
+    return len(samples)
+
+
+class DecoderPool:
+    """Process pool that decodes uploads into the PCM cache ahead of the workers"""
+
+    def __init__(self, cache: PcmCache, workers: Optional[int] = None):
+        self.cache = cache
+        self.workers = workers or config.decode_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the API process runs threads, which fork does not copy safely
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def submit(self, path: str, content_hash: str) -> Future:
+        """
+        Decode in the background; the future's result is the sample count
+        (0 if the PCM was already cached).
+        """
+        return self._pool().submit(_decode_job, path, str(self.cache.directory), content_hash)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pcm_cache = PcmCache()
+decoder_pool = DecoderPool(pcm_cache)
+
+
+def load_pcm(path: str, content_hash: Optional[str] = None) -> np.ndarray:
+    """
+    16 kHz mono PCM for an audio file, decoding only on a cache miss.
+
+    Args:
+        path: Audio file
+        content_hash: SHA-256 of the file if already known (computed otherwise)
+
+    Returns:
+        float32 samples at TARGET_SAMPLE_RATE (memory-mapped when cached)
+    """
+    if not pcm_cache.enabled:
+        return decode_to_pcm(path)
+    content_hash = content_hash or file_sha256(path)
+    samples = pcm_cache.get(content_hash)
+    if samples is not None:
+        return samples
+    samples = decode_to_pcm(path)
+    pcm_cache.put(content_hash, samples)
+    return samples
@@ -0,0 +1,338 @@
+"""Hotword Store and Compiled Hotword Cache
+
+Hotwords come from ``config.hotwords_path`` or, when set, the Redis key
+``asr:hotwords``. ``HotwordStore`` re-checks the file mtime and the Redis
+version counter every ``hotwords_reload_interval_s`` seconds and reloads the
+text in place, so workers pick up edits without restarting (and without
+reloading any model).
+
+SeACo-Paraformer re-tokenizes the whole hotword string and re-runs its
+hotword encoder on every call. ``install_compiled_hotwords`` memoizes both
+steps on the loaded model, so a hotword list is compiled once per version.
+
+Tenants can also register named hotword sets (``asr:hotword_set:<id>``) and
+pick one per request; ``HotwordSetCache`` keeps recently used sets in a
+size-bounded LRU so only the requested list is biased against.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from .config import config
+
+
+# Redis keys: hotword text override and a counter bumped on every update
+REDIS_HOTWORDS_KEY = "asr:hotwords"
+REDIS_VERSION_KEY = "asr:hotwords:version"
+
+# Set ID that always means the global list (config.hotwords_path / Redis override)
+DEFAULT_SET_ID = "default"
+
+
+def parse_hotwords(text: str) -> str:
+    """Normalize hotword text to FunASR's space-separated form, dropping comments"""
+    lines = [line.strip() for line in text.splitlines()]
+    return " ".join(line for line in lines if line and not line.startswith("#"))
+
+
+def load_hotwords_file(filepath: str) -> str:
+    """Load hotwords from file"""
+    if not os.path.exists(filepath):
+        print(f"⚠️  Hotwords file not found: {filepath}")
+        return ""
+
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            hotwords = parse_hotwords(f.read())
+            print(f"✅ Loaded {len(hotwords.split())} hotwords")
+            return hotwords
+    except Exception as e:
+        print(f"⚠️  Failed to load hotwords: {e}")
+        return ""
+
+
+def publish_hotwords(client, text: Optional[str]) -> int:
+    """
+    Push hotwords to every worker through Redis.
+
+    Args:
+        client: Redis client
+        text: Hotword text (one or more per line); None reverts to the file
+
+    Returns:
+        New hotword version
+    """
+    pipe = client.pipeline()
+    if text is None:
+        pipe.delete(REDIS_HOTWORDS_KEY)
+    else:
+        pipe.set(REDIS_HOTWORDS_KEY, text)
+    pipe.incr(REDIS_VERSION_KEY)
+    return int(pipe.execute()[-1])
+
+
+class LRUCache:
+    """OrderedDict LRU bounded by the summed size of its values"""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._items: "OrderedDict[Any, Tuple[Any, int]]" = OrderedDict()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def get(self, key, default=None):
+        if key not in self._items:
+            return default
+        self._items.move_to_end(key)
+        return self._items[key][0]
+
+    def put(self, key, value):
+        if key in self._items:
+            self.size -= self._items.pop(key)[1]
+        nbytes = self._sizeof(value)
+        self._items[key] = (value, nbytes)
+        self.size += nbytes
+        # Always keep the newest entry, even if it alone exceeds the budget
+        while self.size > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.size -= evicted
+
+    def pop(self, key):
+        if key in self._items:
+            self.size -= self._items.pop(key)[1]
+
+
+def _default_redis():
+    try:
+        from src.utils.redis_client import redis_client
+        return redis_client.client
+    except Exception:
+        return None
+
+
+class HotwordStore:
+    """Current hotword text with mtime / Redis-version based hot reload"""
+
+    def __init__(
+        self,
+        path: str,
+        loader: Callable[[str], str] = load_hotwords_file,
+        redis_getter: Callable[[], Any] = _default_redis,
+    ):
+        self.path = path
+        self._loader = loader
+        self._redis_getter = redis_getter
+        self._file_stamp = self._stat()
+        self._redis_version: Optional[bytes] = None
+        self.text = loader(path)
+        self.version = 1
+        self.digest = self._digest(self.text)
+        self._last_check = time.monotonic()
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _check_redis(self) -> Tuple[bool, Optional[str]]:
+        """Returns (changed, override text) from the Redis version counter"""
+        client = self._redis_getter()
+        if client is None:
+            return False, None
+        try:
+            version = client.get(REDIS_VERSION_KEY)
+            if version == self._redis_version:
+                return False, None
+            self._redis_version = version
+            override = client.get(REDIS_HOTWORDS_KEY)
+        except Exception:
+            return False, None
+        if isinstance(override, bytes):
+            override = override.decode("utf-8")
+        return True, override
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload hotwords if the file or the Redis override changed.
+
+        Returns:
+            True if the hotword text changed
+        """
+        stamp = self._stat()
+        redis_changed, override = self._check_redis()
+        if not (force or redis_changed or stamp != self._file_stamp):
+            return False
+        self._file_stamp = stamp
+
+        text = parse_hotwords(override) if override is not None else self._loader(self.path)
+        if text == self.text:
+            return False
+
+        self.text = text
+        self.version += 1
+        self.digest = self._digest(text)
+        print(f"🔁 Hotwords reloaded: {len(text.split())} words (version {self.version})")
+        return True
+
+    def current(self) -> str:
+        """Current hotword text, re-checking sources at most once per reload interval"""
+        interval = config.hotwords_reload_interval_s
+        now = time.monotonic()
+        if interval > 0 and now - self._last_check >= interval:
+            self._last_check = now
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️  Hotword reload failed, keeping previous list: {e}")
+        return self.text
+
+
+def _token_list_size(key_and_ids) -> int:
+    text, ids = key_and_ids
+    # Python list/int overhead dominates; ~64 bytes per list + 32 per token id
+    return len(text.encode("utf-8")) + sum(64 + 32 * len(i) for i in (ids or []))
+
+
+def _embedding_size(key_and_tensor) -> int:
+    key, tensor = key_and_tensor
+    return len(key) + tensor.element_size() * tensor.nelement()
+
+
+def install_compiled_hotwords(model: Any, max_bytes: Optional[int] = None) -> bool:
+    """
+    Memoize hotword compilation on a loaded FunASR AutoModel.
+
+    Wraps the SeACo model's ``generate_hotwords_list`` (text -> token ids)
+    and ``_hotword_representation`` (token ids -> bias embeddings) so they run
+    once per distinct hotword list instead of on every call. Both caches are
+    LRUs sharing ``max_bytes`` (default ``hotword_cache_mb``). Model weights
+    are untouched.
+
+    Returns:
+        True if the model supports hotwords and the cache was installed
+    """
+    inner = getattr(model, "model", None)
+    tokenize = getattr(inner, "generate_hotwords_list", None)
+    represent = getattr(inner, "_hotword_representation", None)
+    if tokenize is None or represent is None:
+        return False
+
+    import torch
+
+    if max_bytes is None:
+        max_bytes = config.hotword_cache_mb * 1024 * 1024
+    token_cache = LRUCache(max_bytes // 2, _token_list_size)
+    embed_cache = LRUCache(max_bytes // 2, _embedding_size)
+
+    def generate_hotwords_list(hotword_list_or_file, tokenizer=None, frontend=None):
+        if not isinstance(hotword_list_or_file, str) or os.path.exists(hotword_list_or_file):
+            # Files may change under the same name; don't cache them
+            return tokenize(hotword_list_or_file, tokenizer=tokenizer, frontend=frontend)
+        hit = token_cache.get(hotword_list_or_file)
+        if hit is not None:
+            return hit[1]
+        ids = tokenize(hotword_list_or_file, tokenizer=tokenizer, frontend=frontend)
+        token_cache.put(hotword_list_or_file, (hotword_list_or_file, ids))
+        return ids
+
+    def hotword_representation(hotword_pad, hotword_lengths):
+        if inner.training or torch.is_grad_enabled():
+            return represent(hotword_pad, hotword_lengths)
+        key = (
+            hotword_pad.detach().cpu().numpy().tobytes()
+            + hotword_lengths.detach().cpu().numpy().tobytes()
+            + str(hotword_pad.device).encode()
+        )
+        hit = embed_cache.get(key)
+        if hit is not None:
+            return hit[1]
+        selected = represent(hotword_pad, hotword_lengths)
+        embed_cache.put(key, (key, selected))
+        return selected
+
+    inner.generate_hotwords_list = generate_hotwords_list
+    inner._hotword_representation = hotword_representation
+    inner.hotword_caches = (token_cache, embed_cache)
+    return True
+
+
+def precompile_hotwords(model: Any, hotwords: str) -> None:
+    """Compile a hotword list ahead of the first request that uses it"""
+    inner = getattr(model, "model", None)
+    kwargs = getattr(model, "kwargs", None) or {}
+    if not hotwords or inner is None or "tokenizer" not in kwargs:
+        return
+    inner.generate_hotwords_list(hotwords, tokenizer=kwargs["tokenizer"], frontend=kwargs.get("frontend"))
+
+
+def _fetch_hotword_set(set_id: str) -> Optional[dict]:
+    from src.utils.redis_client import redis_client
+    return redis_client.get_hotword_set(set_id)
+
+
+def _fetch_hotword_set_version(set_id: str) -> Optional[int]:
+    from src.utils.redis_client import redis_client
+    return redis_client.get_hotword_set_version(set_id)
+
+
+class HotwordSetCache:
+    """Size-bounded LRU of named hotword sets, refreshed by version"""
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        fetch: Callable[[str], Optional[dict]] = _fetch_hotword_set,
+        fetch_version: Callable[[str], Optional[int]] = _fetch_hotword_set_version,
+    ):
+        if max_bytes is None:
+            max_bytes = config.hotword_cache_mb * 1024 * 1024
+        # entry: (text, version, last_checked)
+        self._cache = LRUCache(max_bytes, lambda entry: len(entry[0].encode("utf-8")) + 64)
+        self._fetch = fetch
+        self._fetch_version = fetch_version
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, set_id: str) -> Optional[str]:
+        """
+        Hotword text of a set, or None if the set does not exist.
+
+        Cached sets are re-validated against their Redis version at most once
+        per ``hotwords_reload_interval_s``.
+        """
+        now = time.monotonic()
+        entry = self._cache.get(set_id)
+        if entry is not None:
+            text, version, checked = entry
+            interval = config.hotwords_reload_interval_s
+            if interval <= 0 or now - checked < interval:
+                return text
+            current = self._fetch_version(set_id)
+            if current == version:
+                self._cache.put(set_id, (text, version, now))
+                return text
+            if current is None:
+                self._cache.pop(set_id)
+                return None
+
+        data = self._fetch(set_id)
+        if data is None:
+            return None
+        text = parse_hotwords(data["text"])
+        self._cache.put(set_id, (text, data["version"], now))
+        return text
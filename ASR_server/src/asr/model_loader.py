@@ -0,0 +1,141 @@
+"""Offline-First Model Resolution and Startup Timing
+
+FunASR resolves a model name (``paraformer-zh``) to a hub repository and
+asks the hub for the latest snapshot, and ``model_hub = "auto"`` first
+probes the network to pick ModelScope or HuggingFace. Workers without
+outbound network pay for both on every start.
+
+With ``model_source = "offline_first"`` (default) the ASR, VAD and
+punctuation models are looked up in the local hub caches first:
+
+    ModelScope:  $MODELSCOPE_CACHE, ASR_MODEL_PATH, ~/.cache/modelscope/hub
+                 -> <root>/models/<repo> or <root>/<repo>
+    HuggingFace: $HF_HUB_CACHE, $HF_HOME/hub, ~/.cache/huggingface/hub
+                 -> <root>/models--<org>--<name>/snapshots/<revision>
+
+If every model is found under one hub, FunASR gets the local directories
+and neither the probe nor the hub is contacted. Otherwise loading falls back
+to the hub as before (``offline`` fails instead; ``online`` skips the
+lookup).
+"""
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import config
+
+
+# Files FunASR reads from a model directory (one of them must exist)
+MODEL_MARKERS = ("config.yaml", "configuration.json")
+
+# Sub-model attributes of a FunASR AutoModel
+SUB_MODEL_ATTRS = ("vad_model", "vad_kwargs", "punc_model", "punc_kwargs")
+
+
+def _roots(*candidates: Optional[str]) -> List[Path]:
+    roots = []
+    for candidate in candidates:
+        if not candidate:
+            continue
+        path = Path(candidate).expanduser()
+        if path not in roots and path.is_dir():
+            roots.append(path)
+    return roots
+
+
+def _is_model_dir(path: Path) -> bool:
+    return any((path / marker).is_file() for marker in MODEL_MARKERS)
+
+
+def _repo_id(name: str, hub: str) -> str:
+    try:
+        from funasr.download.name_maps_from_hub import name_maps_hf, name_maps_ms
+    except ImportError:
+        return name
+    return (name_maps_hf if hub == "hf" else name_maps_ms).get(name, name)
+
+
+def resolve_local(name: str, hub: str) -> Optional[str]:
+    """
+    Local snapshot directory of a model, or None if it is not cached
+
+    Args:
+        name: FunASR model name, hub repository ID or directory
+        hub: "ms" or "hf"
+    """
+    if _is_model_dir(Path(name).expanduser()):
+        return str(Path(name).expanduser())
+    repo = _repo_id(name, hub)
+
+    if hub == "hf":
+        hf_home = os.getenv("HF_HOME")
+        roots = _roots(os.getenv("HF_HUB_CACHE"), hf_home and os.path.join(hf_home, "hub"),
+                       "~/.cache/huggingface/hub")
+        for root in roots:
+            snapshots = root / f"models--{repo.replace('/', '--')}" / "snapshots"
+            if not snapshots.is_dir():
+                continue
+            found = sorted((p for p in snapshots.iterdir() if _is_model_dir(p)),
+                           key=lambda p: p.stat().st_mtime, reverse=True)
+            if found:
+                return str(found[0])
+        return None
+
+    for root in _roots(os.getenv("MODELSCOPE_CACHE"), config.model_path, "~/.cache/modelscope/hub"):
+        for path in (root / "models" / repo, root / repo):
+            if _is_model_dir(path):
+                return str(path)
+    return None
+
+
+def resolve_all(names: Iterable[str], hubs: Iterable[str]) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    First hub whose local cache holds every model
+
+    Returns:
+        (hub, {name: local directory}), or (None, {}) if no hub has them all
+    """
+    names = list(names)
+    for hub in hubs:
+        paths = {name: resolve_local(name, hub) for name in names}
+        if all(paths.values()):
+            return hub, paths
+    return None, {}
+
+
+def attach_sub_models(model: Any, source: Dict[str, Any]):
+    """
+    Set VAD/punc sub-models on a FunASR AutoModel.
+
+    AutoModel restores its kwargs from a snapshot before every call, so the
+    snapshot is retaken; otherwise the attached kwargs would be reset.
+    """
+    for attr, value in source.items():
+        setattr(model, attr, value)
+    store = getattr(model, "_store_base_configs", None)
+    if callable(store):
+        store()
+
+
+class StartupTimer:
+    """Wall-clock duration of named startup phases (phases may run in threads)"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - start, 3)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**self.phases, "total": round(time.perf_counter() - self._start, 3)}
+
+    def summary(self) -> str:
+        return " ".join(f"{name}={seconds:.2f}s" for name, seconds in self.as_dict().items())
@@ -0,0 +1,167 @@
+"""ONNX Runtime Inference Backend
+
+CPU-oriented drop-in for the FunASR ``AutoModel`` pipeline
+(VAD -> Paraformer -> punctuation) built on ``funasr_onnx``.
+
+Models are exported to ONNX on first use (``funasr_onnx`` does this itself
+when ``model.onnx`` / ``model_quant.onnx`` is missing from the model
+directory) and then run through onnxruntime with a fixed intra-op thread
+count. Only the subset of the AutoModel interface that ``SpeechRecognizer``
+uses is implemented.
+
+Install with: ``uv sync --extra onnx``
+"""
+import os
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from .audio import TARGET_SAMPLE_RATE, decode_audio_bytes, merge_segments, samples_duration
+
+
+def resolve_model_dir(name: str) -> str:
+    """Map a FunASR short name (e.g. "paraformer-zh") to a ModelScope ID or keep a local path"""
+    if os.path.isdir(name):
+        return name
+    try:
+        from funasr.download.name_maps_from_hub import name_maps_ms
+        return name_maps_ms.get(name, name)
+    except ImportError:
+        return name
+
+
+def load_samples(audio: Union[str, np.ndarray], fs: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """Load a path or array as 16 kHz mono float32 samples"""
+    if isinstance(audio, np.ndarray):
+        samples, sr = audio.astype(np.float32, copy=False), fs
+    elif audio.lower().endswith(".wav"):
+        with open(audio, "rb") as f:
+            samples, sr = decode_audio_bytes(f.read())
+    else:
+        import librosa
+        samples, _ = librosa.load(audio, sr=TARGET_SAMPLE_RATE, mono=True)
+        return samples.astype(np.float32, copy=False)
+
+    if sr != TARGET_SAMPLE_RATE:
+        import librosa
+        samples = librosa.resample(samples, orig_sr=sr, target_sr=TARGET_SAMPLE_RATE)
+    return samples.astype(np.float32, copy=False)
+
+
+class OnnxPipeline:
+    """VAD + ASR + punctuation pipeline on onnxruntime"""
+
+    def __init__(
+        self,
+        model: str,
+        vad_model: Optional[str],
+        punc_model: Optional[str],
+        quantize: bool = True,
+        intra_op_threads: int = 4,
+        batch_size: int = 4,
+    ):
+        from funasr_onnx import CT_Transformer, Fsmn_vad, SeacoParaformer
+
+        common = {"quantize": quantize, "intra_op_num_threads": intra_op_threads}
+        # paraformer-zh is the SeACo variant, so hotwords keep working
+        self.model = SeacoParaformer(resolve_model_dir(model), batch_size=batch_size, **common)
+        self.vad_model = Fsmn_vad(resolve_model_dir(vad_model), **common) if vad_model else None
+        self.punc_model = CT_Transformer(resolve_model_dir(punc_model), **common) if punc_model else None
+        self.punc_kwargs: Dict[str, Any] = {}
+        self.kwargs: Dict[str, Any] = {"batch_size": batch_size}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _asr(self, clips: List[np.ndarray], hotword: str) -> List[str]:
+        """Run the ASR model over clips, returning one text per clip"""
+        if not clips:
+            return []
+        try:
+            res = self.model(clips, hotword or "")
+            if len(res) == len(clips):
+                return [self._pred_text(r) for r in res]
+        except Exception:
+            pass
+        
+        # A silent/noisy clip collapses the whole batch to one empty result
+        # in funasr_onnx, so retry clip by clip
+        texts = []
+        for clip in clips:
+            try:
+                res = self.model([clip], hotword or "")
+                texts.append(self._pred_text(res[0]) if res else "")
+            except Exception:
+                texts.append("")
+        return texts
+
+    @staticmethod
+    def _pred_text(result: Dict[str, Any]) -> str:
+        preds = result.get("preds", "")
+        # Older funasr_onnx versions return (text, tokens)
+        if isinstance(preds, (list, tuple)):
+            preds = preds[0] if preds else ""
+        return preds
+
+    def _punctuate(self, text: str) -> str:
+        if self.punc_model is None or not text:
+            return text
+        out = self.punc_model(text)
+        return out[0] if isinstance(out, (list, tuple)) else out
+
+    def vad_segments(self, samples: np.ndarray) -> List[List[int]]:
+        """Speech segments ([beg_ms, end_ms]) of 16 kHz samples"""
+        if self.vad_model is None:
+            return [[0, int(samples_duration(samples, TARGET_SAMPLE_RATE) * 1000)]]
+        segments = self.vad_model(samples)
+        return [list(s) for s in (segments[0] if segments else [])]
+
+    # ------------------------------------------------------------------
+    # AutoModel-compatible interface
+    # ------------------------------------------------------------------
+
+    def generate(
+        self,
+        input: Union[str, np.ndarray],
+        hotword: str = "",
+        merge_vad: bool = True,
+        merge_length_s: int = 15,
+        fs: int = TARGET_SAMPLE_RATE,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        """Full-pipeline recognition of one path or array"""
+        samples = load_samples(input, fs)
+        segments = self.vad_segments(samples)
+        if merge_vad:
+            segments = merge_segments(segments, merge_length_s * 1000)
+
+        per_ms = TARGET_SAMPLE_RATE // 1000
+        clips = [samples[beg * per_ms:end * per_ms] for beg, end in segments if end > beg]
+        text = "".join(self._asr(clips, hotword))
+        return [{
+            "key": "onnx",
+            "text": self._punctuate(text),
+            "duration": samples_duration(samples, TARGET_SAMPLE_RATE),
+        }]
+
+    def inference(
+        self,
+        input: Union[str, np.ndarray, List[Any]],
+        model: Any = None,
+        kwargs: Optional[Dict[str, Any]] = None,
+        key: Optional[List[str]] = None,
+        hotword: str = "",
+        fs: int = TARGET_SAMPLE_RATE,
+        **cfg,
+    ) -> List[Dict[str, Any]]:
+        """Single-model pass: punctuation when ``model`` is the punc model, ASR otherwise"""
+        if model is not None and model is self.punc_model:
+            texts = input if isinstance(input, list) else [input]
+            return [{"text": self._punctuate(t)} for t in texts]
+
+        items = input if isinstance(input, list) else [input]
+        clips = [load_samples(item, fs) for item in items]
+        keys = key or [f"clip{i}" for i in range(len(clips))]
+        return [{"key": k, "text": t} for k, t in zip(keys, self._asr(clips, hotword))]
+
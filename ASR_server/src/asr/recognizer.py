@@ -1,12 +1,22 @@
 """Speech Recognition Module"""
-import gc
 import os
 import socket
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-import torch
+import numpy as np
 from funasr import AutoModel
+from .audio import TARGET_SAMPLE_RATE, decode_audio_bytes, merge_segments, samples_duration
+from .batching import plan_batch
 from .config import config
+from .model_loader import StartupTimer, attach_sub_models, resolve_all, resolve_local
+from .registry import ModelRegistry
+from .snapshot import load_snapshot, mismatch, read_manifest
+from ..utils.memory import release_memory
+from .hotwords import (
+    DEFAULT_SET_ID, HotwordSetCache, HotwordStore, install_compiled_hotwords,
+    load_hotwords_file, parse_hotwords, precompile_hotwords
+)
 
 
 
@@ -61,102 +71,289 @@ class SpeechRecognizer:
             return
             
         print("🔄 Loading ASR model resources, please wait...")
+        timer = StartupTimer()
         device = "cuda" if config.use_gpu else "cpu"
         
-        # Determine download source (hub)
-        if config.model_hub == "auto":
-            hub = self._detect_network_region()
-        else:
-            hub = config.model_hub
-            if hub == "hf":
-                print("📦 Using configured HuggingFace source")
-            elif hub == "ms":
-                print("📦 Using configured ModelScope source")
-        
-        # Initialize FunASR Pipeline
         model_name = config.model_name
         vad_model = config.vad_model
         punc_model = config.punc_model
-
-        # Ensure sub-models also use the correct hub
-        sub_model_kwargs = {"hub": hub, "device": device} if hub == "hf" else {"device": device}
-
-        model_kwargs = {
-            "model": model_name,
-            "vad_model": vad_model,
-            "punc_model": punc_model,
-            "device": device,
-            "hub": hub,  # Set download source
-            "disable_update": True,
-            "vad_kwargs": sub_model_kwargs,
-            "punc_kwargs": sub_model_kwargs,
-        }
         
-        # Add model_path if specified
-        if config.model_path:
-            model_kwargs["model_dir"] = config.model_path
+        # Pre-built pipeline (see snapshot.py), falls back to a normal load
+        self.model = None
+        if config.model_snapshot and config.backend != "onnx":
+            with timer.phase("snapshot"):
+                self.model, self.hub = self._load_snapshot(
+                    config.model_snapshot, {"asr": model_name, "vad": vad_model, "punc": punc_model}, device
+                )
+        
+        if self.model is None:
+            # Offline-first: use cached snapshots without probing or contacting a hub
+            with timer.phase("resolve"):
+                hub, local = self._resolve_local_models([model_name, vad_model, punc_model])
+            
+            # Determine download source (hub)
+            if hub is not None:
+                print(f"📦 Using locally cached models ({'HuggingFace' if hub == 'hf' else 'ModelScope'} snapshots)")
+            elif config.model_hub == "auto":
+                with timer.phase("probe"):
+                    hub = self._detect_network_region()
+            else:
+                hub = config.model_hub
+                if hub == "hf":
+                    print("📦 Using configured HuggingFace source")
+                elif hub == "ms":
+                    print("📦 Using configured ModelScope source")
+            
+            self.hub = hub
+            
+            # Initialize FunASR Pipeline
+            model_kwargs = {
+                "model": local.get(model_name, model_name),
+                "device": device,
+                "hub": hub,  # Set download source
+                "disable_update": True,
+            }
+            
+            # Add model_path if specified
+            if config.model_path:
+                model_kwargs["model_dir"] = config.model_path
+            
+            if config.backend == "onnx":
+                # onnxruntime pipeline; exports/loads ONNX variants of the three models
+                from .onnx_backend import OnnxPipeline
+                print(f"📦 Using ONNX Runtime backend (quantize={config.onnx_quantize}, "
+                      f"threads={config.onnx_intra_op_threads})")
+                with timer.phase("load"):
+                    self.model = OnnxPipeline(
+                        model=model_name,
+                        vad_model=vad_model,
+                        punc_model=punc_model,
+                        quantize=config.onnx_quantize,
+                        intra_op_threads=config.onnx_intra_op_threads,
+                    )
+            elif config.model_parallel_load:
+                with timer.phase("load"):
+                    self.model = self._load_pipeline_parallel(
+                        model_kwargs,
+                        {"model": local.get(vad_model, vad_model), "device": device, "hub": hub},
+                        {"model": local.get(punc_model, punc_model), "device": device, "hub": hub},
+                        timer
+                    )
+            else:
+                # Ensure sub-models also use the correct hub
+                sub_model_kwargs = {"hub": hub, "device": device} if hub == "hf" else {"device": device}
+                with timer.phase("load"):
+                    self.model = AutoModel(
+                        **model_kwargs,
+                        vad_model=local.get(vad_model, vad_model),
+                        punc_model=local.get(punc_model, punc_model),
+                        vad_kwargs=sub_model_kwargs,
+                        punc_kwargs=sub_model_kwargs,
+                    )
         
-        self.model = AutoModel(**model_kwargs)
+        # Other languages' ASR models load on demand and share VAD/punc
+        self.device = device
+        self.models = ModelRegistry(model_name, self.model, self._load_asr_model)
         
-        # Load hotwords
-        self.hotwords = self._load_hotwords(config.hotwords_path)
+        # Load hotwords (re-checked for changes on later calls)
+        with timer.phase("hotwords"):
+            self.hotword_store = HotwordStore(config.hotwords_path, loader=self._load_hotwords)
+            self.hotwords = self.hotword_store.text
+            self.hotword_sets = HotwordSetCache()
+            if config.backend != "onnx" and install_compiled_hotwords(self.model):
+                self._precompile_hotwords()
         
+        self.startup_timings = timer.as_dict()
         self._initialized = True
-        print("✅ ASR model loaded. Service ready.")
+        print(f"✅ ASR model loaded. Service ready. ({timer.summary()})")
+    
+    def _load_snapshot(self, directory: str, models: Dict[str, str], device: str) -> Tuple[Optional[object], Optional[str]]:
+        """(pipeline, hub) from a snapshot directory, or (None, None) if it can't be used"""
+        manifest = read_manifest(directory)
+        reason = mismatch(manifest, models)
+        if reason is None:
+            try:
+                print(f"📦 Loading pipeline snapshot from {directory}")
+                return load_snapshot(directory, device), manifest.get("hub")
+            except Exception as e:
+                reason = str(e)
+        print(f"⚠️  Ignoring model snapshot {directory}: {reason}")
+        return None, None
+    
+    def _resolve_local_models(self, names: List[str]) -> Tuple[Optional[str], Dict[str, str]]:
+        """Hub and local directories of the models if all are cached (see model_loader.py)"""
+        if config.model_source == "online":
+            return None, {}
+        hubs = [config.model_hub] if config.model_hub in ("ms", "hf") else ["ms", "hf"]
+        hub, local = resolve_all(names, hubs)
+        if hub is None and config.model_source == "offline":
+            raise RuntimeError(
+                f"ASR_MODEL_SOURCE=offline but not all of {names} are cached locally "
+                f"(run scripts/download_models.py on a machine with network access)"
+            )
+        return hub, local
+    
+    def _load_pipeline_parallel(self, asr_kwargs: dict, vad_kwargs: dict, punc_kwargs: dict, timer: StartupTimer):
+        """Load the ASR, VAD and punctuation models concurrently and join them into one pipeline"""
+        def build(phase: str, kwargs: dict):
+            with timer.phase(phase):
+                return AutoModel(**{"disable_update": True, **kwargs})
+        
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="model-load") as pool:
+            asr = pool.submit(build, "asr", asr_kwargs)
+            vad = pool.submit(build, "vad", vad_kwargs)
+            punc = pool.submit(build, "punc", punc_kwargs)
+            model, vad, punc = asr.result(), vad.result(), punc.result()
+        
+        attach_sub_models(model, {
+            "vad_model": vad.model, "vad_kwargs": vad.kwargs,
+            "punc_model": punc.model, "punc_kwargs": punc.kwargs,
+        })
+        return model
+    
+    def _load_asr_model(self, name: str):
+        """Build an ASR-only model (VAD/punc are attached by the registry)"""
+        if config.backend == "onnx":
+            from .onnx_backend import OnnxPipeline
+            return OnnxPipeline(
+                model=name,
+                vad_model=None,
+                punc_model=None,
+                quantize=config.onnx_quantize,
+                intra_op_threads=config.onnx_intra_op_threads,
+            )
+        return AutoModel(
+            model=resolve_local(name, self.hub) or name, device=self.device, hub=self.hub, disable_update=True
+        )
     
     def _load_hotwords(self, filepath: str) -> str:
         """Load hotwords from file"""
-        if not os.path.exists(filepath):
-            print(f"⚠️  Hotwords file not found: {filepath}")
-            return ""
+        return load_hotwords_file(filepath)
+    
+    def _precompile_hotwords(self):
+        try:
+            precompile_hotwords(self.model, self.hotwords)
+        except Exception as e:
+            print(f"⚠️  Hotword precompile failed, compiling on first use: {e}")
+    
+    def refresh_hotwords(self) -> str:
+        """Pick up hotword edits (file or Redis) without touching the models"""
+        text = self.hotword_store.current()
+        if text != self.hotwords:
+            self.hotwords = text
+            if config.backend != "onnx":
+                self._precompile_hotwords()
+        return self.hotwords
+    
+    def resolve_hotwords(self, hotword_set: Optional[str] = None, hotwords: Optional[str] = None) -> Optional[str]:
+        """
+        Resolve a request's hotwords
         
+        Args:
+            hotword_set: ID of a registered hotword set
+            hotwords: Inline hotword list (takes precedence over hotword_set)
+            
+        Returns:
+            Hotword text, or None to use the global list
+        """
+        if hotwords:
+            return parse_hotwords(hotwords)
+        if not hotword_set or hotword_set == DEFAULT_SET_ID:
+            return None
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                lines = [line.strip() for line in f.readlines() if line.strip()]
-                hotwords = " ".join(lines)
-                print(f"✅ Loaded {len(lines)} hotwords")
-                return hotwords
+            text = self.hotword_sets.get(hotword_set)
         except Exception as e:
-            print(f"⚠️  Failed to load hotwords: {e}")
-            return ""
+            print(f"⚠️  Failed to load hotword set '{hotword_set}': {e}")
+            return None
+        if text is None:
+            print(f"⚠️  Unknown hotword set '{hotword_set}', using global hotwords")
+        return text
     
     def cleanup(self):
-        """Force memory cleanup after inference to prevent memory leaks"""
-        gc.collect()
-        gc.collect()  # Run twice to handle weak references
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-            torch.cuda.synchronize()
+        """
+        Release memory right away
+        
+        recognize() no longer does this per call; workers leave the decision
+        to the memory governor (src/utils/memory.py).
+        """
+        release_memory()
     
-    def recognize(self, audio_path: str) -> dict:
+    def recognize(
+        self,
+        audio: Union[str, bytes, np.ndarray],
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        hotwords: Optional[str] = None,
+        language: Optional[str] = None,
+        batch_size_s: Optional[int] = None,
+        merge_length_s: Optional[int] = None
+    ) -> dict:
         """
-        Recognize speech from audio file
+        Recognize speech from an audio file, WAV/PCM bytes or a PCM array
         
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file, raw WAV (or 16-bit PCM) bytes,
+                or a mono float32 NumPy array
+            sample_rate: Sample rate of a NumPy array input (ignored otherwise)
+            hotwords: Hotword text for this call (see resolve_hotwords);
+                None uses the global list
+            language: Task language; picks the model (see registry.py)
+            batch_size_s / merge_length_s: Per-task batching (None: see batching.py)
             
         Returns:
             dict with keys: text, duration, status, error (optional)
         """
-        if not os.path.exists(audio_path):
-            return {
-                "status": "failed",
-                "error": f"File not found: {audio_path}",
-                "text": "",
-                "duration": 0.0
-            }
+        samples = None
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            try:
+                samples, sample_rate = decode_audio_bytes(bytes(audio))
+            except ValueError as e:
+                return {
+                    "status": "failed",
+                    "error": f"Invalid audio data: {e}",
+                    "text": "",
+                    "duration": 0.0
+                }
+            label = f"<{len(audio)} bytes>"
+        elif isinstance(audio, np.ndarray):
+            samples = audio.astype(np.float32, copy=False)
+            label = f"<{len(samples)} samples>"
+        else:
+            audio_path = audio
+            if not os.path.exists(audio_path):
+                return {
+                    "status": "failed",
+                    "error": f"File not found: {audio_path}",
+                    "text": "",
+                    "duration": 0.0
+                }
+            label = os.path.basename(audio_path)
         
         try:
-            print(f"🎤 Recognizing: {os.path.basename(audio_path)}")
+            batch = plan_batch(
+                samples_duration(samples, sample_rate) if samples is not None else 0.0,
+                batch_size_s, merge_length_s
+            )
+            print(f"🎤 Recognizing: {label} (batch_size_s={batch.batch_size_s}, "
+                  f"merge_length_s={batch.merge_length_s})")
+            
+            # In-memory input is handed to FunASR as a PCM array; "fs" lets it
+            # resample when the source is not 16 kHz
+            generate_kwargs = {}
+            if samples is not None:
+                model_input = samples
+                generate_kwargs["fs"] = sample_rate
+            else:
+                model_input = audio_path
             
             # Perform recognition
-            res = self.model.generate(
-                input=audio_path,
-                hotword=self.hotwords,
+            res = self.models.for_language(language).generate(
+                input=model_input,
+                hotword=hotwords if hotwords is not None else self.refresh_hotwords(),
                 use_itn=config.use_itn,
-                batch_size_s=config.batch_size,
+                batch_size_s=batch.batch_size_s,
                 merge_vad=config.merge_vad,
-                merge_length_s=config.merge_length_s
+                merge_length_s=batch.merge_length_s,
+                **generate_kwargs
             )
             
             # Extract result
@@ -166,15 +363,16 @@ class SpeechRecognizer:
                 # Get duration
                 duration = res[0].get("duration", 0.0)
                 if duration == 0.0:
-                    try:
-                        import soundfile as sf
-                        duration = sf.info(audio_path).duration
-                    except ImportError:
-                        pass
+                    if samples is not None:
+                        duration = samples_duration(samples, sample_rate)
+                    else:
+                        try:
+                            import soundfile as sf
+                            duration = sf.info(audio_path).duration
+                        except ImportError:
+                            pass
                 
-                # Cleanup intermediate tensors and release memory
                 del res
-                self.cleanup()
                 
                 return {
                     "status": "success",
@@ -183,7 +381,6 @@ class SpeechRecognizer:
                 }
             else:
                 del res
-                self.cleanup()
                 return {
                     "status": "failed",
                     "error": "Empty recognition result",
@@ -193,10 +390,187 @@ class SpeechRecognizer:
                 
         except Exception as e:
             print(f"❌ Recognition failed: {e}")
-            self.cleanup()  # Cleanup on error too
             return {
                 "status": "failed",
                 "error": str(e),
                 "text": "",
                 "duration": 0.0
             }
+    
+    def recognize_batch(
+        self,
+        inputs: List[Union[bytes, np.ndarray]],
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        hotwords: Optional[List[Optional[str]]] = None,
+        punctuate: bool = True
+    ) -> List[dict]:
+        """
+        Recognize several short in-memory clips with one batched ASR pass
+        
+        Intended for stream chunks: clips skip VAD segmentation and go
+        through the ASR model together, then punctuation runs per text.
+        Falls back to per-clip recognize() if the batched call fails.
+        
+        Args:
+            inputs: WAV/PCM bytes or mono float32 arrays
+            sample_rate: Sample rate for array inputs
+            hotwords: Per-input hotword text (None entries use the global list)
+            punctuate: Run punctuation per text; False returns raw ASR text
+                (punctuation is then applied later with punctuate())
+            
+        Returns:
+            One result dict per input, in input order
+        """
+        if hotwords is None:
+            hotwords = [None] * len(inputs)
+        if len(inputs) == 1 and punctuate:
+            return [self.recognize(inputs[0], sample_rate, hotwords=hotwords[0])]
+        
+        results: List[Optional[dict]] = [None] * len(inputs)
+        # FunASR takes a single "fs" and hotword list per call, so batch by both
+        groups = {}
+        for i, item in enumerate(inputs):
+            if isinstance(item, np.ndarray):
+                samples, sr = item.astype(np.float32, copy=False), sample_rate
+            else:
+                try:
+                    samples, sr = decode_audio_bytes(bytes(item))
+                except ValueError as e:
+                    results[i] = {
+                        "status": "failed",
+                        "error": f"Invalid audio data: {e}",
+                        "text": "",
+                        "duration": 0.0
+                    }
+                    continue
+            groups.setdefault((sr, hotwords[i]), []).append((i, samples))
+        
+        for (sr, hotword), members in groups.items():
+            indices = [i for i, _ in members]
+            clips = [samples for _, samples in members]
+            try:
+                print(f"🎤 Recognizing batch of {len(clips)} clips")
+                res = self.model.inference(
+                    clips,
+                    key=[f"clip{i}" for i in indices],
+                    batch_size=len(clips),
+                    hotword=hotword if hotword is not None else self.refresh_hotwords(),
+                    fs=sr
+                )
+                texts = [r.get("text", "") for r in res]
+                if len(texts) != len(clips):
+                    raise RuntimeError(f"Expected {len(clips)} results, got {len(texts)}")
+                del res
+                
+                for i, samples, text in zip(indices, clips, texts):
+                    if punctuate:
+                        text = self.punctuate(text)
+                    results[i] = {
+                        "status": "success",
+                        "text": text,
+                        "duration": samples_duration(samples, sr),
+                    }
+            except Exception as e:
+                print(f"⚠️  Batched recognition failed ({e}), falling back to per-clip")
+                for i, samples in members:
+                    results[i] = self.recognize(samples, sr, hotwords=hotword)
+        
+        return results
+    
+    def punctuate(self, text: str) -> str:
+        """
+        Run the punctuation model over text
+        
+        Returns:
+            Punctuated text (unchanged if there is no punctuation model)
+        """
+        punc_model = getattr(self.model, "punc_model", None)
+        if punc_model is None or not text:
+            return text
+        res = self.model.inference(text, model=punc_model, kwargs=getattr(self.model, "punc_kwargs", None))
+        return res[0].get("text", text) if res else text
+    
+    def detect_segments(
+        self,
+        samples: np.ndarray,
+        sample_rate: int = TARGET_SAMPLE_RATE
+    ) -> List[List[int]]:
+        """
+        Run VAD only and return speech segments
+        
+        Args:
+            samples: Mono float32 PCM
+            sample_rate: Sample rate of samples
+            
+        Returns:
+            List of [beg_ms, end_ms] segments in time order
+        """
+        vad_segments = getattr(self.model, "vad_segments", None)
+        if vad_segments is not None:
+            # ONNX backend runs at 16 kHz only
+            if sample_rate != TARGET_SAMPLE_RATE:
+                from .onnx_backend import load_samples
+                samples = load_samples(samples, sample_rate)
+            return vad_segments(samples)
+        
+        res = self.model.inference(
+            samples,
+            model=self.model.vad_model,
+            kwargs=self.model.vad_kwargs,
+            fs=sample_rate
+        )
+        return [list(seg) for seg in (res[0].get("value", []) if res else [])]
+    
+    def recognize_progressive(
+        self,
+        samples: np.ndarray,
+        sample_rate: int = TARGET_SAMPLE_RATE,
+        segment_s: int = 30,
+        on_progress: Optional[Callable[[int, int, str], None]] = None,
+        hotwords: Optional[str] = None,
+        language: Optional[str] = None,
+        batch_size_s: Optional[int] = None,
+        merge_length_s: Optional[int] = None
+    ) -> dict:
+        """
+        Recognize long audio span by span, reporting partial text as it goes
+        
+        The audio is split on VAD boundaries into spans of about segment_s
+        seconds; after each span on_progress(done, total, text_so_far) is
+        called.
+        
+        Returns:
+            dict with keys: text, duration, status, error (optional)
+        """
+        duration = samples_duration(samples, sample_rate)
+        try:
+            spans = merge_segments(self.detect_segments(samples, sample_rate), segment_s * 1000)
+        except Exception as e:
+            print(f"⚠️  VAD pre-pass failed ({e}), recognizing in one piece")
+            spans = []
+        if len(spans) < 2:
+            return self.recognize(
+                samples, sample_rate, hotwords=hotwords, language=language,
+                batch_size_s=batch_size_s, merge_length_s=merge_length_s
+            )
+        
+        per_ms = sample_rate / 1000
+        texts = []
+        for done, (beg_ms, end_ms) in enumerate(spans, start=1):
+            res = self.recognize(
+                samples[int(beg_ms * per_ms):int(end_ms * per_ms)], sample_rate,
+                hotwords=hotwords, language=language,
+                batch_size_s=batch_size_s, merge_length_s=merge_length_s
+            )
+            if res["status"] != "success":
+                res["duration"] = duration
+                return res
+            texts.append(res["text"])
+            if on_progress is not None:
+                on_progress(done, len(spans), "".join(texts))
+        
+        return {
+            "status": "success",
+            "text": "".join(texts),
+            "duration": duration,
+        }
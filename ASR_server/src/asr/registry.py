@@ -0,0 +1,132 @@
+"""Per-Language ASR Model Registry
+
+Tasks carry a ``language``; ``language_models`` maps languages to ASR models
+(e.g. ``en=paraformer-en,yue=<model>``). Languages without an entry use
+``model_name``, the default model loaded at startup.
+
+Extra models are loaded on first use without their own VAD and punctuation
+models: they reuse the default pipeline's fsmn-vad and ct-punc instances,
+so each language costs only its ASR weights. Resident extra models are kept
+in least-recently-used order and evicted once their total size exceeds
+``model_memory_mb`` (0 = no limit). The default model is never evicted.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+from .config import config
+from .model_loader import SUB_MODEL_ATTRS, attach_sub_models
+from ..utils.memory import release_memory
+
+
+def parse_language_models(spec: str) -> Dict[str, str]:
+    """Parse ``lang=model,lang=model`` into a dict (languages lower-cased)"""
+    mapping = {}
+    for item in spec.split(","):
+        language, sep, model = item.partition("=")
+        if sep and language.strip() and model.strip():
+            mapping[language.strip().lower()] = model.strip()
+    return mapping
+
+
+def model_nbytes(model: Any) -> int:
+    """Size of a FunASR model's weights (0 if it has no torch module)"""
+    inner = getattr(model, "model", None)
+    parameters = getattr(inner, "parameters", None)
+    if parameters is None:
+        return 0
+    return sum(p.numel() * p.element_size() for p in parameters())
+
+
+@dataclass
+class ResidentModel:
+    name: str
+    model: Any
+    nbytes: int
+    last_used: float
+
+
+class ModelRegistry:
+    """Lazily loaded ASR models by language, LRU-evicted under a memory budget"""
+
+    def __init__(self, default_name: str, default_model: Any, loader: Callable[[str], Any]):
+        """
+        Args:
+            default_name: Name of the model loaded at startup
+            default_model: That model (its VAD/punc are shared with the others)
+            loader: Builds an ASR-only model by name
+        """
+        self.default_name = default_name
+        self.default_model = default_model
+        self.loader = loader
+        self.models: "OrderedDict[str, ResidentModel]" = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+    def resolve(self, language: Optional[str] = None) -> str:
+        """Model name serving a language"""
+        if not language:
+            return self.default_name
+        return parse_language_models(config.language_models).get(language.lower(), self.default_name)
+
+    def get(self, name: str) -> Any:
+        """Model by name, loading it (and evicting others) if needed"""
+        if name == self.default_name:
+            return self.default_model
+        entry = self.models.get(name)
+        if entry is not None:
+            self.models.move_to_end(name)
+            entry.last_used = time.time()
+            return entry.model
+
+        print(f"🔄 Loading ASR model '{name}'...")
+        rss_before = psutil.Process().memory_info().rss
+        model = self.loader(name)
+        attach_sub_models(model, {
+            attr: getattr(self.default_model, attr) for attr in SUB_MODEL_ATTRS
+            if hasattr(self.default_model, attr)
+        })
+        nbytes = model_nbytes(model) or max(0, psutil.Process().memory_info().rss - rss_before)
+        self.models[name] = ResidentModel(name, model, nbytes, time.time())
+        self.loads += 1
+        print(f"✅ ASR model '{name}' loaded ({nbytes / 1024 / 1024:.0f} MB)")
+        self.evict(keep=name)
+        return model
+
+    def for_language(self, language: Optional[str] = None) -> Any:
+        return self.get(self.resolve(language))
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Drop least recently used models until within model_memory_mb"""
+        budget = config.model_memory_mb * 1024 * 1024
+        evicted = []
+        if budget <= 0:
+            return evicted
+        total = sum(entry.nbytes for entry in self.models.values())
+        for name in list(self.models):
+            if total <= budget:
+                break
+            if name == keep:
+                continue
+            total -= self.models.pop(name).nbytes
+            evicted.append(name)
+        if evicted:
+            self.evictions += len(evicted)
+            release_memory()
+            print(f"🧹 Evicted ASR models: {', '.join(evicted)}")
+        return evicted
+
+    def resident(self) -> List[str]:
+        """Names of models in memory, default first"""
+        return [self.default_name, *self.models]
+
+    def stats(self) -> dict:
+        return {
+            "resident": self.resident(),
+            "resident_mb": round(sum(e.nbytes for e in self.models.values()) / 1024 / 1024, 1),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
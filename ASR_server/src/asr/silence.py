@@ -0,0 +1,63 @@
+"""Energy-Based Silence Prefilter
+
+Stream chunks that are silent (or only room noise) still cost a full model
+call. This check runs before the model: the chunk is cut into fixed frames,
+and a frame counts as speech when its energy (variance, so a DC offset does
+not count) is above ``silence_threshold_db`` dBFS. A chunk with less than
+``silence_min_speech_ms`` of such frames is treated as silent and gets an
+empty result without being recognized.
+
+The thresholds are deliberately conservative: a skipped chunk is lost text,
+while a chunk that passes only costs the model call it would have cost
+anyway. ``scripts/benchmark_silence.py`` compares the decisions against
+fsmn-vad on real recordings.
+"""
+from typing import Optional
+
+import numpy as np
+
+from .config import config
+
+
+FRAME_MS = 20
+
+# Floor for silent frames (digital zero would be -inf)
+MIN_DB = -120.0
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """Per-frame energy in dBFS of non-overlapping frames (a trailing partial frame is dropped)"""
+    frame = max(1, sample_rate * frame_ms // 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = np.asarray(samples[:count * frame], dtype=np.float32).reshape(count, frame)
+    power = frames.var(axis=1)
+    return np.maximum(10.0 * np.log10(power + 1e-12), MIN_DB)
+
+
+def speech_ms(samples: np.ndarray, sample_rate: int, threshold_db: float, frame_ms: int = FRAME_MS) -> float:
+    """Milliseconds of frames whose energy is above threshold_db"""
+    return float(np.count_nonzero(frame_energy_db(samples, sample_rate, frame_ms) > threshold_db) * frame_ms)
+
+
+def is_silent(
+    samples: np.ndarray,
+    sample_rate: int,
+    threshold_db: Optional[float] = None,
+    min_speech_ms: Optional[float] = None
+) -> bool:
+    """
+    Whether a clip has too little energetic audio to be worth recognizing
+
+    Args:
+        samples: Mono float32 samples in [-1, 1]
+        sample_rate: Sample rate of samples
+        threshold_db: Speech frame threshold in dBFS (default: silence_threshold_db)
+        min_speech_ms: Speech needed to pass (default: silence_min_speech_ms)
+    """
+    if threshold_db is None:
+        threshold_db = config.silence_threshold_db
+    if min_speech_ms is None:
+        min_speech_ms = config.silence_min_speech_ms
+    return speech_ms(samples, sample_rate, threshold_db) < min_speech_ms
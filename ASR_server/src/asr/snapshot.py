@@ -0,0 +1,120 @@
+"""Pre-Built Pipeline Snapshots
+
+``AutoModel(...)`` parses each model's config, builds tokenizer, frontend
+and network, then reads and remaps the checkpoint, on every worker start.
+A snapshot stores the finished pipeline (ASR + VAD + punc, exactly as the
+worker assembles it) so a start only has to unpickle it:
+
+    <snapshot_dir>/manifest.json   -> format, models, hub, funasr/torch versions
+    <snapshot_dir>/pipeline.pt     -> the AutoModel, torch zip format
+
+``pipeline.pt`` is loaded with ``torch.load(mmap=True)``: weights stay in the
+file's pages and are read in on first use, and on CPU every worker on the
+host maps the same page-cache pages instead of holding its own copy.
+
+Build with ``python scripts/build_model_snapshot.py <dir>`` and point
+``ASR_MODEL_SNAPSHOT`` at the directory. A snapshot built for other models
+or another funasr/torch version is ignored (the worker loads normally), so
+rebuild it after upgrading.
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+PIPELINE_FILE = "pipeline.pt"
+
+# (module attribute, kwargs attribute) pairs of a FunASR AutoModel
+PIPELINE_PARTS = (("model", "kwargs"), ("vad_model", "vad_kwargs"), ("punc_model", "punc_kwargs"))
+
+
+def library_versions() -> Dict[str, str]:
+    import torch
+    try:
+        import funasr
+        funasr_version = funasr.__version__
+    except ImportError:
+        funasr_version = ""
+    return {"torch": torch.__version__, "funasr": funasr_version}
+
+
+def write_snapshot(pipeline: Any, directory: str, models: Dict[str, str], hub: str) -> dict:
+    """
+    Save a CPU pipeline and its manifest (pipeline.pt is replaced atomically)
+
+    Args:
+        pipeline: FunASR AutoModel with VAD/punc attached, on CPU
+        directory: Snapshot directory (created if missing)
+        models: {"asr": name, "vad": name, "punc": name} as configured
+        hub: Hub the models came from
+
+    Returns:
+        The manifest
+    """
+    import torch
+
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    tmp = path / f".{PIPELINE_FILE}.tmp"
+    torch.save(pipeline, tmp)
+    os.replace(tmp, path / PIPELINE_FILE)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "models": models,
+        "hub": hub,
+        "versions": library_versions(),
+        "bytes": (path / PIPELINE_FILE).stat().st_size,
+    }
+    (path / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    try:
+        return json.loads((Path(directory) / MANIFEST_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def mismatch(manifest: Optional[dict], models: Dict[str, str]) -> Optional[str]:
+    """Why a snapshot can't be used for these models (None if it can)"""
+    if manifest is None:
+        return "no manifest"
+    if manifest.get("format") != FORMAT_VERSION:
+        return f"format {manifest.get('format')} != {FORMAT_VERSION}"
+    if manifest.get("models") != models:
+        return f"built for {manifest.get('models')}"
+    if manifest.get("versions") != library_versions():
+        return f"built with {manifest.get('versions')}"
+    return None
+
+
+def load_snapshot(directory: str, device: str = "cpu") -> Any:
+    """
+    Load a snapshot pipeline with memory-mapped weights
+
+    On a non-CPU device the weights are copied there (and the mapping is
+    only used while loading).
+    """
+    import torch
+
+    pipeline = torch.load(
+        Path(directory) / PIPELINE_FILE, map_location="cpu", mmap=True, weights_only=False
+    )
+    if device != "cpu":
+        for module_attr, kwargs_attr in PIPELINE_PARTS:
+            module = getattr(pipeline, module_attr, None)
+            if module is not None:
+                module.to(device)
+            kwargs = getattr(pipeline, kwargs_attr, None)
+            if isinstance(kwargs, dict):
+                kwargs["device"] = device
+        store = getattr(pipeline, "_store_base_configs", None)
+        if callable(store):
+            store()
+    return pipeline
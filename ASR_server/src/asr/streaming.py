@@ -0,0 +1,221 @@
+"""Online (Streaming) Recognition
+
+Offline mode recognizes every stream chunk as an independent file through
+VAD + paraformer + punctuation. Online mode instead feeds chunks into
+FunASR's streaming paraformer (``paraformer-zh-streaming``), which keeps
+encoder/decoder cache state between calls, so context carries across chunk
+boundaries and each chunk only pays for its own frames.
+
+State is kept per ``session_id``:
+
+- audio shorter than one decoding stride is buffered until the next chunk
+- sessions idle longer than ``streaming_session_idle_s`` are evicted
+- when the estimated size of all session caches exceeds
+  ``streaming_cache_mb`` (or there are more than ``streaming_max_sessions``),
+  the least recently used sessions are evicted
+
+A session must be fed by one worker: with several workers enable
+``stream_affinity`` (src/worker/affinity.py).
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .audio import TARGET_SAMPLE_RATE, decode_audio_bytes, resample_linear
+from .config import config
+
+
+# One encoder frame of the streaming paraformer is 60 ms at 16 kHz
+SAMPLES_PER_FRAME = 960
+
+
+def parse_chunk_size(text: str) -> List[int]:
+    """Parse "0,10,5" into [0, 10, 5] (look-back, chunk, look-ahead frames)"""
+    parts = [int(p) for p in text.split(",") if p.strip()]
+    if len(parts) != 3 or parts[1] <= 0:
+        raise ValueError(f"streaming_chunk_size must be three frame counts like 0,10,5, got {text!r}")
+    return parts
+
+
+def state_nbytes(obj: Any) -> int:
+    """Approximate bytes held by tensors / arrays inside a (nested) cache"""
+    if isinstance(obj, dict):
+        return sum(state_nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(state_nbytes(v) for v in obj)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if hasattr(obj, "element_size") and hasattr(obj, "nelement"):
+        return obj.element_size() * obj.nelement()
+    return 0
+
+
+@dataclass
+class StreamSession:
+    """Decoder state of one streaming session"""
+    session_id: str
+    cache: Dict[str, Any] = field(default_factory=dict)
+    pending: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    text: str = ""
+    audio_s: float = 0.0
+    chunks: int = 0
+    nbytes: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class StreamingRecognizer:
+    """Streaming paraformer with per-session cache, idle eviction and a memory cap"""
+
+    def __init__(self, model=None, hub: Optional[str] = None):
+        """
+        Args:
+            model: Preloaded streaming model (loaded from config if None)
+            hub: Model hub ("ms" / "hf") used when loading
+        """
+        self.chunk_size = parse_chunk_size(config.streaming_chunk_size)
+        self.stride = self.chunk_size[1] * SAMPLES_PER_FRAME
+        self.sessions: "OrderedDict[str, StreamSession]" = OrderedDict()
+        self.evictions = {"idle": 0, "memory": 0, "closed": 0}
+        self.model = model if model is not None else self._load_model(hub)
+
+    def _load_model(self, hub: Optional[str]):
+        from funasr import AutoModel
+        from .model_loader import resolve_local
+
+        hub = hub or (config.model_hub if config.model_hub != "auto" else "ms")
+        print(f"🔄 Loading streaming model {config.streaming_model_name}...")
+        model = AutoModel(
+            model=resolve_local(config.streaming_model_name, hub) or config.streaming_model_name,
+            device="cuda" if config.use_gpu else "cpu",
+            hub=hub,
+            disable_update=True,
+        )
+        print("✅ Streaming model loaded.")
+        return model
+
+    @property
+    def cache_bytes(self) -> int:
+        return sum(s.nbytes for s in list(self.sessions.values()))
+
+    def _session(self, session_id: str) -> StreamSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = StreamSession(session_id)
+            self.sessions[session_id] = session
+        self.sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def _decode(self, session: StreamSession, samples: np.ndarray, is_final: bool) -> str:
+        result = self.model.generate(
+            input=samples,
+            cache=session.cache,
+            is_final=is_final,
+            chunk_size=self.chunk_size,
+            encoder_chunk_look_back=config.streaming_encoder_look_back,
+            decoder_chunk_look_back=config.streaming_decoder_look_back,
+        )
+        if not result:
+            return ""
+        return result[0].get("text", "")
+
+    def feed(self, session_id: str, audio, sample_rate: int = TARGET_SAMPLE_RATE,
+             is_final: bool = False) -> dict:
+        """
+        Decode the next piece of a session's audio.
+
+        Args:
+            session_id: Stream session
+            audio: WAV / 16-bit PCM bytes or a mono float32 array
+            sample_rate: Sample rate of an array input
+            is_final: Last chunk of the session; flushes buffered audio and
+                drops the session state
+
+        Returns:
+            dict with keys: text (newly decoded), session_text (hypothesis so
+            far), duration (audio seconds in this piece), status, error
+        """
+        try:
+            if isinstance(audio, (bytes, bytearray)):
+                samples, sample_rate = decode_audio_bytes(bytes(audio))
+            else:
+                samples = np.asarray(audio, dtype=np.float32)
+            if sample_rate != TARGET_SAMPLE_RATE:
+                samples = resample_linear(samples, sample_rate, TARGET_SAMPLE_RATE)
+
+            self.evict_idle()
+            session = self._session(session_id)
+            buffered = np.concatenate([session.pending, samples]) if len(session.pending) else samples
+
+            # Only whole strides are decoded; the tail waits for the next chunk
+            usable = len(buffered) if is_final else len(buffered) - len(buffered) % self.stride
+            text = ""
+            for start in range(0, usable, self.stride):
+                piece = buffered[start:start + self.stride]
+                last = is_final and start + self.stride >= usable
+                text += self._decode(session, piece, last)
+            if is_final and usable == 0:
+                text += self._decode(session, np.zeros(0, dtype=np.float32), True)
+            session.pending = buffered[usable:].copy()
+
+            session.text += text
+            session.audio_s += len(samples) / TARGET_SAMPLE_RATE
+            session.chunks += 1
+            session.nbytes = state_nbytes(session.cache) + session.pending.nbytes
+            result = {
+                "status": "success",
+                "text": text,
+                "session_text": session.text,
+                "duration": len(samples) / TARGET_SAMPLE_RATE,
+            }
+            if is_final:
+                self.close(session_id)
+            else:
+                self.enforce_memory_cap(keep=session_id)
+            return result
+        except Exception as e:
+            return {"status": "failed", "text": "", "session_text": "", "duration": 0.0, "error": str(e)}
+
+    def close(self, session_id: str, reason: str = "closed") -> Optional[StreamSession]:
+        """Drop a session's state"""
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.evictions[reason] += 1
+        return session
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Evict sessions idle longer than streaming_session_idle_s"""
+        if config.streaming_session_idle_s <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        cutoff = now - config.streaming_session_idle_s
+        evicted = [sid for sid, s in self.sessions.items() if s.last_used < cutoff]
+        for sid in evicted:
+            self.close(sid, "idle")
+        return evicted
+
+    def enforce_memory_cap(self, keep: Optional[str] = None) -> List[str]:
+        """Evict least recently used sessions until under the session / memory caps"""
+        max_bytes = config.streaming_cache_mb * 1024 * 1024
+        evicted = []
+        for sid in list(self.sessions):
+            over_count = 0 < config.streaming_max_sessions < len(self.sessions)
+            over_bytes = 0 < max_bytes < self.cache_bytes
+            if not (over_count or over_bytes):
+                break
+            if sid == keep:
+                continue
+            self.close(sid, "memory")
+            evicted.append(sid)
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for logs / heartbeats"""
+        return {
+            "sessions": len(self.sessions),
+            "cache_mb": round(self.cache_bytes / 1024 / 1024, 1),
+            "evictions": dict(self.evictions),
+        }
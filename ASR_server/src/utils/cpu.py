@@ -0,0 +1,166 @@
+"""CPU Core Partitioning for Worker Processes
+
+Several workers on one host otherwise each let torch (and onnxruntime) start
+one thread per core, oversubscribing the machine. These helpers split a core
+budget into disjoint per-worker sets, pin each worker to its set and size the
+inference thread pools to match.
+
+Linux only for affinity; elsewhere only thread counts are applied.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+NODE_SYSFS = Path("/sys/devices/system/node")
+
+# Thread-pool variables read by OpenMP / MKL / OpenBLAS at library load time
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def parse_cpulist(text: str) -> List[int]:
+    """Parse a Linux cpulist such as "0-3,8,10-11" """
+    cores = []
+    for part in text.strip().split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cores.extend(range(int(lo), int(hi) + 1))
+        else:
+            cores.append(int(part))
+    return sorted(set(cores))
+
+
+def format_cpulist(cores: List[int]) -> str:
+    """Format cores back into compact cpulist form"""
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(f"{lo}-{hi}" if hi > lo else str(lo) for lo, hi in ranges)
+
+
+def available_cores() -> List[int]:
+    """Cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def numa_nodes() -> Dict[int, List[int]]:
+    """NUMA node -> cores, from sysfs (empty if unavailable)"""
+    nodes = {}
+    for node_dir in sorted(NODE_SYSFS.glob("node[0-9]*")):
+        try:
+            cores = parse_cpulist((node_dir / "cpulist").read_text())
+        except OSError:
+            continue
+        if cores:
+            nodes[int(node_dir.name[4:])] = cores
+    return nodes
+
+
+def _split(cores: List[int], parts: int) -> List[List[int]]:
+    """Split cores into `parts` contiguous, near-equal chunks"""
+    base, extra = divmod(len(cores), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        size = base + (1 if i < extra else 0)
+        chunks.append(cores[start:start + size])
+        start += size
+    return chunks
+
+
+def partition_cores(
+    cores: List[int],
+    workers: int,
+    nodes: Optional[Dict[int, List[int]]] = None,
+) -> List[List[int]]:
+    """
+    Split a core budget into one disjoint core set per worker.
+
+    With ``nodes`` (NUMA node -> cores), workers are spread across nodes in
+    proportion to each node's share of the budget and never straddle a node.
+    If there are fewer cores than workers, workers share cores round-robin.
+
+    Returns:
+        List of core lists, one per worker
+    """
+    if workers <= 0:
+        return []
+    if len(cores) < workers:
+        return [[cores[i % len(cores)]] for i in range(workers)] if cores else [[] for _ in range(workers)]
+
+    budget = set(cores)
+    node_cores = [sorted(budget & set(c)) for _, c in sorted((nodes or {}).items())]
+    node_cores = [c for c in node_cores if c]
+    if len(node_cores) < 2 or workers < len(node_cores):
+        return _split(sorted(cores), workers)
+
+    # Workers per node proportional to cores, at least one each
+    counts = [max(1, round(workers * len(c) / len(cores))) for c in node_cores]
+    while sum(counts) > workers:
+        counts[counts.index(max(counts))] -= 1
+    while sum(counts) < workers:
+        shares = [len(c) / n for c, n in zip(node_cores, counts)]
+        counts[shares.index(max(shares))] += 1
+
+    partition = []
+    for node, count in zip(node_cores, counts):
+        if len(node) < count:
+            partition.extend([[node[i % len(node)]] for i in range(count)])
+        else:
+            partition.extend(_split(node, count))
+    return partition
+
+
+def apply_cpu_partition(cores: List[int], intra_threads: Optional[int] = None, inter_threads: int = 1) -> int:
+    """
+    Pin the current process to `cores` and size inference thread pools.
+
+    Args:
+        cores: Cores for this worker
+        intra_threads: Intra-op threads (default: one per core)
+        inter_threads: Inter-op threads
+
+    Returns:
+        Intra-op thread count applied
+    """
+    threads = intra_threads or max(1, len(cores))
+
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+    # The ONNX backend reads its thread count from config at model load
+    from ..asr.config import config
+    config.onnx_intra_op_threads = threads
+
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(inter_threads)
+    except RuntimeError:
+        # Only settable before the first inter-op parallel work (e.g. after fork)
+        pass
+    return threads
+
+
+def worker_cores(index: int, workers: int, budget: Optional[str] = None, numa: bool = False) -> List[int]:
+    """
+    Cores for worker `index` (0-based) of `workers` sharing `budget`.
+
+    Args:
+        index: Worker index
+        workers: Total workers sharing the budget
+        budget: cpulist of cores to share (default: all available cores)
+        numa: Keep each worker within one NUMA node
+    """
+    cores = parse_cpulist(budget) if budget else available_cores()
+    partition = partition_cores(cores, workers, numa_nodes() if numa else None)
+    return partition[index % len(partition)]
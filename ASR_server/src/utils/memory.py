@@ -0,0 +1,159 @@
+"""Adaptive Memory Governor
+
+Workers used to run ``gc.collect()`` four times, ``malloc_trim(0)`` and a
+CUDA sync after every task, including 1-second stream chunks. The governor
+instead samples RSS after each task and only releases memory when:
+
+- ``memory_release_every_n`` tasks have passed since the last release,
+- RSS grew more than ``memory_growth_mb`` above the post-release baseline,
+- RSS is trending up faster than ``memory_slope_mb_per_task`` over the
+  last ``memory_slope_window`` tasks, or
+- the task was marked heavy (long batch audio), where a release is cheap
+  relative to the work.
+
+Time spent releasing is tracked and exposed through ``stats()``.
+"""
+import ctypes
+import gc
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+import psutil
+
+from ..asr.config import config
+
+
+# Memory release using malloc_trim (Linux)
+try:
+    _libc = ctypes.CDLL("libc.so.6")
+    _malloc_trim = _libc.malloc_trim
+    _malloc_trim.argtypes = [ctypes.c_size_t]
+    _malloc_trim.restype = ctypes.c_int
+except (OSError, AttributeError):
+    _malloc_trim = None
+
+
+def release_memory() -> None:
+    """Collect garbage, return freed heap to the OS and drop cached CUDA blocks"""
+    gc.collect()
+    if _malloc_trim:
+        _malloc_trim(0)
+    try:
+        import torch
+        if torch.cuda.is_available() and torch.cuda.is_initialized():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+def _slope(values) -> float:
+    """Least-squares slope of values against their index"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    den = sum((i - mean_x) ** 2 for i in range(n))
+    return num / den
+
+
+class MemoryGovernor:
+    """Decides when a worker pays for garbage collection and heap trimming"""
+
+    def __init__(self):
+        self._proc = psutil.Process()
+        self.baseline_mb = self._rss_mb()
+        self.peak_mb = self.baseline_mb
+        self._window = deque(maxlen=max(2, config.memory_slope_window))
+        self._since_release = 0
+        self.tasks = 0
+        self.releases = 0
+        self.release_time_s = 0.0
+        self.reasons: Counter = Counter()
+
+    def _rss_mb(self) -> float:
+        return self._proc.memory_info().rss / 1024 / 1024
+
+    def _reason(self, rss_mb: float, heavy: bool) -> Optional[str]:
+        if config.memory_mode == "always" or heavy:
+            return "heavy" if heavy else "always"
+        if config.memory_release_every_n > 0 and self._since_release >= config.memory_release_every_n:
+            return "every_n"
+        if config.memory_growth_mb > 0 and rss_mb - self.baseline_mb > config.memory_growth_mb:
+            return "growth"
+        if (
+            config.memory_slope_mb_per_task > 0
+            and len(self._window) == self._window.maxlen
+            and _slope(self._window) > config.memory_slope_mb_per_task
+        ):
+            return "slope"
+        return None
+
+    def after_task(self, heavy: bool = False) -> Optional[str]:
+        """
+        Record a finished task and release memory if a threshold is crossed.
+
+        Args:
+            heavy: The task processed a lot of audio; release unconditionally
+
+        Returns:
+            The reason memory was released, or None
+        """
+        if config.memory_mode == "off":
+            return None
+
+        self.tasks += 1
+        self._since_release += 1
+        rss_mb = self._rss_mb()
+        self.peak_mb = max(self.peak_mb, rss_mb)
+        self._window.append(rss_mb)
+
+        reason = self._reason(rss_mb, heavy)
+        if reason is not None:
+            self.release(reason)
+        return reason
+
+    def release(self, reason: str = "manual") -> float:
+        """
+        Release memory now.
+
+        Returns:
+            Megabytes of RSS returned
+        """
+        before = self._rss_mb()
+        start = time.perf_counter()
+        release_memory()
+        self.release_time_s += time.perf_counter() - start
+
+        self.baseline_mb = self._rss_mb()
+        self._window.clear()
+        self._since_release = 0
+        self.releases += 1
+        self.reasons[reason] += 1
+        return before - self.baseline_mb
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for logs / heartbeats"""
+        return {
+            "tasks": self.tasks,
+            "releases": self.releases,
+            "release_time_s": round(self.release_time_s, 3),
+            "reasons": dict(self.reasons),
+            "rss_mb": round(self._rss_mb(), 1),
+            "baseline_mb": round(self.baseline_mb, 1),
+            "peak_mb": round(self.peak_mb, 1),
+            "slope_mb_per_task": round(_slope(self._window), 3),
+        }
+
+
+_governor: Optional[MemoryGovernor] = None
+
+
+def get_memory_governor() -> MemoryGovernor:
+    """Per-process governor (created lazily so forked children get their own baseline)"""
+    global _governor
+    if _governor is None:
+        _governor = MemoryGovernor()
+    return _governor
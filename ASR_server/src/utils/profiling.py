@@ -0,0 +1,154 @@
+"""Opt-in Allocation Profiling
+
+``tracemalloc`` hooks every Python allocation, so it is only switched on for
+tasks picked by one of:
+
+- sampling: ``alloc_profile_mode = "sampled"`` profiles ~1 in
+  ``alloc_profile_sample_n`` tasks
+- forcing: ``force_profile(task_id)`` sets ``asr:profile:force:<task_id>``;
+  the worker that picks the task up profiles it and clears the flag. A
+  forced task that fans out re-arms its flag so every ``batch_part``
+  (profiled as ``<task_id>#<i>``) is profiled too; the merge clears it
+
+Each profile (top allocation sites, traced peak, RSS delta) is appended to
+the capped Redis stream ``asr:profile:alloc``.
+"""
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from .redis_client import redis_client
+from .logger import log_error, log_worker
+from ..asr.config import config
+
+
+PROFILE_STREAM = "asr:profile:alloc"
+FORCE_PREFIX = "asr:profile:force:"
+
+# Stack depth recorded per allocation (deeper traces cost more)
+TRACE_FRAMES = 5
+
+
+@dataclass
+class ProfileSession:
+    """One running allocation profile"""
+    task_id: str
+    kind: str
+    reason: str
+    started_at: float
+    rss_start_mb: float
+    owns_tracing: bool
+
+
+def force_profile(task_id: str, ttl: int = 86400):
+    """Profile task_id the next time a worker runs it"""
+    redis_client.client.set(f"{FORCE_PREFIX}{task_id}", "1", ex=ttl)
+
+
+def clear_forced_profile(task_id: str, pipe=None):
+    """Drop a pending force flag (e.g. once a fanned-out task's parts are merged)"""
+    (pipe if pipe is not None else redis_client.client).delete(f"{FORCE_PREFIX}{task_id}")
+
+
+def recent_profiles(count: int = 20) -> List[Dict[str, Any]]:
+    """Most recent profiles, newest first"""
+    entries = redis_client.client.xrevrange(PROFILE_STREAM, count=count)
+    profiles = []
+    for msg_id, fields in entries:
+        profile = dict(fields)
+        profile["id"] = msg_id
+        profile["top"] = json.loads(profile.get("top", "[]"))
+        profiles.append(profile)
+    return profiles
+
+
+class AllocationProfiler:
+    """Decides per task whether to trace allocations and records the result"""
+
+    def __init__(self):
+        self._proc = psutil.Process()
+
+    def _rss_mb(self) -> float:
+        return self._proc.memory_info().rss / 1024 / 1024
+
+    def _reason(self, task_id: str, parent_id: Optional[str] = None) -> Optional[str]:
+        try:
+            if redis_client.client.delete(f"{FORCE_PREFIX}{task_id}"):
+                return "forced"
+            # Parts share the parent's flag, so it is only read here
+            if parent_id and redis_client.client.exists(f"{FORCE_PREFIX}{parent_id}"):
+                return "forced"
+        except Exception:
+            pass
+        if config.alloc_profile_mode == "sampled" and config.alloc_profile_sample_n > 0:
+            if random.random() < 1.0 / config.alloc_profile_sample_n:
+                return "sampled"
+        return None
+
+    def start(self, task_id: str, kind: str, parent_id: Optional[str] = None) -> Optional[ProfileSession]:
+        """
+        Start tracing if this task (or the parent it is part of) is selected.
+
+        Returns:
+            A session to pass to finish(), or None if the task is not profiled
+        """
+        reason = self._reason(task_id, parent_id)
+        if reason is None:
+            return None
+        owns = not tracemalloc.is_tracing()
+        if owns:
+            tracemalloc.start(TRACE_FRAMES)
+        else:
+            tracemalloc.reset_peak()
+        return ProfileSession(task_id, kind, reason, time.time(), self._rss_mb(), owns)
+
+    def finish(self, session: Optional[ProfileSession]) -> Optional[Dict[str, Any]]:
+        """Stop tracing and store the profile in the Redis stream."""
+        if session is None:
+            return None
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if session.owns_tracing:
+                tracemalloc.stop()
+
+        stats = snapshot.statistics("lineno")[:config.alloc_profile_top]
+        del snapshot
+        top = [
+            {
+                "site": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                "size_kb": round(s.size / 1024, 1),
+                "count": s.count,
+            }
+            for s in stats
+        ]
+        profile = {
+            "task_id": session.task_id,
+            "kind": session.kind,
+            "reason": session.reason,
+            "duration_s": round(time.time() - session.started_at, 3),
+            "peak_mb": round(peak / 1024 / 1024, 2),
+            "current_mb": round(current / 1024 / 1024, 2),
+            "rss_delta_mb": round(self._rss_mb() - session.rss_start_mb, 2),
+            "top": json.dumps(top),
+        }
+        try:
+            redis_client.client.xadd(
+                PROFILE_STREAM, profile, maxlen=config.alloc_profile_stream_maxlen, approximate=True
+            )
+        except Exception as e:
+            log_error(f"Failed to store allocation profile for task={session.task_id}: {e}")
+        log_worker(
+            f"PROFILE task={session.task_id} ({session.reason}) peak={profile['peak_mb']}MB "
+            f"rss_delta={profile['rss_delta_mb']:+}MB"
+        )
+        return profile
+
+
+allocation_profiler = AllocationProfiler()
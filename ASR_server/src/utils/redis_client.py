@@ -63,10 +63,10 @@ class RedisClient:
             return False
     
     # Task-related operations
-    def save_task_result(self, task_id: str, result: Dict[str, Any], ttl: int = 3600):
-        """Save task result with TTL"""
+    def save_task_result(self, task_id: str, result: Dict[str, Any], ttl: int = 3600, pipe=None):
+        """Save task result with TTL (queued on `pipe` if given)"""
         key = f"asr:task:{task_id}"
-        self._client.setex(key, ttl, json.dumps(result))
+        (pipe if pipe is not None else self._client).setex(key, ttl, json.dumps(result))
     
     def get_task_result(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get task result"""
@@ -74,27 +74,159 @@ class RedisClient:
         data = self._client.get(key)
         return json.loads(data) if data else None
     
+    def save_task_progress(self, task_id: str, result: Dict[str, Any], ttl: int = 3600) -> bool:
+        """
+        Save a "processing" result only while the task is still processing
+        (compare-and-set), so a late progress update can't replace a final
+        result written meanwhile. `created_at` is carried over.
+        
+        Returns:
+            True if written
+        """
+        key = f"asr:task:{task_id}"
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                data = pipe.get(key)
+                current = json.loads(data) if data else {}
+                if current.get("status") not in (None, "processing"):
+                    return False
+                pipe.multi()
+                pipe.setex(key, ttl, json.dumps({**result, "created_at": current.get("created_at", "")}))
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                # The result changed under us (final result or newer progress)
+                return False
+    
+    def save_task_request(self, task_id: str, params: Dict[str, Any], ttl: int = 86400):
+        """Save a batch task's submit parameters (replayed by retry)"""
+        self._client.setex(f"asr:task:{task_id}:request", ttl, json.dumps(params))
+    
+    def get_task_request(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get a batch task's submit parameters"""
+        data = self._client.get(f"asr:task:{task_id}:request")
+        return json.loads(data) if data else None
+    
     def delete_task(self, task_id: str):
         """Delete task result"""
-        self._client.delete(f"asr:task:{task_id}")
+        self._client.delete(f"asr:task:{task_id}", f"asr:task:{task_id}:request")
+        self.delete_task_parts(task_id)
     
-    def cache_stream_result(self, session_id: str, result: Dict[str, Any], ttl: int = 60):
+    # Fan-out (long audio split into sub-tasks) operations
+    def save_task_part(self, task_id: str, index: int, part: Dict[str, Any], ttl: int = 3600) -> int:
+        """
+        Store one sub-task result of a fanned-out task.
+        
+        Returns:
+            Number of parts stored so far
+        """
+        key = f"asr:task:{task_id}:parts"
+        pipe = self._client.pipeline()
+        pipe.hset(key, str(index), json.dumps(part))
+        pipe.expire(key, ttl)
+        pipe.hlen(key)
+        return pipe.execute()[-1]
+    
+    def get_task_parts(self, task_id: str) -> Dict[int, Dict[str, Any]]:
+        """Get all stored sub-task results keyed by part index"""
+        data = self._client.hgetall(f"asr:task:{task_id}:parts")
+        return {int(k): json.loads(v) for k, v in data.items()}
+    
+    def claim_task_merge(self, task_id: str, owner: str = "1", ttl: int = 3600) -> bool:
+        """
+        Claim the right to merge a fanned-out task (only one caller wins).
+        The same owner (a redelivered part) may claim again, so a merge whose
+        results were never written is redone.
+        """
+        key = f"asr:task:{task_id}:merged"
+        if self._client.set(key, owner, nx=True, ex=ttl):
+            return True
+        return self._client.get(key) == owner
+    
+    def delete_task_parts(self, task_id: str, pipe=None):
+        """Delete sub-task bookkeeping of a fanned-out task (queued on `pipe` if given)"""
+        (pipe if pipe is not None else self._client).delete(
+            f"asr:task:{task_id}:parts", f"asr:task:{task_id}:merged"
+        )
+    
+    # Hotword set operations (per-tenant biasing lists)
+    def save_hotword_set(self, set_id: str, text: str) -> int:
+        """
+        Create or replace a named hotword set.
+        
+        Returns:
+            New version of the set
+        """
+        key = f"asr:hotword_set:{set_id}"
+        pipe = self._client.pipeline()
+        pipe.hset(key, "text", text)
+        pipe.hincrby(key, "version", 1)
+        return pipe.execute()[-1]
+    
+    def get_hotword_set(self, set_id: str) -> Optional[Dict[str, Any]]:
+        """Get a hotword set as {"text", "version"}"""
+        data = self._client.hgetall(f"asr:hotword_set:{set_id}")
+        if not data:
+            return None
+        return {"text": data.get("text", ""), "version": int(data.get("version", 0))}
+    
+    def get_hotword_set_version(self, set_id: str) -> Optional[int]:
+        """Get only the version of a hotword set (cheap freshness check)"""
+        version = self._client.hget(f"asr:hotword_set:{set_id}", "version")
+        return int(version) if version is not None else None
+    
+    def delete_hotword_set(self, set_id: str) -> bool:
+        """Delete a hotword set"""
+        return bool(self._client.delete(f"asr:hotword_set:{set_id}"))
+    
+    def list_hotword_sets(self) -> List[str]:
+        """List registered hotword set IDs"""
+        prefix = "asr:hotword_set:"
+        return sorted(key[len(prefix):] for key in self._client.scan_iter(f"{prefix}*"))
+    
+    def cache_stream_result(self, session_id: str, result: Dict[str, Any], ttl: int = 60, pipe=None):
         """
         Cache stream result in a Redis List for reliability.
         Used to recover results if client disconnects.
+        (Queued on `pipe` if given.)
         """
         key = f"asr:results:{session_id}"
+        client = pipe if pipe is not None else self._client
         # RPUSH to append to list
-        self._client.rpush(key, json.dumps(result))
+        client.rpush(key, json.dumps(result))
         # Set TTL to expire the whole list after inactivity
-        self._client.expire(key, ttl)
+        client.expire(key, ttl)
+    
+    def add_silence_skip(self, session_id: str, audio_s: float, ttl: int = 3600, pipe=None):
+        """Count a stream chunk skipped by the silence prefilter (queued on `pipe` if given)"""
+        key = f"asr:session:silence:{session_id}"
+        own = pipe is None
+        if own:
+            pipe = self._client.pipeline()
+        pipe.hincrby(key, "chunks", 1)
+        pipe.hincrbyfloat(key, "audio_s", audio_s)
+        pipe.expire(key, ttl)
+        if own:
+            pipe.execute()
+    
+    def get_silence_stats(self, session_id: str) -> Dict[str, float]:
+        """Chunks and seconds of audio of a session skipped as silent"""
+        stats = self._client.hgetall(f"asr:session:silence:{session_id}")
+        return {"chunks": int(stats.get("chunks", 0)), "audio_s": float(stats.get("audio_s", 0.0))}
+    
+    def get_stream_finals(self, session_id: str) -> List[Dict[str, Any]]:
+        """Punctuated segments of a stream session (deferred punctuation mode), in order"""
+        key = f"asr:session:final:{session_id}"
+        return [json.loads(s) for s in self._client.lrange(key, 0, -1)]
     
     # History operations
-    def add_to_history(self, record: Dict[str, Any], max_records: int = 10):
-        """Add record to history (keep latest N)"""
+    def add_to_history(self, record: Dict[str, Any], max_records: int = 10, pipe=None):
+        """Add record to history (keep latest N; queued on `pipe` if given)"""
         key = "asr:history:latest"
-        self._client.lpush(key, json.dumps(record))
-        self._client.ltrim(key, 0, max_records - 1)
+        client = pipe if pipe is not None else self._client
+        client.lpush(key, json.dumps(record))
+        client.ltrim(key, 0, max_records - 1)
     
     def get_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get history records"""
@@ -0,0 +1,223 @@
+"""Content-Hash Result Cache and In-Flight Deduplication
+
+Batch results are cached under the SHA-256 of the uploaded audio plus
+everything else that changes the transcript (model, language, hotwords,
+batch size and VAD merge length):
+
+    asr:cache:<sha256>:<model>:<language>:<hotwords>:<decoding>   -> JSON result (TTL)
+    asr:cache:index                                               -> ZSET key -> last use
+
+The index bounds the number of entries; the least recently used are evicted.
+
+Identical uploads that arrive while the first one is still being recognized
+attach to it instead of being queued again:
+
+    asr:inflight:<cache key>           -> leader task_id (SET NX)
+    asr:inflight:<cache key>:waiters   -> LIST of attached task_ids
+
+The worker that finishes the leader stores the cache entry, clears the
+in-flight key and then answers every waiter. When the leader's message is
+reclaimed from a dead worker its claim is renewed for the retry, and when it
+is dead-lettered the waiters are answered with the failure. A submitter re-checks the
+cache and the leader after attaching, so a waiter added after the drain
+either finds the cached result or runs the job itself.
+"""
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .redis_client import redis_client
+from ..asr.config import config
+
+
+CACHE_PREFIX = "asr:cache:"
+CACHE_INDEX_KEY = "asr:cache:index"
+INFLIGHT_PREFIX = "asr:inflight:"
+
+# Result fields copied from the leader into cached / attached task records
+RESULT_FIELDS = ("status", "text", "duration", "error", "processing_time", "progress", "parts_total")
+
+_global_hotwords = None
+
+
+def _global_hotword_digest() -> str:
+    """Digest of the global hotword list as this process currently sees it"""
+    global _global_hotwords
+    if _global_hotwords is None:
+        from ..asr.hotwords import HotwordStore
+        _global_hotwords = HotwordStore(config.hotwords_path)
+    _global_hotwords.current()
+    return _global_hotwords.digest
+
+
+def hotword_tag(hotword_set: Optional[str] = None, hotwords: Optional[str] = None) -> str:
+    """Cache-key component identifying the hotwords a task is recognized with"""
+    from ..asr.hotwords import DEFAULT_SET_ID, parse_hotwords
+
+    if hotwords:
+        return "i-" + hashlib.sha1(parse_hotwords(hotwords).encode("utf-8")).hexdigest()[:12]
+    if hotword_set and hotword_set != DEFAULT_SET_ID:
+        return f"s-{hotword_set}-{redis_client.get_hotword_set_version(hotword_set) or 0}"
+    return "g-" + _global_hotword_digest()
+
+
+def model_tag() -> str:
+    """Cache-key component identifying the model that produced a result"""
+    quant = "-int8" if config.backend == "onnx" and config.onnx_quantize else ""
+    return f"{config.model_name}-{config.backend}{quant}"
+
+
+def decode_tag(batch_size: Optional[int] = None, merge_length_s: Optional[int] = None) -> str:
+    """Cache-key component for the per-request decoding options, with defaults resolved"""
+    if batch_size is None:
+        batch_size = "auto" if config.batch_mode == "adaptive" else config.batch_size
+    return f"b{batch_size}-m{merge_length_s or config.merge_length_s}"
+
+
+def build_cache_key(content_hash: str, language: str, hotword_set: Optional[str] = None,
+                    hotwords: Optional[str] = None, batch_size: Optional[int] = None,
+                    merge_length_s: Optional[int] = None) -> str:
+    """Full cache key for an upload"""
+    return (f"{CACHE_PREFIX}{content_hash}:{model_tag()}:{language}:{hotword_tag(hotword_set, hotwords)}"
+            f":{decode_tag(batch_size, merge_length_s)}")
+
+
+def _result_for(task_id: str, result: Dict[str, Any], **extra) -> Dict[str, Any]:
+    record = {k: result[k] for k in RESULT_FIELDS if k in result}
+    record.update(task_id=task_id, **extra)
+    return record
+
+
+class ResultCache:
+    """Redis-backed result cache with single-flight task deduplication"""
+
+    @property
+    def enabled(self) -> bool:
+        return config.result_cache_max_entries > 0
+
+    @property
+    def _client(self):
+        return redis_client.client
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for a key, refreshing its LRU position"""
+        data = self._client.get(cache_key)
+        if not data:
+            return None
+        self._client.zadd(CACHE_INDEX_KEY, {cache_key: time.time()})
+        return json.loads(data)
+
+    def put(self, cache_key: str, result: Dict[str, Any]):
+        """Store a successful result and evict beyond the configured size"""
+        ttl = config.result_cache_ttl_s
+        now = time.time()
+        pipe = self._client.pipeline()
+        pipe.setex(cache_key, ttl, json.dumps(_result_for("", result)))
+        pipe.zadd(CACHE_INDEX_KEY, {cache_key: now})
+        # Index entries whose key already expired
+        pipe.zremrangebyscore(CACHE_INDEX_KEY, "-inf", now - ttl)
+        pipe.zcard(CACHE_INDEX_KEY)
+        size = pipe.execute()[-1]
+
+        excess = size - config.result_cache_max_entries
+        if excess > 0:
+            evicted = [k for k, _ in self._client.zpopmin(CACHE_INDEX_KEY, excess)]
+            if evicted:
+                self._client.delete(*evicted)
+
+    def lookup_or_claim(self, cache_key: str, task_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Answer from cache, attach to an identical in-flight job, or lead.
+
+        Returns:
+            (cached result, None) on a cache hit,
+            (None, leader task_id) if task_id was attached to a running job,
+            (None, None) if task_id should be recognized (it is the leader)
+        """
+        cached = self.get(cache_key)
+        if cached is not None:
+            return cached, None
+
+        inflight = f"{INFLIGHT_PREFIX}{cache_key}"
+        ttl = config.result_cache_inflight_ttl_s
+        if self._client.set(inflight, task_id, nx=True, ex=ttl):
+            return None, None
+
+        pipe = self._client.pipeline()
+        pipe.rpush(f"{inflight}:waiters", task_id)
+        pipe.expire(f"{inflight}:waiters", ttl)
+        pipe.get(inflight)
+        leader = pipe.execute()[-1]
+
+        # The leader may have finished before we attached
+        cached = self.get(cache_key)
+        if cached is None and leader is None:
+            # ...without a cacheable result: run it ourselves
+            if not self._client.set(inflight, task_id, nx=True, ex=ttl):
+                leader = self._client.get(inflight)
+        if cached is not None or leader is None:
+            # Not waiting after all: a later leader must not answer us
+            self._client.lrem(f"{inflight}:waiters", 0, task_id)
+            return cached, None
+        return None, leader
+
+    def release(self, cache_key: str, task_id: str):
+        """Give up leadership (e.g. enqueueing failed) without a result"""
+        inflight = f"{INFLIGHT_PREFIX}{cache_key}"
+        if self._client.get(inflight) == task_id:
+            self._client.delete(inflight)
+
+    def renew(self, cache_key: str, task_id: str) -> bool:
+        """
+        Keep a leader's claim and its waiters alive while its task is retried
+        (e.g. reclaimed from a dead worker), re-taking the claim if it expired.
+
+        Returns:
+            False if another task leads this key now
+        """
+        inflight = f"{INFLIGHT_PREFIX}{cache_key}"
+        ttl = config.result_cache_inflight_ttl_s
+        if not self._client.set(inflight, task_id, nx=True, ex=ttl) and self._client.get(inflight) != task_id:
+            return False
+        pipe = self._client.pipeline()
+        pipe.expire(inflight, ttl)
+        pipe.expire(f"{inflight}:waiters", ttl)
+        pipe.execute()
+        return True
+
+    def complete(self, cache_key: str, task_id: str, result: Dict[str, Any]) -> List[str]:
+        """
+        Record the leader's final result: cache it if it succeeded and answer
+        every attached task with a copy.
+
+        Returns:
+            Task IDs of the waiters that were answered
+        """
+        # Partially failed merges are not worth replaying
+        if result.get("status") == "done" and not result.get("parts_failed"):
+            self.put(cache_key, result)
+        # Release before draining: anyone attaching after the drain then
+        # finds either the cached result or no leader, never a stale one
+        self.release(cache_key, task_id)
+
+        inflight = f"{INFLIGHT_PREFIX}{cache_key}"
+        pipe = self._client.pipeline()
+        pipe.lrange(f"{inflight}:waiters", 0, -1)
+        pipe.delete(f"{inflight}:waiters")
+        waiters = pipe.execute()[0]
+        for waiter in waiters:
+            redis_client.save_task_result(waiter, _result_for(
+                waiter, result, created_at=result.get("created_at", ""), deduplicated_from=task_id
+            ))
+        return waiters
+
+    def complete_task(self, payload: Dict[str, Any], task_id: str, result: Dict[str, Any]) -> List[str]:
+        """complete() for a task payload; tasks submitted without a cache key have no waiters"""
+        cache_key = payload.get("cache_key")
+        if not cache_key:
+            return []
+        return self.complete(cache_key, task_id, result)
+
+
+result_cache = ResultCache()
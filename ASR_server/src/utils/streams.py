@@ -12,6 +12,7 @@ import time
 from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 import redis
+import redis.asyncio
 
 # Configuration from environment
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -19,6 +20,10 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 STREAM_NAME = os.getenv("STREAM_NAME", "asr_tasks")
 CONSUMER_GROUP = os.getenv("CONSUMER_GROUP", "asr_workers")
+DLQ_STREAM = f"{STREAM_NAME}:dlq"  # Messages that exceeded the delivery limit
+
+# Fields added to dead-lettered messages (dropped again on replay)
+DLQ_FIELDS = ("original_id", "deliveries", "consumer", "dead_at")
 
 
 @dataclass
@@ -30,6 +35,31 @@ class StreamMessage:
     payload: Dict[str, Any]
     timestamp: int
     origin: str
+    stream: str = STREAM_NAME  # Stream the message was read from (for XACK)
+
+
+def parse_entries(result) -> List[StreamMessage]:
+    """StreamMessages from an XREADGROUP reply (unparseable entries are skipped)"""
+    messages = []
+    for stream_name, entries in result or []:
+        for msg_id, data in entries:
+            if not data:
+                continue  # deleted (e.g. trimmed) while pending
+            try:
+                msg = StreamMessage(
+                    msg_id=msg_id,
+                    task_type=data.get("type", "batch"),
+                    task_id=data.get("task_id", ""),
+                    payload=json.loads(data.get("payload", "{}")),
+                    timestamp=int(data.get("timestamp", 0)),
+                    origin=data.get("origin", "unknown"),
+                    stream=stream_name
+                )
+                messages.append(msg)
+            except (json.JSONDecodeError, ValueError) as e:
+                # Log error but continue processing
+                print(f"Error parsing message {msg_id}: {e}")
+    return messages
 
 
 class StreamsClient:
@@ -103,16 +133,19 @@ class StreamsClient:
     # Consumer Methods (for unified_worker)
     # ========================================================================
     
-    def ensure_consumer_group(self) -> bool:
+    def ensure_consumer_group(self, stream: Optional[str] = None) -> bool:
         """
         Create consumer group if it doesn't exist.
         
+        Args:
+            stream: Stream to create the group on (default: the shared task stream)
+            
         Returns:
             True if group was created or already exists
         """
         try:
             self._redis.xgroup_create(
-                STREAM_NAME,
+                stream or STREAM_NAME,
                 CONSUMER_GROUP,
                 id="0",  # Read from beginning
                 mkstream=True  # Create stream if it doesn't exist
@@ -128,7 +161,8 @@ class StreamsClient:
         self,
         worker_name: str,
         batch_size: int = 10,
-        block_ms: int = 1000
+        block_ms: int = 1000,
+        extra_streams: Optional[List[str]] = None
     ) -> List[StreamMessage]:
         """
         Read tasks from stream using XREADGROUP.
@@ -137,51 +171,37 @@ class StreamsClient:
             worker_name: Unique worker identifier
             batch_size: Max messages to read
             block_ms: Blocking timeout in milliseconds
+            extra_streams: Further streams read in the same call (e.g. the
+                worker's own inbox), each with a CONSUMER_GROUP group
             
         Returns:
             List of StreamMessage objects
         """
+        streams = {STREAM_NAME: ">"}  # Only new messages
+        for extra in extra_streams or []:
+            streams[extra] = ">"
         result = self._redis.xreadgroup(
             groupname=CONSUMER_GROUP,
             consumername=worker_name,
-            streams={STREAM_NAME: ">"},  # Only new messages
+            streams=streams,
             count=batch_size,
             block=block_ms
         )
         
-        if not result:
-            return []
-        
-        messages = []
-        for stream_name, entries in result:
-            for msg_id, data in entries:
-                try:
-                    msg = StreamMessage(
-                        msg_id=msg_id,
-                        task_type=data.get("type", "batch"),
-                        task_id=data.get("task_id", ""),
-                        payload=json.loads(data.get("payload", "{}")),
-                        timestamp=int(data.get("timestamp", 0)),
-                        origin=data.get("origin", "unknown")
-                    )
-                    messages.append(msg)
-                except (json.JSONDecodeError, ValueError) as e:
-                    # Log error but continue processing
-                    print(f"Error parsing message {msg_id}: {e}")
-        
-        return messages
+        return parse_entries(result)
     
-    def ack_task(self, msg_id: str) -> int:
+    def ack_task(self, msg_id: str, stream: Optional[str] = None) -> int:
         """
         Acknowledge a processed message via XACK.
         
         Args:
             msg_id: Message ID to acknowledge
+            stream: Stream the message came from (default: the shared task stream)
             
         Returns:
             Number of messages acknowledged (0 or 1)
         """
-        return self._redis.xack(STREAM_NAME, CONSUMER_GROUP, msg_id)
+        return self._redis.xack(stream or STREAM_NAME, CONSUMER_GROUP, msg_id)
     
     # ========================================================================
     # Monitoring Methods
@@ -268,27 +288,147 @@ class StreamsClient:
             
             if not result or len(result) < 2:
                 return []
-            
-            messages = []
-            for msg_id, data in result[1]:
-                if data is None:
-                    continue
-                try:
-                    msg = StreamMessage(
-                        msg_id=msg_id,
-                        task_type=data.get("type", "batch"),
-                        task_id=data.get("task_id", ""),
-                        payload=json.loads(data.get("payload", "{}")),
-                        timestamp=int(data.get("timestamp", 0)),
-                        origin=data.get("origin", "unknown")
-                    )
-                    messages.append(msg)
-                except (json.JSONDecodeError, ValueError):
-                    pass
-            
-            return messages
+            return parse_entries([(STREAM_NAME, result[1])])
         except redis.ResponseError:
             return []
+    
+    # ========================================================================
+    # Reclamation / Dead-Letter Methods
+    # ========================================================================
+    
+    def get_pending_entries(self, min_idle_ms: int = 0, count: int = 100) -> List[Dict[str, Any]]:
+        """
+        Pending entries idle for at least min_idle_ms via XPENDING.
+        
+        Returns:
+            Dicts with message_id, consumer, time_since_delivered (ms) and
+            times_delivered
+        """
+        try:
+            return self._redis.xpending_range(
+                STREAM_NAME, CONSUMER_GROUP, min="-", max="+", count=count, idle=min_idle_ms
+            )
+        except redis.ResponseError:
+            return []
+    
+    def claim_messages(self, msg_ids: List[str], worker_name: str, min_idle_ms: int) -> List[StreamMessage]:
+        """
+        Take over pending messages via XCLAIM. A message that another worker
+        claimed (or that was redelivered) since min_idle_ms is skipped, so
+        only one claimer wins.
+        """
+        if not msg_ids:
+            return []
+        entries = self._redis.xclaim(
+            STREAM_NAME, CONSUMER_GROUP, worker_name, min_idle_time=min_idle_ms, message_ids=msg_ids
+        )
+        return parse_entries([(STREAM_NAME, entries)])
+    
+    def dead_letter(self, msg: StreamMessage, deliveries: int, consumer: str) -> str:
+        """
+        Move a message to the dead-letter stream and acknowledge it.
+        
+        Returns:
+            Message ID in the dead-letter stream
+        """
+        fields = {
+            "type": msg.task_type,
+            "task_id": msg.task_id,
+            "payload": json.dumps(msg.payload),
+            "timestamp": msg.timestamp,
+            "origin": msg.origin,
+            "original_id": msg.msg_id,
+            "deliveries": deliveries,
+            "consumer": consumer,
+            "dead_at": int(time.time() * 1000),
+        }
+        pipe = self._redis.pipeline()
+        pipe.xadd(DLQ_STREAM, fields, maxlen=5000, approximate=True)
+        pipe.xack(msg.stream, CONSUMER_GROUP, msg.msg_id)
+        return pipe.execute()[0]
+    
+    def get_dead_letters(self, count: int = 100, oldest_first: bool = False) -> List[Dict[str, Any]]:
+        """Dead-lettered messages (newest first by default), as {"id", **fields}"""
+        if oldest_first:
+            entries = self._redis.xrange(DLQ_STREAM, count=count)
+        else:
+            entries = self._redis.xrevrange(DLQ_STREAM, count=count)
+        return [{"id": entry_id, **fields} for entry_id, fields in entries]
+    
+    def get_dead_letter(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            entries = self._redis.xrange(DLQ_STREAM, min=entry_id, max=entry_id)
+        except redis.ResponseError:
+            return None  # not a stream ID
+        return {"id": entries[0][0], **entries[0][1]} if entries else None
+    
+    def get_dead_letter_count(self) -> int:
+        return self._redis.xlen(DLQ_STREAM)
+    
+    def replay_dead_letter(self, entry_id: str) -> Optional[str]:
+        """
+        Put a dead-lettered message back on the task stream (with a fresh
+        delivery count) and remove it from the dead-letter stream.
+        
+        Returns:
+            New message ID, or None if there is no such entry
+        """
+        entry = self.get_dead_letter(entry_id)
+        if entry is None:
+            return None
+        fields = {k: v for k, v in entry.items() if k != "id" and k not in DLQ_FIELDS}
+        pipe = self._redis.pipeline()
+        pipe.xadd(STREAM_NAME, fields, maxlen=5000, approximate=True)
+        pipe.xdel(DLQ_STREAM, entry_id)
+        return pipe.execute()[0]
+    
+    def delete_dead_letter(self, entry_id: str) -> bool:
+        try:
+            return bool(self._redis.xdel(DLQ_STREAM, entry_id))
+        except redis.ResponseError:
+            return False
+
+
+class AsyncStreamsClient:
+    """
+    Consumer side of StreamsClient on redis.asyncio, for the async worker
+    loop. Not a singleton: the connection belongs to the running event loop.
+    """
+    
+    def __init__(self):
+        self._redis = redis.asyncio.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True
+        )
+    
+    @property
+    def redis(self) -> redis.asyncio.Redis:
+        return self._redis
+    
+    async def consume_tasks(
+        self,
+        worker_name: str,
+        batch_size: int = 10,
+        block_ms: int = 1000,
+        extra_streams: Optional[List[str]] = None
+    ) -> List[StreamMessage]:
+        """XREADGROUP new messages (see StreamsClient.consume_tasks)"""
+        streams = {STREAM_NAME: ">"}
+        for extra in extra_streams or []:
+            streams[extra] = ">"
+        result = await self._redis.xreadgroup(
+            groupname=CONSUMER_GROUP,
+            consumername=worker_name,
+            streams=streams,
+            count=batch_size,
+            block=block_ms
+        )
+        return parse_entries(result)
+    
+    async def close(self):
+        await self._redis.aclose()
 
 
 # Global singleton instance
@@ -312,15 +452,16 @@ def publish_task(
 def consume_tasks(
     worker_name: str,
     batch_size: int = 10,
-    block_ms: int = 1000
+    block_ms: int = 1000,
+    extra_streams: Optional[List[str]] = None
 ) -> List[StreamMessage]:
     """Consume tasks from the Redis Stream."""
-    return streams_client.consume_tasks(worker_name, batch_size, block_ms)
+    return streams_client.consume_tasks(worker_name, batch_size, block_ms, extra_streams)
 
 
-def ack_task(msg_id: str) -> int:
+def ack_task(msg_id: str, stream: Optional[str] = None) -> int:
     """Acknowledge a task."""
-    return streams_client.ack_task(msg_id)
+    return streams_client.ack_task(msg_id, stream)
 
 
 def get_pending_count() -> int:
@@ -328,6 +469,6 @@ def get_pending_count() -> int:
     return streams_client.get_pending_count()
 
 
-def ensure_consumer_group() -> bool:
+def ensure_consumer_group(stream: Optional[str] = None) -> bool:
     """Ensure consumer group exists."""
-    return streams_client.ensure_consumer_group()
+    return streams_client.ensure_consumer_group(stream)
@@ -0,0 +1,222 @@
+"""Session-Affine Routing of Stream Chunks
+
+Every worker reads the shared ``asr_tasks`` stream, so consecutive chunks of
+one session would otherwise land on arbitrary workers. With affinity enabled
+the first worker to see a session takes a lease on it:
+
+    asr:session:owner:<session_id>   -> worker name (TTL stream_affinity_lease_s,
+                                        refreshed on every chunk)
+
+A worker that reads a chunk of a session owned by another live worker
+forwards it to that worker's inbox and acknowledges it on the shared stream:
+
+    asr_tasks:worker:<worker name>   -> per-worker inbox (same consumer group)
+    asr:inboxes                      -> SET of worker names with an inbox
+
+Liveness is the worker heartbeat key. If the owner's heartbeat is gone the
+reader takes the session over, and whatever was left in the dead worker's
+inbox is moved back to the shared stream (``sweep_dead_inboxes``) in one
+transaction. Forwards never recreate a swept inbox.
+
+The same inboxes carry batch tasks to warm workers: heartbeats list the ASR
+models each worker has resident, and a task whose model is cold on the
+reading worker is forwarded (once) to a live worker that has it loaded
+(``warm_worker``).
+"""
+import json
+from typing import List, Optional
+
+import redis
+
+from src.utils.streams import CONSUMER_GROUP, STREAM_NAME, StreamMessage, streams_client
+from src.asr.config import config
+
+
+OWNER_PREFIX = "asr:session:owner:"
+INBOX_INDEX_KEY = "asr:inboxes"
+HEARTBEAT_KEY = "worker:{}:heartbeat"
+
+# Reads of a dead inbox retried when a forward races with the move
+REQUEUE_ATTEMPTS = 5
+
+
+def inbox_stream(worker_name: str) -> str:
+    """Name of a worker's inbox stream"""
+    return f"{STREAM_NAME}:worker:{worker_name}"
+
+
+def _message_fields(msg: StreamMessage) -> dict:
+    return {
+        "type": msg.task_type,
+        "task_id": msg.task_id,
+        "payload": json.dumps(msg.payload),
+        "timestamp": msg.timestamp,
+        "origin": msg.origin,
+    }
+
+
+class SessionRouter:
+    """Keeps each stream session on one worker, failing over when it dies"""
+
+    def __init__(self, worker_name: str, sessions: bool = True):
+        """
+        Args:
+            worker_name: This worker
+            sessions: Route stream chunks by session owner (stream_affinity);
+                False keeps only the inbox, for warm-model forwarding
+        """
+        self.worker_name = worker_name
+        self.sessions = sessions
+        self.inbox = inbox_stream(worker_name)
+        self.forwarded = 0
+        self.takeovers = 0
+
+    @property
+    def client(self) -> redis.Redis:
+        return streams_client.redis
+
+    def register(self):
+        """Create this worker's inbox and its consumer group"""
+        streams_client.ensure_consumer_group(self.inbox)
+        self.client.sadd(INBOX_INDEX_KEY, self.worker_name)
+
+    def is_alive(self, worker_name: str) -> bool:
+        return worker_name == self.worker_name or bool(self.client.exists(HEARTBEAT_KEY.format(worker_name)))
+
+    def _take(self, key: str, expected: Optional[str]) -> Optional[str]:
+        """Set the owner to us if it is still `expected`; returns the owner afterwards"""
+        lease = config.stream_affinity_lease_s
+        if expected is None:
+            if self.client.set(key, self.worker_name, nx=True, ex=lease):
+                return self.worker_name
+            return self.client.get(key)
+
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                current = pipe.get(key)
+                if current != expected:
+                    return current
+                pipe.multi()
+                pipe.set(key, self.worker_name, ex=lease)
+                pipe.execute()
+                return self.worker_name
+            except redis.WatchError:
+                # Someone else changed the owner first
+                return self.client.get(key)
+
+    def owner_for(self, session_id: str) -> str:
+        """
+        Resolve (and if needed claim) the worker that owns a session.
+
+        Returns:
+            Name of the live owner
+        """
+        key = f"{OWNER_PREFIX}{session_id}"
+        owner = self.client.get(key)
+        if owner == self.worker_name:
+            self.client.expire(key, config.stream_affinity_lease_s)
+            return owner
+        if owner is not None and self.is_alive(owner):
+            return owner
+
+        previous = owner
+        owner = self._take(key, owner)
+        if owner == self.worker_name and previous is not None:
+            self.takeovers += 1
+            self.requeue_inbox(previous)
+        return owner or self.worker_name
+
+    def route(self, messages: List[StreamMessage]) -> List[StreamMessage]:
+        """
+        Forward stream chunks owned by other workers to their inboxes.
+
+        Returns:
+            The messages this worker should process itself
+        """
+        mine = []
+        for msg in messages:
+            if msg.task_type != "stream" or not self.sessions:
+                mine.append(msg)
+                continue
+            owner = self.owner_for(msg.task_id)
+            if owner == self.worker_name:
+                mine.append(msg)
+                continue
+            self.forward(msg, owner)
+        return mine
+
+    def forward(self, msg: StreamMessage, worker_name: str):
+        """
+        Move a message to another worker's inbox (acked here). An inbox that
+        was already swept is not recreated (it would have no consumer group
+        and no index entry); the message goes back to the shared stream.
+        """
+        pipe = self.client.pipeline()
+        pipe.xadd(inbox_stream(worker_name), _message_fields(msg), maxlen=5000, approximate=True, nomkstream=True)
+        pipe.xack(msg.stream, CONSUMER_GROUP, msg.msg_id)
+        if pipe.execute()[0] is None:
+            self.client.xadd(STREAM_NAME, _message_fields(msg), maxlen=5000, approximate=True)
+        self.forwarded += 1
+
+    def warm_worker(self, model_name: str) -> Optional[str]:
+        """A live worker (other than us) whose heartbeat lists model_name as resident"""
+        for key in self.client.scan_iter(HEARTBEAT_KEY.format("*")):
+            try:
+                heartbeat = json.loads(self.client.get(key) or "{}")
+            except ValueError:
+                continue
+            worker_name = heartbeat.get("worker")
+            if worker_name and worker_name != self.worker_name and model_name in heartbeat.get("models", []):
+                return worker_name
+        return None
+
+    def release(self, session_id: str):
+        """Drop the lease on a finished session"""
+        key = f"{OWNER_PREFIX}{session_id}"
+        if self.client.get(key) == self.worker_name:
+            self.client.delete(key)
+
+    def requeue_inbox(self, worker_name: str) -> int:
+        """
+        Move everything left in a dead worker's inbox back to the shared stream.
+
+        Returns:
+            Number of messages requeued
+        """
+        if worker_name == self.worker_name:
+            return 0
+        # Only one sweeper per dead inbox
+        if not self.client.set(f"{inbox_stream(worker_name)}:sweep", self.worker_name, nx=True, ex=30):
+            return 0
+        stream = inbox_stream(worker_name)
+        with self.client.pipeline() as pipe:
+            for _ in range(REQUEUE_ATTEMPTS):
+                try:
+                    # A forward() landing between the read and the delete
+                    # aborts the move, so nothing is deleted unread
+                    pipe.watch(stream)
+                    entries = pipe.xrange(stream)
+                    pipe.multi()
+                    for _, fields in entries:
+                        pipe.xadd(STREAM_NAME, fields, maxlen=5000, approximate=True)
+                    pipe.delete(stream)
+                    pipe.srem(INBOX_INDEX_KEY, worker_name)
+                    pipe.execute()
+                    return len(entries)
+                except redis.WatchError:
+                    continue
+        # Still indexed: the next sweep tries again
+        self.client.delete(f"{stream}:sweep")
+        return 0
+
+    def sweep_dead_inboxes(self) -> int:
+        """Requeue the inboxes of every worker whose heartbeat has expired"""
+        moved = 0
+        for worker_name in self.client.smembers(INBOX_INDEX_KEY):
+            if not self.is_alive(worker_name):
+                moved += self.requeue_inbox(worker_name)
+        return moved
+
+    def stats(self) -> dict:
+        return {"forwarded": self.forwarded, "takeovers": self.takeovers}
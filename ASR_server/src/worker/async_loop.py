@@ -0,0 +1,163 @@
+"""Asyncio Worker Loop (ASR_WORKER_MODE=async)
+
+The default loop is strictly sequential, so the model sits idle during every
+Redis round trip: read, then process, then ack, then read again. The async
+loop splits this into three parts that overlap:
+
+    reader     -> XREADGROUP on redis.asyncio (with the stream batching window)
+                  into a queue holding up to ``worker_prefetch`` batches
+    inference  -> one dedicated thread runs the worker's handlers
+                  (UnifiedWorker._process_messages), batch after batch
+    writer     -> sends each finished task's result writes and XACKs
+                  (completion.py) while the next one is already running;
+                  completions that queue up meanwhile share one pipeline
+
+The next batch is read while the current one is decoded. A message is still
+acked only after its handler succeeds, so a message that fails, or is
+prefetched by a worker that then dies, stays pending as before. On shutdown
+reading stops, and the batches already read are processed and acked.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import redis
+
+from src.asr.config import config
+from src.utils.logger import log_error, log_worker
+from src.utils.streams import AsyncStreamsClient, StreamMessage
+from src.worker.completion import CompletionBatch, merge, write_async
+
+# How often housekeeping runs while no messages arrive
+IDLE_TICK_S = 1.0
+
+
+class AsyncWorkerLoop:
+    """Runs a UnifiedWorker with reads and acks overlapping inference"""
+
+    def __init__(self, worker, prefetch: int = 2):
+        """
+        Args:
+            worker: UnifiedWorker (handlers, router, running flag)
+            prefetch: Batches read ahead of the one being processed
+        """
+        self.worker = worker
+        self.prefetch = max(1, prefetch)
+        self.inference = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.client: Optional[AsyncStreamsClient] = None
+        self.batches: Optional[asyncio.Queue] = None
+        self.completions: Optional[asyncio.Queue] = None
+
+    def run(self):
+        log_worker(f"Async loop: prefetch={self.prefetch} batches, inference on a dedicated thread")
+        try:
+            asyncio.run(self.main())
+        finally:
+            self.inference.shutdown(wait=True)
+
+    async def main(self):
+        self.client = AsyncStreamsClient()
+        self.batches = asyncio.Queue(maxsize=self.prefetch)
+        self.completions = asyncio.Queue()
+        writer = asyncio.create_task(self.write_loop())
+        reader = asyncio.create_task(self.read_loop())
+        try:
+            await self.process_loop(reader)
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+            await self.completions.join()
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+            await self.client.close()
+
+    async def consume(self, batch_size: int, block_ms: int) -> List[StreamMessage]:
+        """Async counterpart of UnifiedWorker._consume"""
+        router = self.worker.router
+        if router is None:
+            return await self.client.consume_tasks(self.worker.worker_name, batch_size, block_ms)
+        try:
+            messages = await self.client.consume_tasks(
+                self.worker.worker_name, batch_size, block_ms, extra_streams=[router.inbox]
+            )
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # Inbox was swept while our heartbeat lapsed; recreate it
+            await asyncio.to_thread(router.register)
+            return []
+        if not messages:
+            return messages
+        return await asyncio.to_thread(router.route, messages)
+
+    async def collect(self) -> List[StreamMessage]:
+        """Async counterpart of UnifiedWorker._collect_messages"""
+        reclaimed = await asyncio.to_thread(self.worker._reclaim)
+        if reclaimed:
+            return reclaimed
+        max_batch = max(1, config.stream_batch_size)
+        messages = await self.consume(max_batch, 1000)
+        if not messages or config.stream_batch_wait_ms <= 0:
+            return messages
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config.stream_batch_wait_ms / 1000
+        while self.worker.running:
+            stream_count = sum(1 for m in messages if m.task_type == "stream")
+            if stream_count == 0 or stream_count >= max_batch:
+                break
+            remaining_ms = int((deadline - loop.time()) * 1000)
+            if remaining_ms <= 0:
+                break
+            more = await self.consume(max_batch - stream_count, remaining_ms)
+            if not more:
+                break
+            messages.extend(more)
+        return messages
+
+    async def read_loop(self):
+        """Read batches ahead of inference until the worker stops"""
+        while self.worker.running:
+            try:
+                messages = await self.collect()
+            except Exception as e:
+                log_error(f"Error reading tasks: {e}")
+                await asyncio.sleep(1)
+                continue
+            if messages:
+                await self.batches.put(messages)
+
+    async def process_loop(self, reader: asyncio.Task):
+        """Feed batches to the inference thread until reading stopped and all are done"""
+        loop = asyncio.get_running_loop()
+
+        def flush(batch: CompletionBatch):
+            # Called on the inference thread
+            loop.call_soon_threadsafe(self.completions.put_nowait, batch)
+
+        while not (reader.done() and self.batches.empty()):
+            try:
+                messages = await asyncio.wait_for(self.batches.get(), IDLE_TICK_S)
+            except asyncio.TimeoutError:
+                messages = []
+            try:
+                await loop.run_in_executor(self.inference, self.worker._housekeeping)
+                if messages:
+                    await loop.run_in_executor(self.inference, self.worker._process_messages, messages, flush)
+            except Exception as e:
+                log_error(f"Error in worker loop: {e}")
+                await asyncio.sleep(1)
+
+    async def write_loop(self):
+        """Write finished tasks' results and XACKs, merging whatever has queued up"""
+        while True:
+            batches = [await self.completions.get()]
+            while not self.completions.empty():
+                batches.append(self.completions.get_nowait())
+            try:
+                await write_async(self.client.redis, merge(batches), self.worker.completion_stats)
+            except Exception as e:
+                log_error(f"Failed to write {len(batches)} completion(s): {e}")
+            finally:
+                for _ in batches:
+                    self.completions.task_done()
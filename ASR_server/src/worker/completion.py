@@ -0,0 +1,141 @@
+"""Batched Task Completion Writes
+
+Finishing a task used to cost one round trip per command: a stream chunk
+PUBLISHes its result, RPUSHes and EXPIREs it into ``asr:results:<session>``
+and is then XACKed; a batch task adds SETEX (result) and LPUSH + LTRIM
+(history).
+
+Handlers now queue these commands in a ``CompletionBatch`` together with the
+XACKs of the messages they finished, and the worker sends the batch as one
+pipeline: one round trip per batch task, or per stream micro-batch. Commands
+run in the order they were queued and the XACKs last, one XACK per stream
+carrying every message ID, so a message is only acked once its results are
+written. Entries of per-worker inboxes are also XDELed, so only unprocessed
+chunks are left to requeue if the worker dies.
+
+Work that must only happen once the results are stored (removing a merged
+task's PCM, answering duplicate uploads from its result) is registered with
+``CompletionBatch.after`` and runs after the pipeline succeeded; if the write
+fails it is skipped along with the XACKs, and the redelivered message redoes
+it.
+
+In async mode batches are written from the event loop on redis.asyncio, and
+batches that queue up meanwhile are merged into a single pipeline.
+``CompletionStats`` counts the round trips spent on these completion writes
+per finished task for the heartbeat; reads, claims and progress updates made
+while processing are not included.
+"""
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from src.utils.logger import log_error
+from src.utils.streams import CONSUMER_GROUP, STREAM_NAME, StreamMessage
+
+
+class CompletionBatch:
+    """
+    Records Redis commands to send later. Any pipeline command can be queued
+    by calling it on the batch (``batch.publish(channel, data)``), so the
+    batch can be passed wherever a ``pipe`` is accepted.
+    """
+
+    def __init__(self):
+        self.commands: List[Tuple[str, tuple, dict]] = []
+        self.acks: Dict[str, List[str]] = {}
+        self.callbacks: List[Tuple[Callable, tuple]] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return record
+
+    def ack(self, msg: StreamMessage):
+        """XACK a message once the commands queued before it are written"""
+        self.acks.setdefault(msg.stream, []).append(msg.msg_id)
+
+    def after(self, fn: Callable, *args):
+        """Call fn(*args) once the batch has been written"""
+        self.callbacks.append((fn, args))
+
+    def run_callbacks(self):
+        for fn, args in self.callbacks:
+            try:
+                fn(*args)
+            except Exception as e:
+                log_error(f"Post-completion step {getattr(fn, '__name__', fn)} failed: {e}")
+
+    @property
+    def tasks(self) -> int:
+        return sum(len(ids) for ids in self.acks.values())
+
+    def __len__(self) -> int:
+        return len(self.commands) + len(self.acks)
+
+    def apply(self, pipe):
+        """Queue everything on a (sync or async) redis pipeline"""
+        for name, args, kwargs in self.commands:
+            getattr(pipe, name)(*args, **kwargs)
+        for stream, ids in self.acks.items():
+            pipe.xack(stream, CONSUMER_GROUP, *ids)
+            if stream != STREAM_NAME:
+                pipe.xdel(stream, *ids)
+
+
+def merge(batches: Iterable[CompletionBatch]) -> CompletionBatch:
+    """One batch with the commands of several, in order (XACKs still last)"""
+    merged = CompletionBatch()
+    for batch in batches:
+        merged.commands.extend(batch.commands)
+        for stream, ids in batch.acks.items():
+            merged.acks.setdefault(stream, []).extend(ids)
+        merged.callbacks.extend(batch.callbacks)
+    return merged
+
+
+class CompletionStats:
+    """Round trips spent writing task completions (not other Redis calls)"""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.commands = 0
+        self.tasks = 0
+
+    def record(self, batch: CompletionBatch):
+        self.round_trips += 1
+        self.commands += len(batch.commands) + len(batch.acks)
+        self.tasks += batch.tasks
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "completion_round_trips": self.round_trips,
+            "tasks": self.tasks,
+            "completion_round_trips_per_task": round(self.round_trips / self.tasks, 3) if self.tasks else 0.0,
+            "commands_per_completion_round_trip": (
+                round(self.commands / self.round_trips, 1) if self.round_trips else 0.0
+            ),
+        }
+
+
+def write(client, batch: CompletionBatch, stats: CompletionStats):
+    """Send a batch in one pipeline on a sync redis client, then run its callbacks"""
+    if len(batch):
+        with client.pipeline(transaction=False) as pipe:
+            batch.apply(pipe)
+            pipe.execute()
+        stats.record(batch)
+    batch.run_callbacks()
+
+
+async def write_async(client, batch: CompletionBatch, stats: CompletionStats):
+    """Send a batch in one pipeline on a redis.asyncio client, then run its callbacks"""
+    if len(batch):
+        async with client.pipeline(transaction=False) as pipe:
+            batch.apply(pipe)
+            await pipe.execute()
+        stats.record(batch)
+    if batch.callbacks:
+        # Callbacks use the sync client and the filesystem
+        await asyncio.to_thread(batch.run_callbacks)
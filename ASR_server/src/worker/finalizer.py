@@ -0,0 +1,136 @@
+"""Deferred Punctuation for Stream Sessions
+
+With ``stream_punc_mode = "deferred"`` stream chunks are published as raw
+ASR text (no punctuation pass per chunk). Raw texts are collected per
+session in Redis, and punctuation runs once per segment when:
+
+- a chunk comes back empty after speech (a pause),
+- the pending text reaches ``stream_punc_segment_chars``,
+- the chunk payload carries ``is_final``, or
+- no chunk arrived for ``stream_punc_idle_s`` (checked by ``flush_idle``).
+
+The punctuated segment is published on ``asr_result_<session_id>`` as
+
+    {"chunk_index": <last chunk>, "text": ..., "duration": 0.0, "error": "",
+     "final": true, "segment_start": <first chunk>, "segment_end": <last chunk>}
+
+and appended to ``asr:session:final:<session_id>``, which holds the
+corrected transcript segment by segment (served by
+``GET /api/v1/asr/stream/<session_id>/transcript``). State lives in Redis,
+so any worker can close a segment:
+
+    asr:session:raw:<session_id>   -> HASH chunk_index -> raw text
+    asr:session:raw:active         -> ZSET session_id -> last chunk time
+"""
+import json
+import time
+from typing import Callable, List, Optional
+
+from src.asr.config import config
+from src.utils.redis_client import redis_client
+
+
+RAW_PREFIX = "asr:session:raw:"
+ACTIVE_KEY = "asr:session:raw:active"
+FINAL_PREFIX = "asr:session:final:"
+LOCK_SUFFIX = ":lock"
+
+# Raw text and finals outlive the session briefly so clients can fetch them
+SESSION_TTL_S = 3600
+
+
+class SessionFinalizer:
+    """Collects raw chunk text and publishes punctuated segments"""
+
+    def __init__(self, punctuate: Callable[[str], str]):
+        self.punctuate = punctuate
+        self.segments = 0
+
+    @property
+    def client(self):
+        return redis_client.client
+
+    def on_chunk(self, session_id: str, chunk_index: int, text: str, is_final: bool = False,
+                 pipe=None) -> Optional[dict]:
+        """
+        Record one chunk's raw text and close the segment if it ended.
+        A closed segment is published through `pipe` if given (see finalize).
+
+        Returns:
+            The published final segment, or None
+        """
+        key = f"{RAW_PREFIX}{session_id}"
+        if text:
+            rec = self.client.pipeline()
+            rec.hset(key, str(chunk_index), text)
+            rec.expire(key, SESSION_TTL_S)
+            rec.zadd(ACTIVE_KEY, {session_id: time.time()})
+            rec.hvals(key)
+            pending = rec.execute()[-1]
+            limit = config.stream_punc_segment_chars
+            if is_final or (limit > 0 and sum(len(t) for t in pending) >= limit):
+                return self.finalize(session_id, chunk_index, pipe=pipe)
+            return None
+        # Empty chunk: a pause (or the end) closes whatever is pending
+        return self.finalize(session_id, chunk_index, pipe=pipe)
+
+    def finalize(self, session_id: str, chunk_index: Optional[int] = None, pipe=None) -> Optional[dict]:
+        """
+        Punctuate and publish the session's pending text, if any.
+
+        With `pipe` (e.g. the worker's CompletionBatch) the segment is published
+        and stored along with the chunk results queued there, after them.
+        """
+        key = f"{RAW_PREFIX}{session_id}"
+        lock = f"{key}{LOCK_SUFFIX}"
+        if not self.client.set(lock, "1", nx=True, ex=30):
+            return None  # another worker is closing this segment
+        try:
+            raw = self.client.hgetall(key)
+            if not raw:
+                self.client.zrem(ACTIVE_KEY, session_id)
+                return None
+            indices = sorted(int(i) for i in raw)
+            text = "".join(raw[str(i)] for i in indices)
+            clear = self.client.pipeline()
+            clear.hdel(key, *[str(i) for i in indices])
+            clear.zrem(ACTIVE_KEY, session_id)
+            clear.execute()
+
+            try:
+                final_text = self.punctuate(text)
+            except Exception:
+                final_text = text  # raw text beats losing the segment
+            message = {
+                "chunk_index": chunk_index if chunk_index is not None else indices[-1],
+                "text": final_text,
+                "duration": 0.0,
+                "error": "",
+                "final": True,
+                "segment_start": indices[0],
+                "segment_end": indices[-1],
+            }
+            own = pipe is None
+            if own:
+                pipe = self.client.pipeline()
+            final_key = f"{FINAL_PREFIX}{session_id}"
+            pipe.publish(f"asr_result_{session_id}", json.dumps(message))
+            pipe.rpush(final_key, json.dumps(message))
+            pipe.expire(final_key, SESSION_TTL_S)
+            if own:
+                pipe.execute()
+            self.segments += 1
+            return message
+        finally:
+            self.client.delete(lock)
+
+    def flush_idle(self, now: Optional[float] = None) -> List[dict]:
+        """Close segments of sessions that sent nothing for stream_punc_idle_s"""
+        now = time.time() if now is None else now
+        cutoff = now - config.stream_punc_idle_s
+        finals = []
+        for session_id in self.client.zrangebyscore(ACTIVE_KEY, "-inf", cutoff):
+            message = self.finalize(session_id)
+            if message is not None:
+                finals.append(message)
+        return finals
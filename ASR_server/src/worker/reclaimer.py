@@ -0,0 +1,170 @@
+"""Stale Message Reclamation and Dead-Lettering
+
+A message stays in the consumer group's pending list (PEL) until its worker
+XACKs it. If the worker dies mid-task, or the handler fails, nobody would
+look at it again. Every ``reclaim_interval_s`` each worker checks the PEL
+(XPENDING) and takes over (XCLAIM) entries that are idle for longer than
+
+- ``reclaim_idle_s``   if their consumer has no heartbeat (the worker died),
+                       or is this worker's name but the entry predates this
+                       process (a restarted worker's previous run)
+- ``reclaim_stuck_s``  otherwise (failed without ack, or hung); keep this
+                       above the longest task's processing time
+
+and processes them like freshly read messages. XCLAIM only succeeds for
+entries still idle that long, so two workers never claim the same entry.
+Stream chunks are the exception: by then their session has moved to another
+worker or ended, and late audio would corrupt its streaming state, so they
+are acked and dropped instead of replayed.
+
+Each claim counts as a delivery. An entry already delivered
+``reclaim_max_deliveries`` times is moved to the dead-letter stream instead
+of being retried, with its delivery count, last consumer and time:
+
+    asr_tasks:dlq   -> dead-lettered messages (original fields + metadata)
+
+Its batch task (or the parent of a batch part) is marked failed, and duplicate
+uploads attached to it (result_cache.py) get the same answer. A reclaimed
+batch task renews its in-flight claim, so duplicates keep waiting for the
+retry instead of running into the claim's TTL. Entries are listed and replayed with ``GET /api/v1/asr/dlq`` and
+``POST /api/v1/asr/dlq/{entry_id}/replay``.
+"""
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from src.asr.config import config
+from src.utils.logger import log_error, log_worker
+from src.utils.redis_client import redis_client
+from src.utils.result_cache import result_cache
+from src.utils.streams import CONSUMER_GROUP, STREAM_NAME, StreamMessage, streams_client
+from src.worker.affinity import HEARTBEAT_KEY
+
+
+class StaleReclaimer:
+    """Claims idle pending messages and dead-letters those retried too often"""
+
+    def __init__(self, worker_name: str):
+        self.worker_name = worker_name
+        self._started = time.monotonic()
+        self._last_run = 0.0
+        self.claimed = 0
+        self.dead_lettered = 0
+        self.dropped = 0
+
+    def due(self) -> bool:
+        return config.reclaim_interval_s > 0 and time.monotonic() - self._last_run >= config.reclaim_interval_s
+
+    def _alive(self, consumer: str, cache: Dict[str, bool]) -> bool:
+        if consumer not in cache:
+            cache[consumer] = bool(streams_client.redis.exists(HEARTBEAT_KEY.format(consumer)))
+        return cache[consumer]
+
+    def reclaim(self) -> List[StreamMessage]:
+        """
+        Claim stale pending messages, dead-lettering the exhausted ones.
+
+        Returns:
+            Messages this worker now owns and should process
+        """
+        self._last_run = time.monotonic()
+        idle_ms = config.reclaim_idle_s * 1000
+        stuck_ms = max(config.reclaim_stuck_s * 1000, idle_ms)
+        entries = streams_client.get_pending_entries(min_idle_ms=idle_ms, count=config.reclaim_batch)
+
+        uptime_ms = (time.monotonic() - self._started) * 1000
+        alive: Dict[str, bool] = {}
+        retry: Dict[int, List[str]] = {}
+        exhausted: Dict[int, List[dict]] = {}
+        for entry in entries:
+            if entry["consumer"] == self.worker_name:
+                orphaned = entry["time_since_delivered"] > uptime_ms
+                min_idle = idle_ms if orphaned else stuck_ms
+            else:
+                min_idle = stuck_ms if self._alive(entry["consumer"], alive) else idle_ms
+            if entry["time_since_delivered"] < min_idle:
+                continue
+            if entry["times_delivered"] >= config.reclaim_max_deliveries:
+                exhausted.setdefault(min_idle, []).append(entry)
+            else:
+                retry.setdefault(min_idle, []).append(entry["message_id"])
+
+        for min_idle, dead in exhausted.items():
+            self._dead_letter(dead, min_idle)
+
+        messages = []
+        for min_idle, msg_ids in retry.items():
+            messages.extend(streams_client.claim_messages(msg_ids, self.worker_name, min_idle))
+        messages = self._drop_stream_chunks(messages)
+        self.claimed += len(messages)
+        for msg in messages:
+            self._renew_claim(msg)
+        return messages
+
+    def _drop_stream_chunks(self, messages: List[StreamMessage]) -> List[StreamMessage]:
+        """Ack claimed stream chunks instead of replaying them; returns the rest"""
+        stale = [msg.msg_id for msg in messages if msg.task_type == "stream"]
+        if not stale:
+            return messages
+        streams_client.redis.xack(STREAM_NAME, CONSUMER_GROUP, *stale)
+        self.dropped += len(stale)
+        log_worker(f"Dropped {len(stale)} stale stream chunk(s) instead of replaying them", level="WARNING")
+        return [msg for msg in messages if msg.task_type != "stream"]
+
+    @staticmethod
+    def _leader(msg: StreamMessage):
+        """Batch task a message belongs to (the parent of a batch part), or None"""
+        if msg.task_type == "batch":
+            return msg.task_id
+        if msg.task_type == "batch_part":
+            return msg.payload.get("parent_id")
+        return None
+
+    def _renew_claim(self, msg: StreamMessage):
+        task_id = self._leader(msg)
+        cache_key = msg.payload.get("cache_key")
+        if not task_id or not cache_key:
+            return
+        try:
+            result_cache.renew(cache_key, task_id)
+        except Exception as e:
+            log_error(f"Failed to renew in-flight claim of task={task_id}: {e}")
+
+    def _dead_letter(self, entries: List[dict], min_idle_ms: int):
+        by_id = {entry["message_id"]: entry for entry in entries}
+        # Claim first so a concurrent reclaimer can't retry them meanwhile
+        claimed = streams_client.claim_messages(list(by_id), self.worker_name, min_idle_ms)
+        for msg in self._drop_stream_chunks(claimed):
+            entry = by_id[msg.msg_id]
+            try:
+                dlq_id = streams_client.dead_letter(msg, entry["times_delivered"], entry["consumer"])
+            except Exception as e:
+                log_error(f"Failed to dead-letter msg={msg.msg_id}: {e}")
+                continue
+            self.dead_lettered += 1
+            self._mark_failed(msg, entry["times_delivered"])
+            log_worker(
+                f"{msg.task_type.upper()} task={msg.task_id} dead-lettered after "
+                f"{entry['times_delivered']} deliveries (last consumer {entry['consumer']}, dlq id {dlq_id})",
+                level="WARNING"
+            )
+
+    def _mark_failed(self, msg: StreamMessage, deliveries: int):
+        """Fail the batch task, and the duplicates attached to it, so clients stop waiting"""
+        task_id = self._leader(msg)
+        if not task_id:
+            return
+        failed = {
+            "task_id": task_id,
+            "status": "failed",
+            "error": f"Gave up after {deliveries} deliveries (dead-lettered)",
+            "created_at": datetime.now().isoformat(),
+        }
+        redis_client.save_task_result(task_id, failed)
+        try:
+            result_cache.complete_task(msg.payload, task_id, failed)
+        except Exception as e:
+            log_error(f"Result cache update failed for task={task_id}: {e}")
+
+    def stats(self) -> dict:
+        return {"claimed": self.claimed, "dead_lettered": self.dead_lettered, "dropped": self.dropped}
@@ -4,7 +4,6 @@ import os
 import sys
 import time
 import signal
-import uuid
 import redis
 from pathlib import Path
 
@@ -13,6 +12,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.asr.recognizer import SpeechRecognizer
 from src.utils.logger import log_worker, log_error
+from src.utils.memory import get_memory_governor
 
 # Configuration
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -25,10 +25,7 @@ class StreamWorker:
         self.redis = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
         self.running = True
         self.recognizer = SpeechRecognizer()
-        
-        # Ensure temp directory exists
-        self.temp_dir = Path("src/input/temp_chunks")
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.memory = get_memory_governor()
         
         signal.signal(signal.SIGINT, self.shutdown)
         signal.signal(signal.SIGTERM, self.shutdown)
@@ -50,26 +47,14 @@ class StreamWorker:
                 log_error(f"Invalid task format: {task_json}")
                 return
 
-            # Decode audio
+            # Decode audio (kept in memory, never written to disk)
             audio_data = base64.b64decode(audio_b64)
             
-            # Save to temporary file
-            temp_filename = f"{session_id}_{chunk_index}_{uuid.uuid4().hex[:6]}.wav"
-            temp_path = self.temp_dir / temp_filename
-            
-            with open(temp_path, "wb") as f:
-                f.write(audio_data)
-            
             # Process
             start_time = time.time()
-            result = self.recognizer.recognize(str(temp_path))
+            result = self.recognizer.recognize(audio_data)
             duration = time.time() - start_time
-            
-            # Cleanup
-            try:
-                os.remove(temp_path)
-            except OSError:
-                pass
+            self.memory.after_task()
 
             # Publish result
             response = {
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Pre-fork Supervisor for Unified Workers
+
+Loads the ASR models once, moves the weights into shared memory and forks
+N UnifiedWorker children that inherit them copy-on-write. Dead children are
+re-forked from the already-loaded parent, so restarts never reload models.
+
+Per-child status is kept in the Redis hash ``asr:supervisor:<supervisor>``.
+
+Usage:
+    python3 src/worker/supervisor.py --workers 4 --name worker
+    python3 src/worker/supervisor.py --workers 4 --partition-cores --numa
+    python3 src/worker/supervisor.py --status          # print child status
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.asr.config import config
+from src.utils.cpu import (
+    apply_cpu_partition, available_cores, format_cpulist, numa_nodes, parse_cpulist, partition_cores
+)
+from src.utils.logger import log_worker, log_error
+from src.utils.redis_client import redis_client
+
+
+# Restart backoff for children that die right after starting
+MIN_UPTIME_S = 10
+MAX_BACKOFF_S = 60
+
+
+@dataclass
+class ChildState:
+    """Supervisor-side view of one forked worker"""
+    name: str
+    pid: int = 0
+    status: str = "starting"  # starting, running, restarting, stopped
+    started_at: float = 0.0
+    restarts: int = 0
+    last_exit: str = ""
+    next_start: float = 0.0
+    cores: str = ""  # cpulist the child is pinned to (empty: not pinned)
+
+
+def share_model_memory(model) -> int:
+    """
+    Move model tensors into shared memory so forked children never copy them.
+
+    Returns:
+        Number of torch modules moved
+    """
+    import torch
+
+    moved = 0
+    for attr in ("model", "vad_model", "punc_model", "spk_model"):
+        module = getattr(model, attr, None)
+        if isinstance(module, torch.nn.Module):
+            module.share_memory()
+            moved += 1
+    return moved
+
+
+class Supervisor:
+    """Forks and babysits UnifiedWorker children sharing one model load"""
+
+    def __init__(
+        self,
+        worker_count: int,
+        name_prefix: str,
+        stream_name: str,
+        group_name: str,
+        cpu_partition: Optional[List[List[int]]] = None,
+    ):
+        self.worker_count = worker_count
+        self.cpu_partition = cpu_partition
+        self.name_prefix = name_prefix
+        self.stream_name = stream_name
+        self.group_name = group_name
+        self.supervisor_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.status_key = f"asr:supervisor:{self.supervisor_id}"
+        self.children: Dict[str, ChildState] = {}
+        self.running = True
+
+    def _shutdown(self, signum, frame):
+        log_worker(f"Supervisor received signal {signum}, stopping children...")
+        self.running = False
+
+    def load_models(self):
+        """Load models once in the parent and prepare them for fork."""
+        if config.use_gpu:
+            import torch
+            if torch.cuda.is_available():
+                # A CUDA context cannot be inherited across fork()
+                raise RuntimeError(
+                    "Pre-fork supervisor requires CPU inference (set ASR_USE_GPU=false); "
+                    "use start_unified_worker.sh for GPU workers"
+                )
+
+        from src.asr.recognizer import SpeechRecognizer
+
+        start = time.time()
+        recognizer = SpeechRecognizer()
+        moved = 0
+        if config.backend != "onnx":
+            moved = share_model_memory(recognizer.model)
+        log_worker(
+            f"Supervisor loaded models in {time.time() - start:.1f}s "
+            f"({moved} modules in shared memory)"
+        )
+
+        # Keep the GC from touching (and thereby copying) inherited objects
+        gc.collect()
+        gc.freeze()
+
+    def _publish_status(self):
+        try:
+            mapping = {name: json.dumps(asdict(c)) for name, c in self.children.items()}
+            if mapping:
+                redis_client.client.hset(self.status_key, mapping=mapping)
+                redis_client.client.expire(self.status_key, 60)
+        except Exception as e:
+            log_error(f"Supervisor status publish failed: {e}")
+
+    def _spawn(self, child: ChildState):
+        pid = os.fork()
+        if pid == 0:
+            # Child: restore default signal handling; the worker installs its own
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                if child.cores:
+                    apply_cpu_partition(parse_cpulist(child.cores))
+                from src.worker.unified_worker import UnifiedWorker
+                # SpeechRecognizer() returns the inherited, already-loaded singleton
+                UnifiedWorker(child.name, self.stream_name, self.group_name).run()
+            except Exception as e:
+                log_error(f"Child {child.name} crashed: {e}", exc_info=True)
+                code = 1
+            finally:
+                os._exit(code)
+
+        child.pid = pid
+        child.status = "running"
+        child.started_at = time.time()
+        log_worker(f"Supervisor started {child.name} pid={pid}")
+
+    def _reap(self):
+        """Collect exited children and schedule restarts."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            child = next((c for c in self.children.values() if c.pid == pid), None)
+            if child is None:
+                continue
+
+            if os.WIFSIGNALED(status):
+                child.last_exit = f"signal {os.WTERMSIG(status)}"
+            else:
+                child.last_exit = f"exit {os.WEXITSTATUS(status)}"
+            child.pid = 0
+
+            if not self.running:
+                child.status = "stopped"
+                continue
+
+            # Back off if the child keeps dying right after start; a child that
+            # stayed up long enough starts the backoff over
+            uptime = time.time() - child.started_at
+            if uptime >= MIN_UPTIME_S:
+                child.restarts = 0
+            child.restarts += 1
+            delay = 0 if uptime >= MIN_UPTIME_S else min(MAX_BACKOFF_S, 2 ** min(child.restarts, 6))
+            child.next_start = time.time() + delay
+            child.status = "restarting"
+            log_error(f"Child {child.name} died ({child.last_exit}), restart #{child.restarts} in {delay}s")
+
+    def run(self):
+        signal.signal(signal.SIGINT, self._shutdown)
+        signal.signal(signal.SIGTERM, self._shutdown)
+
+        self.load_models()
+
+        for i in range(1, self.worker_count + 1):
+            name = f"{self.name_prefix}-{i}"
+            self.children[name] = ChildState(name=name)
+            if self.cpu_partition:
+                self.children[name].cores = format_cpulist(self.cpu_partition[i - 1])
+            self._spawn(self.children[name])
+
+        last_status = 0.0
+        while self.running:
+            self._reap()
+            now = time.time()
+            for child in self.children.values():
+                if child.status == "restarting" and now >= child.next_start:
+                    self._spawn(child)
+            if now - last_status >= 5:
+                self._publish_status()
+                last_status = now
+            time.sleep(0.5)
+
+        self.stop()
+
+    def stop(self, timeout: float = 30.0):
+        """Terminate children and wait for them to exit."""
+        for child in self.children.values():
+            if child.pid:
+                try:
+                    os.kill(child.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        deadline = time.time() + timeout
+        while any(c.pid for c in self.children.values()) and time.time() < deadline:
+            self._reap()
+            time.sleep(0.2)
+
+        for child in self.children.values():
+            if child.pid:
+                os.kill(child.pid, signal.SIGKILL)
+                child.pid = 0
+            child.status = "stopped"
+
+        self._publish_status()
+        log_worker("Supervisor stopped.")
+
+
+def print_status():
+    """Print the status of every supervisor's children."""
+    for key in redis_client.client.scan_iter("asr:supervisor:*"):
+        print(f"📋 {key}")
+        for name, raw in sorted(redis_client.client.hgetall(key).items()):
+            child = json.loads(raw)
+            print(
+                f"   {name:<12} pid={child['pid']:<7} status={child['status']:<10} "
+                f"restarts={child['restarts']} last_exit={child['last_exit'] or '-'} "
+                f"cores={child.get('cores') or '-'}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork ASR worker supervisor")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKER_COUNT", 2)), help="Number of children")
+    parser.add_argument("--name", default="worker", help="Child name prefix")
+    parser.add_argument("--stream", default="asr_tasks", help="Stream name")
+    parser.add_argument("--group", default="asr_workers", help="Consumer group name")
+    parser.add_argument("--status", action="store_true", help="Print child status and exit")
+    parser.add_argument("--partition-cores", action="store_true", default=os.getenv("CPU_PARTITION", "") == "1",
+                        help="Pin each child to its own share of the CPU budget")
+    parser.add_argument("--cpu-budget", default=os.getenv("CPU_BUDGET", ""),
+                        help="cpulist shared by the children, e.g. 0-15 (default: all cores)")
+    parser.add_argument("--numa", action="store_true", default=os.getenv("CPU_NUMA", "") == "1",
+                        help="Keep each child's cores within one NUMA node")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+
+    stream_name = os.getenv("STREAM_NAME", args.stream)
+    group_name = os.getenv("CONSUMER_GROUP", args.group)
+
+    cpu_partition = None
+    if args.partition_cores:
+        cores = parse_cpulist(args.cpu_budget) if args.cpu_budget else available_cores()
+        cpu_partition = partition_cores(cores, args.workers, numa_nodes() if args.numa else None)
+    
+    Supervisor(args.workers, args.name, stream_name, group_name, cpu_partition).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,47 +10,57 @@ Usage:
 """
 import argparse
 import base64
-import gc
-import ctypes
 import json
 import os
 import signal
 import sys
 import threading
 import time
-import uuid
-import tracemalloc
 import psutil
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import redis
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from src.asr.audio import (
+    TARGET_SAMPLE_RATE, AudioDecodeError, decode_audio_bytes, merge_segments, resample, samples_duration
+)
+from src.asr.decoding import load_pcm
+from src.asr.config import config
 from src.asr.recognizer import SpeechRecognizer
+from src.asr.silence import is_silent
+from src.asr.streaming import StreamingRecognizer
+from src.worker.affinity import HEARTBEAT_KEY, SessionRouter
+from src.worker.completion import CompletionBatch, CompletionStats, write
+from src.worker.finalizer import SessionFinalizer
+from src.worker.reclaimer import StaleReclaimer
+from src.utils.cpu import apply_cpu_partition, format_cpulist, worker_cores
 from src.utils.logger import log_worker, log_error
+from src.utils.memory import get_memory_governor
+from src.utils.profiling import allocation_profiler, clear_forced_profile, force_profile
 from src.utils.redis_client import redis_client
+from src.utils.result_cache import result_cache
 from src.utils.streams import (
     StreamsClient, StreamMessage,
-    ensure_consumer_group, consume_tasks, ack_task
+    ensure_consumer_group, consume_tasks, publish_task
 )
 
-# Memory release using malloc_trim (Linux)
-try:
-    _libc = ctypes.CDLL("libc.so.6")
-    _malloc_trim = _libc.malloc_trim
-    _malloc_trim.argtypes = [ctypes.c_size_t]
-    _malloc_trim.restype = ctypes.c_int
-except (OSError, AttributeError):
-    _malloc_trim = None
+
+def _is_final(payload: dict) -> bool:
+    """Whether a stream chunk payload marks the end of its session"""
+    return str(payload.get("is_final", "")).lower() in ("1", "true")
 
 
-def force_memory_release():
-    """Force Python GC and return memory to OS."""
-    gc.collect()
-    gc.collect()
-    if _malloc_trim:
-        _malloc_trim(0)
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 
 class UnifiedWorker:
@@ -62,16 +72,39 @@ class UnifiedWorker:
         self.group_name = group_name
         self.running = True
         self.recognizer = SpeechRecognizer()
-        
-        # Temp directory for stream chunks
-        self.temp_dir = Path("src/input/temp_chunks")
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.startup_timings = dict(self.recognizer.startup_timings)
+        streaming_start = time.perf_counter()
+        self.streaming = (
+            StreamingRecognizer(hub=self.recognizer.hub) if config.stream_mode == "online" else None
+        )
+        if self.streaming is not None:
+            self.startup_timings["streaming"] = round(time.perf_counter() - streaming_start, 3)
+        self.memory = get_memory_governor()
+        self.router = (
+            SessionRouter(worker_name, sessions=config.stream_affinity)
+            if config.stream_affinity or config.language_models else None
+        )
+        self.finalizer = (
+            SessionFinalizer(self.recognizer.punctuate) if config.stream_punc_mode == "deferred" else None
+        )
+        self.reclaimer = StaleReclaimer(worker_name) if config.reclaim_interval_s > 0 else None
+        self._last_sweep = 0.0
+        # Silence prefilter counters (chunks seen / skipped, seconds of audio skipped)
+        self.stream_chunks = 0
+        self.silence_skipped = 0
+        self.silence_skipped_s = 0.0
+        # Seconds spent in task handlers (utilization in the heartbeat)
+        self.busy_s = 0.0
+        # Result writes and XACKs of the task being processed (see completion.py)
+        self.completion: Optional[CompletionBatch] = None
+        self.completion_stats = CompletionStats()
         
         # Register signal handlers
         signal.signal(signal.SIGINT, self._shutdown)
         signal.signal(signal.SIGTERM, self._shutdown)
         
         log_worker(f"Unified Worker '{worker_name}' initialized for stream '{stream_name}' group '{group_name}'")
+        log_worker("Startup timings: " + " ".join(f"{k}={v:.2f}s" for k, v in self.startup_timings.items()))
     
     def _shutdown(self, signum, frame):
         """Handle shutdown signals gracefully."""
@@ -94,20 +127,65 @@ class UnifiedWorker:
         
         log_worker(f"Processing BATCH task={task_id} path={audio_path}")
         
-        # Track resources
-        tracemalloc.start()
+        # Track resources (allocation tracing only when this task is selected)
+        profile = allocation_profiler.start(task_id, "batch")
         proc = psutil.Process()
         start_mem_mb = proc.memory_info().rss / 1024 / 1024
         start_time = time.time()
         
         try:
-            # Perform recognition
-            result = self.recognizer.recognize(audio_path)
+            created_at = datetime.now().isoformat()
+            redis_client.save_task_result(task_id, {
+                "task_id": task_id,
+                "status": "processing",
+                "progress": 0,
+                "created_at": created_at,
+            })
+            
+            hotwords = self._resolve_hotwords(msg.payload)
+            batching = self._batching(msg.payload)
+            
+            # Long recordings are split on VAD boundaries and fanned out
+            audio = self._load_for_audio(audio_path, msg.payload.get("content_hash"))
+            if audio is not None:
+                samples, sample_rate = audio
+                fanned = self._fan_out(msg, samples, sample_rate)
+                if fanned is not None:
+                    if profile is not None and profile.reason == "forced":
+                        force_profile(task_id)  # profile the parts too
+                    return fanned
+                
+                duration = samples_duration(samples, sample_rate)
+                if duration >= config.progress_min_duration_s:
+                    # Publish partial text and progress as each span completes
+                    def on_progress(done: int, total: int, text: str):
+                        redis_client.save_task_result(task_id, {
+                            "task_id": task_id,
+                            "status": "processing",
+                            "progress": int(done * 100 / total),
+                            "text": text,
+                            "duration": duration,
+                            "created_at": created_at,
+                        })
+                    
+                    result = self.recognizer.recognize_progressive(
+                        samples, sample_rate,
+                        segment_s=config.progress_segment_s,
+                        on_progress=on_progress,
+                        hotwords=hotwords,
+                        language=language,
+                        **batching
+                    )
+                else:
+                    result = self.recognizer.recognize(
+                        samples, sample_rate, hotwords=hotwords, language=language, **batching
+                    )
+            else:
+                # Perform recognition
+                result = self.recognizer.recognize(audio_path, hotwords=hotwords, language=language, **batching)
             processing_time = time.time() - start_time
             
             # End resource tracking
-            current_mem, peak_mem = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
             end_mem_mb = proc.memory_info().rss / 1024 / 1024
             
             if result["status"] == "success":
@@ -118,6 +196,7 @@ class UnifiedWorker:
                     "duration": result.get("duration", 0.0),
                     "created_at": datetime.now().isoformat(),
                     "processing_time": processing_time,
+                    "progress": 100,
                 }
                 
                 rtf = processing_time / result.get("duration", 1.0)
@@ -136,7 +215,7 @@ class UnifiedWorker:
                     "duration": result.get("duration", 0.0),
                     "status": "success",
                 }
-                redis_client.add_to_history(history_record)
+                redis_client.add_to_history(history_record, pipe=self.completion)
             else:
                 task_result = {
                     "task_id": task_id,
@@ -147,7 +226,8 @@ class UnifiedWorker:
                 log_error(f"BATCH task={task_id} failed: {result.get('error')}")
             
             # Save result
-            redis_client.save_task_result(task_id, task_result)
+            redis_client.save_task_result(task_id, task_result, pipe=self.completion)
+            self._complete_cached(msg.payload, task_id, task_result)
             return task_result
             
         except Exception as e:
@@ -158,105 +238,477 @@ class UnifiedWorker:
                 "error": str(e),
                 "created_at": datetime.now().isoformat(),
             }
-            redis_client.save_task_result(task_id, error_result)
+            redis_client.save_task_result(task_id, error_result, pipe=self.completion)
+            self._complete_cached(msg.payload, task_id, error_result)
             raise
         finally:
-            self.recognizer.cleanup()
-            force_memory_release()
+            self._finish_profile(profile)
+            self._release_memory(heavy=True)
     
-    def process_stream_task(self, msg: StreamMessage) -> dict:
+    def _finish_profile(self, profile):
+        """Store a sampled / forced allocation profile; never fails the task."""
+        try:
+            allocation_profiler.finish(profile)
+        except Exception as e:
+            log_error(f"Allocation profiling failed: {e}")
+    
+    def _release_memory(self, heavy: bool):
+        """Let the memory governor decide whether this task pays for a release."""
+        reason = self.memory.after_task(heavy=heavy)
+        if reason is not None and reason != "heavy":
+            stats = self.memory.stats()
+            log_worker(
+                f"Memory released ({reason}) rss={stats['rss_mb']}MB "
+                f"releases={stats['releases']}/{stats['tasks']} tasks "
+                f"time={stats['release_time_s']}s"
+            )
+    
+    def _after_write(self, fn: Callable, *args):
+        """Run fn once the current completion batch is written (right away without one)."""
+        if self.completion is None:
+            fn(*args)
+        else:
+            self.completion.after(fn, *args)
+    
+    def _complete_cached(self, payload: dict, task_id: str, task_result: dict):
+        """Once the result is stored, cache it and answer duplicate uploads attached to this task."""
+        self._after_write(self._answer_duplicates, payload, task_id, task_result)
+    
+    def _answer_duplicates(self, payload: dict, task_id: str, task_result: dict):
+        try:
+            waiters = result_cache.complete_task(payload, task_id, task_result)
+            if waiters:
+                log_worker(f"BATCH task={task_id} also answered {len(waiters)} duplicate task(s)")
+        except Exception as e:
+            log_error(f"Result cache update failed for task={task_id}: {e}")
+    
+    def _resolve_hotwords(self, payload: dict) -> Optional[str]:
+        """Hotwords requested by a task payload (None means the global list)"""
+        return self.recognizer.resolve_hotwords(payload.get("hotword_set"), payload.get("hotwords"))
+    
+    def _batching(self, payload: dict) -> dict:
+        """Batching parameters requested by a task payload (None entries use batching.py)"""
+        return {
+            "batch_size_s": payload.get("batch_size"),
+            "merge_length_s": payload.get("merge_length_s"),
+        }
+    
+    def _load_for_audio(self, audio_path: str, content_hash: Optional[str] = None) -> Optional[Tuple[np.ndarray, int]]:
         """
-        Process streaming chunk task (real-time ASR from WebSocket).
+        Decode the file up front so its duration is known before choosing
+        between fan-out, progressive and one-shot recognition. The PCM is
+        reused for recognition either way, and comes from the PCM cache when
+        the API (or an earlier run of this task) already decoded it.
+        """
+        if not os.path.exists(audio_path):
+            return None
+        try:
+            return np.asarray(load_pcm(audio_path, content_hash)), TARGET_SAMPLE_RATE
+        except AudioDecodeError as e:
+            log_worker(f"Cannot pre-decode {audio_path}, passing path to model: {e}", level="WARNING")
+            return None
+    
+    def _fan_out(self, msg: StreamMessage, samples: np.ndarray, sample_rate: int) -> Optional[dict]:
+        """
+        Split a long batch task on VAD boundaries into batch_part sub-tasks
+        that any worker can pick up.
         
-        Args:
-            msg: StreamMessage with payload containing chunk_index, audio_data
-            
         Returns:
-            Result dict published to result channel
+            The parent "processing" record, or None if the task should be
+            recognized in one piece
         """
-        session_id = msg.task_id
-        chunk_index = msg.payload.get("chunk_index", 0)
-        audio_b64 = msg.payload.get("audio_data", "")
+        duration = samples_duration(samples, sample_rate)
+        if config.fanout_min_duration_s <= 0 or duration < config.fanout_min_duration_s:
+            return None
+        
+        task_id = msg.task_id
+        segments = self.recognizer.detect_segments(samples, sample_rate)
+        parts = merge_segments(segments, config.fanout_segment_s * 1000)
+        if len(parts) < 2:
+            return None
+        
+        # Children slice the decoded PCM through a shared memory-mapped file
+        pcm_dir = Path(config.storage_path) / "fanout"
+        pcm_dir.mkdir(parents=True, exist_ok=True)
+        pcm_path = pcm_dir / f"{task_id}.npy"
+        np.save(pcm_path, samples.astype(np.float32, copy=False))
+        
+        redis_client.delete_task_parts(task_id)
+        task_result = {
+            "task_id": task_id,
+            "status": "processing",
+            "progress": 0,
+            "duration": duration,
+            "created_at": datetime.now().isoformat(),
+            "parts_total": len(parts),
+        }
+        redis_client.save_task_result(task_id, task_result)
+        
+        started_at = time.time()
+        for index, (beg_ms, end_ms) in enumerate(parts):
+            publish_task(
+                task_type="batch_part",
+                task_id=f"{task_id}:{index}",
+                payload={
+                    "parent_id": task_id,
+                    "part_index": index,
+                    "parts_total": len(parts),
+                    "pcm_path": str(pcm_path),
+                    "sample_rate": sample_rate,
+                    "start_ms": beg_ms,
+                    "end_ms": end_ms,
+                    "audio_path": msg.payload.get("audio_path", ""),
+                    "language": msg.payload.get("language", "zh"),
+                    "hotword_set": msg.payload.get("hotword_set"),
+                    "hotwords": msg.payload.get("hotwords"),
+                    "batch_size": msg.payload.get("batch_size"),
+                    "merge_length_s": msg.payload.get("merge_length_s"),
+                    "cache_key": msg.payload.get("cache_key"),
+                    "duration": duration,
+                    "started_at": started_at,
+                },
+                origin=self.worker_name
+            )
+        
+        log_worker(f"BATCH task={task_id} duration={duration:.1f}s fanned out into {len(parts)} parts")
+        return task_result
+    
+    def process_batch_part(self, msg: StreamMessage) -> dict:
+        """
+        Recognize one VAD-aligned slice of a fanned-out batch task and merge
+        the parent result once every part is in.
+        """
+        payload = msg.payload
+        parent_id = payload["parent_id"]
+        index = int(payload["part_index"])
+        total = int(payload["parts_total"])
+        sample_rate = int(payload["sample_rate"])
         
         try:
-            # Decode audio
-            audio_data = base64.b64decode(audio_b64)
-            
-            # Save to temporary file
-            temp_filename = f"{session_id}_{chunk_index}_{uuid.uuid4().hex[:6]}.wav"
-            temp_path = self.temp_dir / temp_filename
-            
-            with open(temp_path, "wb") as f:
-                f.write(audio_data)
-            
-            # Process
+            samples = np.load(payload["pcm_path"], mmap_mode="r")
+        except FileNotFoundError:
+            # The PCM is removed only after the merged result is written, so
+            # an unfinished parent means the task's state is inconsistent:
+            # leave the message pending (retried, then dead-lettered)
+            parent = redis_client.get_task_result(parent_id) or {}
+            if parent.get("status") in ("queued", "processing"):
+                raise RuntimeError(f"PART {parent_id}#{index}: PCM gone but parent task not finished")
+            # Parent already merged (redelivered message) or was deleted
+            log_worker(f"PART {parent_id}#{index} skipped: PCM no longer available", level="WARNING")
+            return {"status": "skipped"}
+        
+        per_ms = sample_rate / 1000
+        clip = np.array(samples[int(payload["start_ms"] * per_ms):int(payload["end_ms"] * per_ms)])
+        del samples
+        
+        profile = allocation_profiler.start(f"{parent_id}#{index}", "batch_part", parent_id=parent_id)
+        try:
             start_time = time.time()
-            result = self.recognizer.recognize(str(temp_path))
-            duration = time.time() - start_time
-            
-            # Cleanup temp file
-            try:
-                os.remove(temp_path)
-            except OSError:
-                pass
-            
-            # Prepare response
-            response = {
-                "chunk_index": chunk_index,
+            result = self.recognizer.recognize(
+                clip, sample_rate, hotwords=self._resolve_hotwords(payload), language=payload.get("language"),
+                **self._batching(payload)
+            )
+            part = {
+                "status": result["status"],
                 "text": result.get("text", ""),
-                "duration": result.get("duration", 0.0),
-                "error": result.get("error", "")
+                "error": result.get("error", ""),
             }
+            stored = redis_client.save_task_part(parent_id, index, part)
+            log_worker(
+                f"PART {parent_id}#{index} ({stored}/{total}) {result['status']} "
+                f"time={time.time() - start_time:.2f}s"
+            )
             
-            # Publish to result channel (Pub/Sub for Go backend)
-            channel = f"asr_result_{session_id}"
-            count = redis_client.client.publish(channel, json.dumps(response))
-            
-            # P0 Fix: Result Reliability - Cache result
-            redis_client.cache_stream_result(session_id, response)
-            
+            if stored >= total:
+                if redis_client.claim_task_merge(parent_id, owner=str(index)):
+                    self._merge_parts(payload)
+            else:
+                self._publish_part_progress(payload)
+            return part
+        finally:
+            self._finish_profile(profile)
+            self._release_memory(heavy=True)
+    
+    def _publish_part_progress(self, payload: dict):
+        """Expose progress and the in-order text prefix of a fanned-out task."""
+        parent_id = payload["parent_id"]
+        total = int(payload["parts_total"])
+        parts = redis_client.get_task_parts(parent_id)
+        
+        # Only the contiguous run of finished parts from the start is readable text
+        prefix = []
+        for index in range(total):
+            if index not in parts:
+                break
+            prefix.append(parts[index].get("text", ""))
+        
+        redis_client.save_task_progress(parent_id, {
+            "task_id": parent_id,
+            "status": "processing",
+            "progress": int(len(parts) * 100 / total),
+            "text": "".join(prefix),
+            "duration": float(payload.get("duration", 0.0)),
+            "parts_total": total,
+        })
+    
+    def _merge_parts(self, payload: dict):
+        """Join part texts in order into the parent asr:task:<id> result."""
+        parent_id = payload["parent_id"]
+        parts = redis_client.get_task_parts(parent_id)
+        ordered = [parts[i] for i in sorted(parts)]
+        succeeded = [p for p in ordered if p["status"] == "success"]
+        processing_time = time.time() - float(payload.get("started_at", time.time()))
+        duration = float(payload.get("duration", 0.0))
+        created_at = datetime.now().isoformat()
+        
+        if succeeded:
+            text = "".join(p["text"] for p in ordered)
+            task_result = {
+                "task_id": parent_id,
+                "status": "done",
+                "text": text,
+                "duration": duration,
+                "created_at": created_at,
+                "processing_time": processing_time,
+                "progress": 100,
+                "parts_total": len(ordered),
+                "parts_failed": len(ordered) - len(succeeded),
+            }
+            redis_client.add_to_history({
+                "task_id": parent_id,
+                "filename": Path(payload.get("audio_path", "")).name,
+                "text": text,
+                "created_at": created_at,
+                "duration": duration,
+                "status": "success",
+            }, pipe=self.completion)
+            rtf = processing_time / duration if duration > 0 else 0
             log_worker(
-                f"STREAM sess={session_id} chunk={chunk_index} "
-                f"subscribers={count} time={duration:.3f}s"
+                f"BATCH task={parent_id} merged {len(ordered)} parts text_len={len(text)} "
+                f"duration={duration:.1f}s rtf={rtf:.3f}"
             )
+        else:
+            task_result = {
+                "task_id": parent_id,
+                "status": "failed",
+                "error": ordered[0].get("error") if ordered else "No parts recognized",
+                "created_at": created_at,
+            }
+            log_error(f"BATCH task={parent_id} failed: all {len(ordered)} parts failed")
+        
+        # Bookkeeping goes with the result: if the write fails, the part is
+        # redelivered and merges again from the same parts
+        redis_client.save_task_result(parent_id, task_result, pipe=self.completion)
+        redis_client.delete_task_parts(parent_id, pipe=self.completion)
+        clear_forced_profile(parent_id, pipe=self.completion)
+        self._complete_cached(payload, parent_id, task_result)
+        self._after_write(_remove_file, payload["pcm_path"])
+    
+    def process_stream_task(self, msg: StreamMessage) -> dict:
+        """
+        Process streaming chunk task (real-time ASR from WebSocket).
+        
+        Args:
+            msg: StreamMessage with payload containing chunk_index, audio_data
             
-            return response
+        Returns:
+            Result dict published to result channel
+        """
+        return self.process_stream_batch([msg])[0]
+    
+    def process_stream_batch(self, msgs: List[StreamMessage]) -> List[dict]:
+        """
+        Process a micro-batch of streaming chunks, possibly from different
+        sessions, with a single batched recognition call.
+        
+        Args:
+            msgs: StreamMessages with payloads containing chunk_index, audio_data
             
+        Returns:
+            Result dicts (one per message) published to each session's channel
+        """
+        if self.streaming is not None:
+            return self._process_stream_online(msgs)
+        
+        responses: List[Optional[dict]] = [None] * len(msgs)
+        pending = []  # (index, audio bytes)
+        
+        for i, msg in enumerate(msgs):
+            chunk_index = msg.payload.get("chunk_index", 0)
+            try:
+                # Decode audio (kept in memory, never written to disk)
+                audio_data = base64.b64decode(msg.payload.get("audio_data", ""))
+                self.stream_chunks += 1
+                if not config.silence_prefilter:
+                    pending.append((i, audio_data))
+                    continue
+                try:
+                    samples, sample_rate = decode_audio_bytes(audio_data)
+                except AudioDecodeError:
+                    pending.append((i, audio_data))  # recognize_batch reports the error
+                    continue
+                if is_silent(samples, sample_rate):
+                    responses[i] = self._publish_silent_chunk(msg, samples_duration(samples, sample_rate))
+                    continue
+                pending.append((i, resample(samples, sample_rate)))
+            except Exception as e:
+                log_error(f"STREAM sess={msg.task_id} chunk={chunk_index} error: {e}", exc_info=True)
+                responses[i] = self._publish_stream_error(msg.task_id, chunk_index, e)
+        
+        try:
+            if pending:
+                # Process
+                start_time = time.time()
+                results = self.recognizer.recognize_batch(
+                    [audio for _, audio in pending],
+                    hotwords=[self._resolve_hotwords(msgs[i].payload) for i, _ in pending],
+                    punctuate=self.finalizer is None
+                )
+                duration = time.time() - start_time
+                
+                for (i, _), result in zip(pending, results):
+                    responses[i] = self._publish_stream_result(msgs[i], result, duration, len(pending))
         except Exception as e:
-            log_error(f"STREAM sess={session_id} chunk={chunk_index} error: {e}", exc_info=True)
-            
-            # Publish error
-            error_response = {
-                "chunk_index": chunk_index,
-                "text": "",
-                "duration": 0.0,
-                "error": str(e)
-            }
-            channel = f"asr_result_{session_id}"
-            redis_client.client.publish(channel, json.dumps(error_response))
-            
-            return error_response
+            for i, _ in pending:
+                if responses[i] is None:
+                    msg = msgs[i]
+                    chunk_index = msg.payload.get("chunk_index", 0)
+                    log_error(f"STREAM sess={msg.task_id} chunk={chunk_index} error: {e}", exc_info=True)
+                    responses[i] = self._publish_stream_error(msg.task_id, chunk_index, e)
+        finally:
+            self._release_memory(heavy=False)
+        
+        return responses
+    
+    def _process_stream_online(self, msgs: List[StreamMessage]) -> List[dict]:
+        """
+        Feed chunks, in arrival order, into their sessions' streaming decoder
+        and publish each chunk's newly decoded text as a partial hypothesis.
+        """
+        responses: List[Optional[dict]] = [None] * len(msgs)
+        # Forwarded chunks can arrive just behind later ones; decode in chunk order
+        order = sorted(range(len(msgs)), key=lambda i: int(msgs[i].payload.get("chunk_index", 0)))
+        try:
+            for i in order:
+                msg = msgs[i]
+                chunk_index = msg.payload.get("chunk_index", 0)
+                try:
+                    audio_data = base64.b64decode(msg.payload.get("audio_data", ""))
+                    is_final = _is_final(msg.payload)
+                    start_time = time.time()
+                    result = self.streaming.feed(msg.task_id, audio_data, is_final=is_final)
+                    if is_final and self.router is not None:
+                        self.router.release(msg.task_id)
+                    duration = time.time() - start_time
+                    responses[i] = self._publish_stream_result(
+                        msg, result, duration, 1,
+                        partial=not is_final, session_text=result.get("session_text", "")
+                    )
+                except Exception as e:
+                    log_error(f"STREAM sess={msg.task_id} chunk={chunk_index} error: {e}", exc_info=True)
+                    responses[i] = self._publish_stream_error(msg.task_id, chunk_index, e)
         finally:
-            self.recognizer.cleanup()
-            force_memory_release()
+            self._release_memory(heavy=False)
+        return responses
+    
+    def _publish_stream_result(self, msg: StreamMessage, result: dict, duration: float, batch: int,
+                               **extra) -> dict:
+        """Publish one chunk result to its session channel and cache it."""
+        session_id = msg.task_id
+        chunk_index = msg.payload.get("chunk_index", 0)
+        
+        # Prepare response
+        response = {
+            "chunk_index": chunk_index,
+            "text": result.get("text", ""),
+            "duration": result.get("duration", 0.0),
+            "error": result.get("error", ""),
+            **extra
+        }
+        
+        # Publish to result channel (Pub/Sub for Go backend)
+        channel = f"asr_result_{session_id}"
+        self._pipe().publish(channel, json.dumps(response))
+        
+        # P0 Fix: Result Reliability - Cache result
+        redis_client.cache_stream_result(session_id, response, pipe=self.completion)
+        
+        if self.finalizer is not None and not response["error"]:
+            final = self.finalizer.on_chunk(
+                session_id, int(chunk_index), response["text"], _is_final(msg.payload), pipe=self.completion
+            )
+            if final is not None:
+                log_worker(
+                    f"STREAM sess={session_id} segment {final['segment_start']}-{final['segment_end']} "
+                    f"punctuated ({len(final['text'])} chars)"
+                )
+        
+        log_worker(
+            f"STREAM sess={session_id} chunk={chunk_index} "
+            f"time={duration:.3f}s batch={batch}"
+        )
+        return response
+    
+    def _publish_silent_chunk(self, msg: StreamMessage, audio_s: float) -> dict:
+        """Publish an empty result for a chunk the silence prefilter skipped."""
+        self.silence_skipped += 1
+        self.silence_skipped_s += audio_s
+        redis_client.add_silence_skip(msg.task_id, audio_s, pipe=self.completion)
+        return self._publish_stream_result(msg, {"text": "", "duration": audio_s}, 0.0, 0, skipped="silence")
+    
+    def _publish_stream_error(self, session_id: str, chunk_index: int, error: Exception) -> dict:
+        """Publish an error response for a chunk."""
+        error_response = {
+            "chunk_index": chunk_index,
+            "text": "",
+            "duration": 0.0,
+            "error": str(error)
+        }
+        channel = f"asr_result_{session_id}"
+        self._pipe().publish(channel, json.dumps(error_response))
+        return error_response
     
     def start_heartbeat(self):
         """Start background heartbeat thread."""
         def heartbeat_loop():
             log_worker(f"Heartbeat thread started for {self.worker_name}")
+            last_beat, last_busy = time.monotonic(), self.busy_s
             while self.running:
                 try:
+                    now, busy = time.monotonic(), self.busy_s
+                    utilization = (busy - last_busy) / (now - last_beat) if now > last_beat else 0.0
+                    last_beat, last_busy = now, busy
                     # Construct heartbeat payload
                     payload = {
                         "ts": int(time.time()),
                         "worker": self.worker_name,
                         "status": "running",
-                        # TODO: Add real load metrics (cpu, memory, queue depth)
-                        "load": {} 
+                        # TODO: Add real load metrics (cpu, queue depth)
+                        "load": {
+                            "memory": self.memory.stats(),
+                            "loop": {"mode": config.worker_mode, "utilization": round(min(utilization, 1.0), 3)},
+                        },
+                        "models": self.recognizer.models.resident(),
+                        "startup": self.startup_timings,
                     }
+                    if self.streaming is not None:
+                        payload["load"]["streaming"] = self.streaming.stats()
+                    if self.router is not None:
+                        payload["load"]["affinity"] = self.router.stats()
+                    if config.language_models:
+                        payload["load"]["models"] = self.recognizer.models.stats()
+                    payload["load"]["completion"] = self.completion_stats.stats()
+                    if self.reclaimer is not None:
+                        payload["load"]["reclaim"] = self.reclaimer.stats()
+                    if config.silence_prefilter:
+                        payload["load"]["silence"] = {
+                            "chunks": self.stream_chunks,
+                            "skipped": self.silence_skipped,
+                            "skipped_audio_s": round(self.silence_skipped_s, 3),
+                        }
                     
                     # Write to Redis with TTL
-                    key = f"worker:{self.worker_name}:heartbeat"
+                    key = HEARTBEAT_KEY.format(self.worker_name)
                     # Use set with ex (expiration)
                     redis_client.client.set(key, json.dumps(payload), ex=30)
                     
@@ -269,42 +721,199 @@ class UnifiedWorker:
         t = threading.Thread(target=heartbeat_loop, daemon=True)
         t.start()
 
+    def _consume(self, batch_size: int, block_ms: int) -> List[StreamMessage]:
+        """
+        Read from the shared stream (and this worker's inbox with affinity on).
+        Chunks of sessions owned by other workers are forwarded straight away
+        so they reach their owner within its batching window.
+        """
+        if self.router is None:
+            return consume_tasks(worker_name=self.worker_name, batch_size=batch_size, block_ms=block_ms)
+        try:
+            messages = consume_tasks(
+                worker_name=self.worker_name,
+                batch_size=batch_size,
+                block_ms=block_ms,
+                extra_streams=[self.router.inbox]
+            )
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # Inbox was swept while our heartbeat lapsed; recreate it
+            self.router.register()
+            return []
+        return self.router.route(messages)
+    
+    def _pipe(self):
+        """Where completion writes go: the current CompletionBatch, or straight to Redis"""
+        return self.completion if self.completion is not None else redis_client.client
+    
+    def _write_completion(self, batch: CompletionBatch):
+        """Send a task's result writes and XACKs in one round trip"""
+        write(redis_client.client, batch, self.completion_stats)
+    
+    @staticmethod
+    def _flush(flush: Callable[[CompletionBatch], None], batch: CompletionBatch):
+        """Hand over a completion; a failed write leaves its messages pending for the reclaimer"""
+        try:
+            flush(batch)
+        except Exception as e:
+            log_error(f"Failed to write completion of {batch.tasks} task(s): {e}")
+    
+    def _forward_to_warm(self, msg: StreamMessage) -> bool:
+        """
+        Hand a batch task needing a model that is cold here to a worker
+        that has it resident. Forwarded tasks are never forwarded again.
+        """
+        if self.router is None or msg.task_type not in ("batch", "batch_part") or msg.payload.get("routed"):
+            return False
+        model_name = self.recognizer.models.resolve(msg.payload.get("language"))
+        if model_name in self.recognizer.models.resident():
+            return False
+        owner = self.router.warm_worker(model_name)
+        if owner is None:
+            return False
+        msg.payload["routed"] = True
+        self.router.forward(msg, owner)
+        log_worker(f"{msg.task_type.upper()} task={msg.task_id} forwarded to {owner} ({model_name} resident)")
+        return True
+    
+    def _sweep_inboxes(self):
+        """Periodically hand dead workers' unprocessed chunks back to the shared stream."""
+        if self.router is None or time.monotonic() - self._last_sweep < 15:
+            return
+        self._last_sweep = time.monotonic()
+        moved = self.router.sweep_dead_inboxes()
+        if moved:
+            log_worker(f"Requeued {moved} chunks from dead workers' inboxes")
+    
+    def _reclaim(self) -> List[StreamMessage]:
+        """Stale messages of dead or stuck workers, when a reclaim check is due"""
+        if self.reclaimer is None or not self.reclaimer.due():
+            return []
+        try:
+            messages = self.reclaimer.reclaim()
+        except Exception as e:
+            log_error(f"Reclaiming stale messages failed: {e}")
+            return []
+        if messages:
+            log_worker(f"Reclaimed {len(messages)} stale message(s): {', '.join(m.task_id for m in messages)}")
+        return messages
+    
+    def _collect_messages(self) -> List[StreamMessage]:
+        """
+        Read the next messages, holding a short window open so stream
+        chunks from several sessions can be batched together. Reclaimed
+        stale messages come first, as a batch of their own.
+        """
+        reclaimed = self._reclaim()
+        if reclaimed:
+            return reclaimed
+        max_batch = max(1, config.stream_batch_size)
+        messages = self._consume(max_batch, 1000)
+        if not messages or config.stream_batch_wait_ms <= 0:
+            return messages
+        
+        deadline = time.monotonic() + config.stream_batch_wait_ms / 1000
+        while self.running:
+            stream_count = sum(1 for m in messages if m.task_type == "stream")
+            if stream_count == 0 or stream_count >= max_batch:
+                break
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            more = self._consume(max_batch - stream_count, remaining_ms)
+            if not more:
+                break
+            messages.extend(more)
+        
+        return messages
+
+    def _housekeeping(self):
+        """Periodic work between batches (runs on the inference thread)"""
+        self._sweep_inboxes()
+        if self.finalizer is not None:
+            self.finalizer.flush_idle()
+        if self.streaming is not None:
+            for session_id in self.streaming.evict_idle():
+                log_worker(f"STREAM sess={session_id} evicted (idle)")
+    
+    def _process_messages(self, messages: List[StreamMessage], flush: Callable[[CompletionBatch], None]):
+        """
+        Run the handlers for one batch of messages. Each task (or the stream
+        micro-batch as a whole) queues its result writes and the XACKs of the
+        messages it processed in a CompletionBatch, handed to flush. Failed
+        messages aren't acked and stay claimable.
+        """
+        start = time.perf_counter()
+        
+        # Stream chunks are latency sensitive: run them first, as one batch
+        stream_msgs = [m for m in messages if m.task_type == "stream"]
+        if stream_msgs:
+            self.completion = CompletionBatch()
+            try:
+                self.process_stream_batch(stream_msgs)
+                for msg in stream_msgs:
+                    self.completion.ack(msg)
+            except Exception as e:
+                # Don't ack - messages will be claimable by another worker
+                log_error(f"Failed to process stream batch of {len(stream_msgs)}: {e}")
+            finally:
+                batch, self.completion = self.completion, None
+                self._flush(flush, batch)
+        
+        for msg in messages:
+            if msg.task_type == "stream":
+                continue
+            self.completion = CompletionBatch()
+            try:
+                if self._forward_to_warm(msg):
+                    continue
+                
+                # Route to appropriate handler
+                if msg.task_type == "batch":
+                    self.process_batch_task(msg)
+                elif msg.task_type == "batch_part":
+                    self.process_batch_part(msg)
+                else:
+                    log_worker(f"Unknown task type: {msg.task_type}")
+                
+                # Acknowledge message after successful processing
+                self.completion.ack(msg)
+                
+            except Exception as e:
+                # Don't ack - message will be claimable by another worker
+                log_error(f"Failed to process msg={msg.msg_id}: {e}")
+            finally:
+                batch, self.completion = self.completion, None
+                self._flush(flush, batch)
+        
+        self.busy_s += time.perf_counter() - start
+
     def run(self):
         """Main worker loop using Consumer Groups."""
-        log_worker(f"Worker {self.worker_name} starting main loop...")
+        log_worker(f"Worker {self.worker_name} starting main loop ({config.worker_mode})...")
         
         # Start heartbeat
         self.start_heartbeat()
         
         # Ensure consumer group exists
         ensure_consumer_group()
+        if self.router is not None:
+            self.router.register()
+        
+        if config.worker_mode == "async":
+            from src.worker.async_loop import AsyncWorkerLoop
+            AsyncWorkerLoop(self, prefetch=config.worker_prefetch).run()
+            log_worker(f"Worker {self.worker_name} shutting down.")
+            return
         
         while self.running:
             try:
                 # Read messages from stream
-                messages = consume_tasks(
-                    worker_name=self.worker_name,
-                    batch_size=5,
-                    block_ms=1000
-                )
-                
-                for msg in messages:
-                    try:
-                        # Route to appropriate handler
-                        if msg.task_type == "batch":
-                            self.process_batch_task(msg)
-                        elif msg.task_type == "stream":
-                            self.process_stream_task(msg)
-                        else:
-                            log_worker(f"Unknown task type: {msg.task_type}")
-                        
-                        # Acknowledge message after successful processing
-                        ack_task(msg.msg_id)
-                        
-                    except Exception as e:
-                        # Don't ack - message will be claimable by another worker
-                        log_error(f"Failed to process msg={msg.msg_id}: {e}")
-                        
+                messages = self._collect_messages()
+                self._housekeeping()
+                self._process_messages(messages, self._write_completion)
             except Exception as e:
                 log_error(f"Error in worker loop: {e}")
                 time.sleep(1)
@@ -317,6 +926,16 @@ def main():
     parser.add_argument("--name", default="worker-1", help="Worker name")
     parser.add_argument("--stream", default="asr_tasks", help="Stream name")
     parser.add_argument("--group", default="asr_workers", help="Consumer group name")
+    parser.add_argument("--cpu-index", type=int, default=None,
+                        help="Pin to partition N (0-based) of the CPU budget")
+    parser.add_argument("--cpu-workers", type=int, default=int(os.getenv("WORKER_COUNT", 1)),
+                        help="Workers sharing the CPU budget")
+    parser.add_argument("--cpu-budget", default=os.getenv("CPU_BUDGET", ""),
+                        help="cpulist shared by all workers, e.g. 0-15 (default: all cores)")
+    parser.add_argument("--numa", action="store_true", default=os.getenv("CPU_NUMA", "") == "1",
+                        help="Keep each worker's cores within one NUMA node")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Intra-op threads (default: one per partition core)")
     args = parser.parse_args()
     
     # Override from environment if present
@@ -324,6 +943,12 @@ def main():
     group_name = os.getenv("CONSUMER_GROUP", args.group)
     worker_name = os.getenv("WORKER_NAME", args.name)
     
+    if args.cpu_index is not None:
+        # Must happen before the models load so thread pools start at the right size
+        cores = worker_cores(args.cpu_index, args.cpu_workers, args.cpu_budget, args.numa)
+        threads = apply_cpu_partition(cores, intra_threads=args.threads)
+        log_worker(f"Worker '{worker_name}' pinned to cores {format_cpulist(cores)} threads={threads}")
+    
     worker = UnifiedWorker(worker_name, stream_name, group_name)
     worker.run()
 
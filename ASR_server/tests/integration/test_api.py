@@ -178,3 +178,82 @@ def test_download_audio_not_found(mock_file_handler, client):
     response = client.get("/api/v1/asr/audio/nonexistent")
     assert response.status_code == 404
 
+
+# ============================================================================
+# Test Dead-Letter Endpoints
+# ============================================================================
+
+@pytest.fixture
+def dlq_redis():
+    import fakeredis
+    from src.utils.redis_client import redis_client
+    from src.utils.streams import streams_client
+    
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    with patch.object(streams_client, "_redis", fake), patch.object(redis_client, "_client", fake):
+        yield fake
+
+def _add_dead_letter(fake, task_id="t1"):
+    import json
+    from src.utils.streams import DLQ_STREAM
+    return fake.xadd(DLQ_STREAM, {
+        "type": "batch", "task_id": task_id, "payload": json.dumps({"audio_path": "/a.wav"}),
+        "timestamp": 0, "origin": "fastapi",
+        "original_id": "1-0", "deliveries": 3, "consumer": "worker-1", "dead_at": 1000,
+    })
+
+def test_list_dead_letters(dlq_redis, client):
+    """Test listing the dead-letter stream"""
+    dlq_id = _add_dead_letter(dlq_redis)
+    
+    response = client.get("/api/v1/asr/dlq")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["entries"][0]["id"] == dlq_id
+    assert data["entries"][0]["deliveries"] == 3
+    assert data["entries"][0]["payload"] == {"audio_path": "/a.wav"}
+
+def test_replay_dead_letter(dlq_redis, client):
+    """Test replaying a dead letter re-queues the task"""
+    from src.utils.streams import DLQ_STREAM, STREAM_NAME
+    dlq_id = _add_dead_letter(dlq_redis)
+    
+    response = client.post(f"/api/v1/asr/dlq/{dlq_id}/replay")
+    
+    assert response.status_code == 200
+    assert response.json()["replayed"] == [dlq_id]
+    assert dlq_redis.xlen(DLQ_STREAM) == 0
+    assert dlq_redis.xlen(STREAM_NAME) == 1
+    assert client.get("/api/v1/asr/result/t1").json()["status"] == "queued"
+    assert client.post(f"/api/v1/asr/dlq/{dlq_id}/replay").status_code == 404
+
+def test_replay_all_dead_letters(dlq_redis, client):
+    """Test replaying every dead letter, oldest first"""
+    ids = [_add_dead_letter(dlq_redis, f"t{i}") for i in range(3)]
+    
+    response = client.post("/api/v1/asr/dlq/replay")
+    
+    assert response.json()["replayed"] == ids
+    assert client.delete(f"/api/v1/asr/dlq/{ids[0]}").status_code == 404
+
+@patch("src.api.routes.file_handler")
+def test_retry_keeps_submit_parameters(mock_file_handler, dlq_redis, client, tmp_path):
+    """Test a retried task is re-queued with its original language and hotwords"""
+    import json
+    from src.utils.redis_client import redis_client
+    from src.utils.streams import STREAM_NAME
+    audio = tmp_path / "t1.wav"
+    audio.write_bytes(b"RIFF")
+    mock_file_handler.get_file_path.return_value = str(audio)
+    request = {"language": "en", "batch_size": 60, "merge_length_s": 15,
+               "hotword_set": "acme", "hotwords": None, "content_hash": "abc"}
+    redis_client.save_task_request("t1", request)
+    redis_client.save_task_result("t1", {"task_id": "t1", "status": "failed"})
+    
+    response = client.post("/api/v1/asr/retry/t1")
+    
+    assert response.status_code == 200
+    payload = json.loads(dlq_redis.xrange(STREAM_NAME)[0][1]["payload"])
+    assert payload == {"audio_path": str(audio), **request}
@@ -0,0 +1,167 @@
+"""
+Unit tests for session-affine stream routing.
+
+Run: pytest tests/unit/test_affinity.py -v
+"""
+import json
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+import redis
+
+from src.utils.streams import CONSUMER_GROUP, STREAM_NAME, StreamMessage, streams_client
+from src.worker.affinity import (
+    HEARTBEAT_KEY, INBOX_INDEX_KEY, OWNER_PREFIX, SessionRouter, inbox_stream
+)
+from src.worker.completion import CompletionBatch, CompletionStats, write
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    with patch.object(streams_client, "_redis", client):
+        yield client
+
+
+def chunk(session_id: str, index: int, msg_id: str = "1-0", stream: str = STREAM_NAME) -> StreamMessage:
+    return StreamMessage(msg_id, "stream", session_id, {"chunk_index": index, "audio_data": ""}, 0, "go", stream)
+
+
+def alive(client, *workers):
+    for worker in workers:
+        client.set(HEARTBEAT_KEY.format(worker), "{}")
+
+
+def test_first_reader_owns_session(fake_redis):
+    """Test the first worker to see a session takes the lease"""
+    a = SessionRouter("a")
+    msgs = [chunk("s1", 0)]
+    assert a.route(msgs) == msgs
+    assert fake_redis.get(f"{OWNER_PREFIX}s1") == "a"
+    assert fake_redis.ttl(f"{OWNER_PREFIX}s1") > 0
+
+
+def test_foreign_chunks_forwarded_to_owner(fake_redis):
+    """Test chunks read by another worker go to the owner's inbox and are acked"""
+    alive(fake_redis, "a", "b")
+    a, b = SessionRouter("a"), SessionRouter("b")
+    a.register()
+    a.route([chunk("s1", 0)])
+
+    fake_redis.xgroup_create(STREAM_NAME, CONSUMER_GROUP, id="0", mkstream=True)
+    msg_id = fake_redis.xadd(STREAM_NAME, {"type": "stream", "task_id": "s1", "payload": "{}"})
+    fake_redis.xreadgroup(CONSUMER_GROUP, "b", {STREAM_NAME: ">"})
+
+    batch = [chunk("s1", 1, msg_id), StreamMessage("2-0", "batch", "t1", {}, 0, "api")]
+    mine = b.route(batch)
+    assert [m.task_type for m in mine] == ["batch"]
+    assert b.forwarded == 1
+
+    entries = fake_redis.xrange(inbox_stream("a"))
+    assert len(entries) == 1
+    assert json.loads(entries[0][1]["payload"])["chunk_index"] == 1
+    assert fake_redis.xpending(STREAM_NAME, CONSUMER_GROUP)["pending"] == 0
+
+
+def test_failover_when_owner_heartbeat_missing(fake_redis):
+    """Test a dead owner's session is taken over and its inbox requeued"""
+    alive(fake_redis, "b")
+    a, b = SessionRouter("a"), SessionRouter("b")
+    a.register()
+    a.route([chunk("s1", 0)])
+    fake_redis.xadd(inbox_stream("a"), {"type": "stream", "task_id": "s1", "payload": "{}"})
+
+    assert b.route([chunk("s1", 2)]) != []
+    assert fake_redis.get(f"{OWNER_PREFIX}s1") == "b"
+    assert b.takeovers == 1
+    assert fake_redis.xlen(STREAM_NAME) == 1
+    assert not fake_redis.exists(inbox_stream("a"))
+    assert "a" not in fake_redis.smembers(INBOX_INDEX_KEY)
+
+
+def test_completion_deletes_inbox_entries(fake_redis):
+    """Test processed inbox chunks are removed so they are never requeued"""
+    a = SessionRouter("a")
+    a.register()
+    msg_id = fake_redis.xadd(a.inbox, {"type": "stream", "task_id": "s1", "payload": "{}"})
+    fake_redis.xreadgroup(CONSUMER_GROUP, "a", {a.inbox: ">"})
+    batch = CompletionBatch()
+    batch.ack(chunk("s1", 0, msg_id, a.inbox))
+    write(fake_redis, batch, CompletionStats())
+    assert fake_redis.xlen(a.inbox) == 0
+    assert fake_redis.xpending(a.inbox, CONSUMER_GROUP)["pending"] == 0
+
+
+def test_sweep_skips_live_workers(fake_redis):
+    """Test only inboxes of workers without a heartbeat are swept"""
+    alive(fake_redis, "live")
+    for name in ("live", "dead"):
+        SessionRouter(name).register()
+        fake_redis.xadd(inbox_stream(name), {"type": "stream", "task_id": "s", "payload": "{}"})
+
+    assert SessionRouter("sweeper").sweep_dead_inboxes() == 1
+    assert fake_redis.xlen(inbox_stream("live")) == 1
+    assert fake_redis.smembers(INBOX_INDEX_KEY) == {"live"}
+
+
+def test_release(fake_redis):
+    """Test a finished session drops its lease"""
+    a = SessionRouter("a")
+    a.route([chunk("s1", 0)])
+    a.release("s1")
+    assert not fake_redis.exists(f"{OWNER_PREFIX}s1")
+
+
+def test_warm_worker_from_heartbeats(fake_redis):
+    """Test batch tasks find a live worker with the model resident"""
+    fake_redis.set(HEARTBEAT_KEY.format("a"), json.dumps({"worker": "a", "models": ["paraformer-zh", "model-yue"]}))
+    fake_redis.set(HEARTBEAT_KEY.format("b"), json.dumps({"worker": "b", "models": ["paraformer-zh", "paraformer-en"]}))
+    router = SessionRouter("a", sessions=False)
+    assert router.warm_worker("paraformer-en") == "b"
+    assert router.warm_worker("model-yue") is None  # resident only on this worker
+
+    SessionRouter("b", sessions=False).register()
+    router.forward(StreamMessage("1-0", "batch", "t1", {"language": "en"}, 0, "api"), "b")
+    assert json.loads(fake_redis.xrange(inbox_stream("b"))[0][1]["payload"]) == {"language": "en"}
+
+
+def test_sessions_off_keeps_stream_chunks(fake_redis):
+    """Test a router without session affinity processes every chunk itself"""
+    alive(fake_redis, "a", "b")
+    SessionRouter("a").route([chunk("s1", 0)])
+    msgs = [chunk("s1", 1)]
+    assert SessionRouter("b", sessions=False).route(msgs) == msgs
+
+
+def test_forward_never_recreates_swept_inbox(fake_redis):
+    """Test chunks for a swept inbox go back to the shared stream instead"""
+    fake_redis.xgroup_create(STREAM_NAME, CONSUMER_GROUP, id="0", mkstream=True)
+    msg_id = fake_redis.xadd(STREAM_NAME, {"type": "stream", "task_id": "s1", "payload": "{}"})
+    fake_redis.xreadgroup(CONSUMER_GROUP, "b", {STREAM_NAME: ">"})
+
+    SessionRouter("b").forward(chunk("s1", 1, msg_id), "gone")
+
+    assert not fake_redis.exists(inbox_stream("gone"))
+    assert fake_redis.xlen(STREAM_NAME) == 2
+    assert fake_redis.xpending(STREAM_NAME, CONSUMER_GROUP)["pending"] == 0
+
+
+def test_requeue_rereads_when_forward_races(fake_redis):
+    """Test a chunk forwarded between the inbox read and delete is requeued, not lost"""
+    SessionRouter("a").register()
+    fake_redis.xadd(inbox_stream("a"), {"type": "stream", "task_id": "s1", "payload": "{}"})
+    xrange = redis.client.Pipeline.xrange
+    raced = []
+
+    def racing_xrange(pipe, *args, **kwargs):
+        entries = xrange(pipe, *args, **kwargs)
+        if not raced:
+            raced.append(fake_redis.xadd(inbox_stream("a"), {"type": "stream", "task_id": "s1", "payload": "{}"}))
+        return entries
+
+    with patch.object(redis.client.Pipeline, "xrange", racing_xrange):
+        assert SessionRouter("b").requeue_inbox("a") == 2
+
+    assert fake_redis.xlen(STREAM_NAME) == 2
+    assert not fake_redis.exists(inbox_stream("a"))
@@ -0,0 +1,113 @@
+"""
+Unit tests for the asyncio worker loop
+"""
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from src.utils.streams import CONSUMER_GROUP, STREAM_NAME, AsyncStreamsClient
+from src.worker.async_loop import AsyncWorkerLoop
+from src.worker.completion import CompletionBatch, CompletionStats
+
+
+class FakeWorker:
+    """The parts of UnifiedWorker the loop uses; stops after `expected` messages"""
+
+    def __init__(self, expected: int, fail=(), delay_s: float = 0.0):
+        self.worker_name = "worker-1"
+        self.router = None
+        self.running = True
+        self.expected = expected
+        self.fail = set(fail)
+        self.delay_s = delay_s
+        self.processed = []
+        self.batches = []
+        self.threads = set()
+        self.housekeeping = 0
+        self.completion_stats = CompletionStats()
+
+    def _housekeeping(self):
+        self.housekeeping += 1
+
+    def _reclaim(self):
+        return []
+
+    def _process_messages(self, messages, flush):
+        self.threads.add(threading.current_thread().name)
+        self.batches.append([m.task_id for m in messages])
+        for msg in messages:
+            time.sleep(self.delay_s)
+            self.processed.append(msg.task_id)
+            batch = CompletionBatch()
+            batch.rpush("done", msg.task_id)
+            if msg.task_id not in self.fail:
+                batch.ack(msg)
+            flush(batch)
+        if len(self.processed) >= self.expected:
+            self.running = False
+
+
+@pytest.fixture
+def server():
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    client.xgroup_create(STREAM_NAME, CONSUMER_GROUP, id="0", mkstream=True)
+
+    def fake_async_client(self):
+        self._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    with patch.object(AsyncStreamsClient, "__init__", fake_async_client), \
+         patch("src.worker.async_loop.config") as cfg:
+        cfg.stream_batch_size = 2
+        cfg.stream_batch_wait_ms = 0
+        yield client
+
+
+def publish(client, *task_ids):
+    for task_id in task_ids:
+        client.xadd(STREAM_NAME, {
+            "type": "batch", "task_id": task_id, "payload": json.dumps({}),
+            "timestamp": 0, "origin": "test",
+        })
+
+
+def pending(client) -> int:
+    return client.xpending(STREAM_NAME, CONSUMER_GROUP)["pending"]
+
+
+def test_processes_and_acks_in_order(server):
+    publish(server, "a", "b", "c", "d", "e")
+    worker = FakeWorker(expected=5)
+    AsyncWorkerLoop(worker, prefetch=2).run()
+
+    assert worker.processed == ["a", "b", "c", "d", "e"]
+    assert worker.threads == {"inference_0"}
+    assert server.lrange("done", 0, -1) == ["a", "b", "c", "d", "e"]
+    assert pending(server) == 0
+    assert worker.completion_stats.tasks == 5
+
+
+def test_failed_messages_stay_pending(server):
+    publish(server, "a", "b", "c")
+    worker = FakeWorker(expected=3, fail={"b"})
+    AsyncWorkerLoop(worker).run()
+
+    assert worker.processed == ["a", "b", "c"]
+    entries = server.xpending_range(STREAM_NAME, CONSUMER_GROUP, min="-", max="+", count=10)
+    assert len(entries) == 1
+
+
+def test_prefetched_batches_finish_on_shutdown(server):
+    publish(server, "a", "b", "c", "d", "e", "f")
+    # Stop after the first batch; the ones read ahead must still be done
+    worker = FakeWorker(expected=1, delay_s=0.05)
+    AsyncWorkerLoop(worker, prefetch=2).run()
+
+    assert len(worker.processed) >= 4  # the current batch plus at least one read ahead
+    assert worker.processed == ["a", "b", "c", "d", "e", "f"][:len(worker.processed)]
+    # Everything that was read was processed and acked
+    assert pending(server) == 0
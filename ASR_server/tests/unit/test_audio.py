@@ -0,0 +1,85 @@
+"""
+Unit tests for in-memory audio decoding.
+
+Run: pytest tests/unit/test_audio.py -v
+"""
+import struct
+
+import numpy as np
+import pytest
+
+from src.asr.audio import (
+    AudioDecodeError, decode_audio_bytes, decode_wav_bytes, merge_segments, resample_linear,
+    samples_duration
+)
+
+
+def make_wav(samples: np.ndarray, sample_rate: int = 16000, channels: int = 1, data_size=None) -> bytes:
+    """Build a 16-bit PCM WAV in memory"""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+    size = len(pcm) if data_size is None else data_size
+    header = b"RIFF" + struct.pack("<I", 36 + len(pcm)) + b"WAVE"
+    header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                                    sample_rate * 2 * channels, 2 * channels, 16)
+    header += b"data" + struct.pack("<I", size)
+    return header + pcm
+
+
+def test_decode_wav_bytes():
+    """Test parsing a mono 16-bit WAV"""
+    samples = np.linspace(-0.5, 0.5, 16000, dtype=np.float32)
+    decoded, sr = decode_wav_bytes(make_wav(samples))
+
+    assert sr == 16000
+    assert decoded.dtype == np.float32
+    assert len(decoded) == 16000
+    assert np.allclose(decoded, samples, atol=1e-3)
+    assert samples_duration(decoded, sr) == pytest.approx(1.0)
+
+
+def test_decode_wav_stereo_downmix():
+    """Test stereo input is averaged to mono"""
+    interleaved = np.array([0.5, -0.5] * 100, dtype=np.float32)
+    decoded, sr = decode_wav_bytes(make_wav(interleaved, sample_rate=8000, channels=2))
+
+    assert sr == 8000
+    assert len(decoded) == 100
+    assert np.allclose(decoded, 0.0, atol=1e-3)
+
+
+def test_decode_wav_streaming_header():
+    """Test data size of 0 (streaming writers) reads to end of buffer"""
+    samples = np.zeros(320, dtype=np.float32)
+    decoded, _ = decode_wav_bytes(make_wav(samples, data_size=0))
+    assert len(decoded) == 320
+
+
+def test_decode_raw_pcm_fallback():
+    """Test headerless bytes are treated as 16 kHz PCM16"""
+    pcm = np.array([0, 16384, -16384], dtype="<i2").tobytes()
+    decoded, sr = decode_audio_bytes(pcm)
+
+    assert sr == 16000
+    assert np.allclose(decoded, [0.0, 0.5, -0.5])
+
+
+def test_decode_wav_without_data():
+    """Test a header-only buffer is rejected"""
+    with pytest.raises(AudioDecodeError):
+        decode_wav_bytes(b"RIFF\x04\x00\x00\x00WAVE")
+
+
+def test_merge_segments():
+    """Test adjacent VAD segments merge up to the length limit"""
+    segments = [[0, 4000], [4500, 9000], [9500, 20000], [21000, 22000]]
+    assert merge_segments(segments, 15000) == [[0, 9000], [9500, 22000]]
+    assert merge_segments([], 15000) == []
+
+
+def test_resample_linear():
+    """Test resampling keeps duration and passes 16 kHz through"""
+    samples = np.linspace(-1, 1, 8000, dtype=np.float32)
+    out = resample_linear(samples, 8000)
+    assert len(out) == 16000
+    assert out.dtype == np.float32
+    assert resample_linear(samples, 16000) is samples
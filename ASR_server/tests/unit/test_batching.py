@@ -0,0 +1,57 @@
+"""
+Unit tests for per-task batching parameters.
+
+Run: pytest tests/unit/test_batching.py -v
+"""
+from unittest.mock import patch
+
+import pytest
+
+from src.asr.batching import BatchParams, plan_batch
+
+
+@pytest.fixture
+def mock_config():
+    with patch("src.asr.batching.config") as cfg:
+        cfg.batch_mode = "adaptive"
+        cfg.batch_size = 500
+        cfg.merge_length_s = 15
+        cfg.adaptive_mb_per_s = 4.0
+        cfg.adaptive_memory_fraction = 0.5
+        cfg.adaptive_min_batch_s = 60
+        cfg.adaptive_max_batch_s = 1000
+        yield cfg
+
+
+def test_fixed_mode_uses_config(mock_config):
+    """Test fixed mode keeps the configured values unless the task overrides them"""
+    mock_config.batch_mode = "fixed"
+    assert plan_batch(3600) == BatchParams(500, 15)
+    assert plan_batch(3600, batch_size_s=200) == BatchParams(200, 15)
+
+
+@pytest.mark.parametrize("free_mb,duration,expected", [
+    (16000, 3600, BatchParams(1000, 15)),   # plenty of memory: capped at max
+    (1600, 3600, BatchParams(200, 15)),     # 1600 * 0.5 / 4
+    (200, 3600, BatchParams(60, 15)),       # never below min
+    (16000, 120, BatchParams(120, 15)),     # no bigger than the file
+    (16000, 10, BatchParams(60, 15)),
+    (16000, 0, BatchParams(1000, 15)),      # unknown duration
+])
+def test_adaptive_batch_size(mock_config, free_mb, duration, expected):
+    """Test batch_size_s follows free memory and duration"""
+    with patch("src.asr.batching.free_memory_mb", return_value=free_mb):
+        assert plan_batch(duration) == expected
+
+
+def test_adaptive_shrinks_merge_length(mock_config):
+    """Test merged segments shrink when only a small batch fits"""
+    mock_config.adaptive_min_batch_s = 20
+    with patch("src.asr.batching.free_memory_mb", return_value=240):
+        assert plan_batch(3600) == BatchParams(30, 7)
+
+
+def test_task_values_win_in_adaptive_mode(mock_config):
+    """Test explicit task parameters are used as given"""
+    with patch("src.asr.batching.free_memory_mb", return_value=100):
+        assert plan_batch(3600, batch_size_s=800, merge_length_s=30) == BatchParams(800, 30)
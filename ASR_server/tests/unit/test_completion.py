@@ -0,0 +1,257 @@
+"""
+Unit tests for batched task completion writes
+"""
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+import fakeredis
+import pytest
+
+from src.utils.redis_client import redis_client
+from src.utils.streams import CONSUMER_GROUP, STREAM_NAME, StreamMessage
+from src.worker.completion import CompletionBatch, CompletionStats, merge, write
+
+
+class CountingRedis(fakeredis.FakeRedis):
+    """FakeRedis that counts pipeline executions (one round trip each)"""
+
+    executions = 0
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def counted(*a, **kw):
+            CountingRedis.executions += 1
+            return execute(*a, **kw)
+        pipe.execute = counted
+        return pipe
+
+
+@pytest.fixture
+def client():
+    client = CountingRedis(decode_responses=True)
+    CountingRedis.executions = 0
+    client.xgroup_create(STREAM_NAME, CONSUMER_GROUP, id="0", mkstream=True)
+    with patch.object(redis_client, "_client", client):
+        yield client
+
+
+def deliver(client, count: int, stream: str = STREAM_NAME):
+    """Publish and read `count` messages so they are pending"""
+    if stream != STREAM_NAME:
+        client.xgroup_create(stream, CONSUMER_GROUP, id="0", mkstream=True)
+    for i in range(count):
+        client.xadd(stream, {"type": "stream", "task_id": f"s{i}", "payload": "{}"})
+    entries = client.xreadgroup(CONSUMER_GROUP, "worker-1", {stream: ">"})[0][1]
+    return [StreamMessage(msg_id, "stream", f"s{i}", {"chunk_index": i}, 0, "test", stream)
+            for i, (msg_id, _) in enumerate(entries)]
+
+
+def test_batch_records_and_acks_in_one_round_trip(client):
+    msgs = deliver(client, 3)
+    batch = CompletionBatch()
+    for msg in msgs:
+        redis_client.cache_stream_result(msg.task_id, {"text": "hi"}, pipe=batch)
+        batch.publish(f"asr_result_{msg.task_id}", "{}")
+        batch.ack(msg)
+    stats = CompletionStats()
+
+    write(client, batch, stats)
+
+    assert CountingRedis.executions == 1
+    assert client.xpending(STREAM_NAME, CONSUMER_GROUP)["pending"] == 0
+    assert json.loads(client.lrange("asr:results:s0", 0, -1)[0]) == {"text": "hi"}
+    assert client.ttl("asr:results:s2") > 0
+    assert stats.stats()["completion_round_trips_per_task"] == pytest.approx(1 / 3, abs=1e-3)
+    assert batch.tasks == 3
+
+
+def test_inbox_entries_are_deleted(client):
+    inbox = f"{STREAM_NAME}:worker:w1"
+    msgs = deliver(client, 2, inbox)
+    batch = CompletionBatch()
+    for msg in msgs:
+        batch.ack(msg)
+
+    write(client, batch, CompletionStats())
+
+    assert client.xlen(inbox) == 0
+
+
+def test_empty_batch_is_not_sent(client):
+    stats = CompletionStats()
+    write(client, CompletionBatch(), stats)
+    assert CountingRedis.executions == 0
+    assert stats.stats()["completion_round_trips"] == 0
+
+
+def test_merge_keeps_order_and_acks_last():
+    a, b = CompletionBatch(), CompletionBatch()
+    a.rpush("k", 1)
+    a.ack(StreamMessage("1-0", "stream", "s", {}, 0, "t"))
+    b.rpush("k", 2)
+    b.ack(StreamMessage("2-0", "stream", "s", {}, 0, "t"))
+
+    merged = merge([a, b])
+
+    assert [args for _, args, _ in merged.commands] == [("k", 1), ("k", 2)]
+    assert merged.acks == {STREAM_NAME: ["1-0", "2-0"]}
+
+
+def test_private_attributes_are_not_commands():
+    with pytest.raises(AttributeError):
+        CompletionBatch()._missing
+
+
+def test_history_and_result_queue_on_batch(client):
+    batch = CompletionBatch()
+    redis_client.save_task_result("t1", {"status": "done"}, pipe=batch)
+    redis_client.add_to_history({"task_id": "t1"}, pipe=batch)
+    assert client.get("asr:task:t1") is None
+
+    write(client, batch, CompletionStats())
+
+    assert json.loads(client.get("asr:task:t1")) == {"status": "done"}
+    assert json.loads(client.lrange("asr:history:latest", 0, -1)[0]) == {"task_id": "t1"}
+
+
+def test_stream_micro_batch_is_one_round_trip(client):
+    """Results, caches and XACKs of a whole stream micro-batch share one pipeline"""
+    from src.worker.unified_worker import UnifiedWorker
+
+    worker = UnifiedWorker.__new__(UnifiedWorker)
+    worker.finalizer = None
+    worker.router = None
+    worker.completion = None
+    worker.completion_stats = CompletionStats()
+    worker.busy_s = 0.0
+    msgs = deliver(client, 4)
+    pubsub = client.pubsub()
+    pubsub.subscribe("asr_result_s0")
+    pubsub.get_message()
+
+    def process_stream_batch(batch):
+        return [worker._publish_stream_result(m, {"text": "hi"}, 0.1, len(batch)) for m in batch]
+
+    with patch.object(worker, "process_stream_batch", process_stream_batch):
+        worker._process_messages(msgs, worker._write_completion)
+
+    assert CountingRedis.executions == 1
+    assert worker.completion_stats.stats()["completion_round_trips_per_task"] == 0.25
+    assert client.xpending(STREAM_NAME, CONSUMER_GROUP)["pending"] == 0
+    assert client.llen("asr:results:s3") == 1
+    assert json.loads(pubsub.get_message()["data"])["text"] == "hi"
+    assert worker.completion is None
+
+
+def test_failed_write_does_not_skip_remaining_messages(client):
+    """A completion write that fails is logged and the next message still runs"""
+    from src.worker.unified_worker import UnifiedWorker
+
+    worker = UnifiedWorker.__new__(UnifiedWorker)
+    worker.router = None
+    worker.completion = None
+    worker.busy_s = 0.0
+    msgs = [StreamMessage(f"{i}-0", "batch", f"t{i}", {}, 0, "test") for i in range(3)]
+    processed, written = [], []
+
+    def flush(batch):
+        if not written:
+            written.append(None)
+            raise ConnectionError("redis went away")
+        written.append(batch.tasks)
+
+    with patch.object(worker, "process_batch_task", lambda msg: processed.append(msg.task_id)):
+        worker._process_messages(msgs, flush)
+
+    assert processed == ["t0", "t1", "t2"]
+    assert written == [None, 1, 1]
+
+
+def test_callbacks_run_only_after_a_successful_write(client):
+    done = []
+    batch = CompletionBatch()
+    batch.set("k", "v")
+    batch.after(done.append, "written")
+
+    with patch.object(client, "pipeline", side_effect=ConnectionError("down")):
+        with pytest.raises(ConnectionError):
+            write(client, batch, CompletionStats())
+    assert done == []
+
+    write(client, merge([batch, CompletionBatch()]), CompletionStats())
+    assert done == ["written"]
+
+
+def fanned_out_worker(tmp_path):
+    """A worker with a parent task fanned out into two parts, part 0 already stored"""
+    from src.worker.unified_worker import UnifiedWorker
+
+    worker = UnifiedWorker.__new__(UnifiedWorker)
+    worker.completion = None
+    worker.recognizer = MagicMock()
+    worker.recognizer.recognize.return_value = {"status": "success", "text": "b"}
+    worker.memory = MagicMock()
+    worker.memory.after_task.return_value = None
+    pcm_path = tmp_path / "p1.npy"
+    np.save(pcm_path, np.zeros(32000, dtype=np.float32))
+    redis_client.save_task_result("p1", {"task_id": "p1", "status": "processing"})
+    redis_client.save_task_part("p1", 0, {"status": "success", "text": "a", "error": ""})
+    payload = {"parent_id": "p1", "part_index": 1, "parts_total": 2, "pcm_path": str(pcm_path),
+               "sample_rate": 16000, "start_ms": 0, "end_ms": 1000, "duration": 2.0}
+    return worker, StreamMessage("1-0", "batch_part", "p1:1", payload, 0, "test"), pcm_path
+
+
+def test_merge_cleanup_waits_for_the_result_write(client, tmp_path):
+    """A failed flush of the merged result leaves the PCM and parts for the redelivered part"""
+    worker, msg, pcm_path = fanned_out_worker(tmp_path)
+
+    worker.completion = CompletionBatch()
+    worker.process_batch_part(msg)
+    # The flush fails: nothing of the merge is visible, and the PCM is kept
+    worker.completion = None
+    assert redis_client.get_task_result("p1")["status"] == "processing"
+    assert pcm_path.exists()
+
+    # Redelivered: the same part merges again and the cleanup follows the write
+    worker.completion = CompletionBatch()
+    worker.process_batch_part(msg)
+    batch, worker.completion = worker.completion, None
+    assert pcm_path.exists()
+    write(client, batch, CompletionStats())
+
+    assert redis_client.get_task_result("p1")["text"] == "ab"
+    assert redis_client.get_task_parts("p1") == {}
+    assert not pcm_path.exists()
+
+
+def test_missing_pcm_of_unfinished_parent_is_not_acked(client, tmp_path):
+    worker, msg, pcm_path = fanned_out_worker(tmp_path)
+    pcm_path.unlink()
+
+    with pytest.raises(RuntimeError):
+        worker.process_batch_part(msg)
+
+    redis_client.save_task_result("p1", {"task_id": "p1", "status": "done"})
+    assert worker.process_batch_part(msg) == {"status": "skipped"}
+
+
+def test_duplicates_answered_after_the_leader_result(client):
+    """Waiters copy the leader's result only once it is written"""
+    from src.utils.result_cache import result_cache
+    from src.worker.unified_worker import UnifiedWorker
+
+    worker = UnifiedWorker.__new__(UnifiedWorker)
+    result_cache.lookup_or_claim("k", "t1")
+    result_cache.lookup_or_claim("k", "t2")
+    worker.completion = CompletionBatch()
+    result = {"task_id": "t1", "status": "done", "text": "hi"}
+    redis_client.save_task_result("t1", result, pipe=worker.completion)
+    worker._complete_cached({"cache_key": "k"}, "t1", result)
+
+    assert redis_client.get_task_result("t2") is None
+    write(client, worker.completion, CompletionStats())
+    assert redis_client.get_task_result("t2")["text"] == "hi"
@@ -0,0 +1,50 @@
+"""
+Unit tests for CPU core partitioning.
+
+Run: pytest tests/unit/test_cpu.py -v
+"""
+from unittest.mock import patch
+
+from src.utils.cpu import apply_cpu_partition, format_cpulist, parse_cpulist, partition_cores
+
+
+def test_cpulist_roundtrip():
+    """Test cpulist parsing and formatting"""
+    assert parse_cpulist("0-3,8, 10-11") == [0, 1, 2, 3, 8, 10, 11]
+    assert format_cpulist([0, 1, 2, 3, 8, 10, 11]) == "0-3,8,10-11"
+
+
+def test_partition_disjoint():
+    """Test cores are split into near-equal disjoint sets"""
+    parts = partition_cores(list(range(10)), 3)
+    assert parts == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+
+
+def test_partition_fewer_cores_than_workers():
+    """Test workers share cores when the budget is too small"""
+    assert partition_cores([0, 1], 3) == [[0], [1], [0]]
+
+
+def test_partition_numa_aware():
+    """Test no worker straddles a NUMA node"""
+    nodes = {0: [0, 1, 2, 3], 1: [4, 5, 6, 7]}
+    assert partition_cores(list(range(8)), 4, nodes) == [[0, 1], [2, 3], [4, 5], [6, 7]]
+
+    # Plain splitting would give the middle worker cores 3 and 4 from both nodes
+    assert partition_cores(list(range(8)), 3) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert partition_cores(list(range(8)), 3, nodes) == [[0, 1, 2, 3], [4, 5], [6, 7]]
+
+
+def test_apply_cpu_partition():
+    """Test affinity and thread pools follow the partition"""
+    with patch.dict("os.environ"), \
+         patch("os.sched_setaffinity", create=True) as affinity, \
+         patch("torch.set_num_threads") as set_threads, \
+         patch("torch.set_num_interop_threads"), \
+         patch("src.asr.config.config") as mock_config:
+        threads = apply_cpu_partition([2, 3, 4])
+
+    assert threads == 3
+    affinity.assert_called_once_with(0, [2, 3, 4])
+    set_threads.assert_called_once_with(3)
+    assert mock_config.onnx_intra_op_threads == 3
@@ -0,0 +1,101 @@
+"""
+Unit tests for canonical-PCM decoding and the PCM cache.
+
+Run: pytest tests/unit/test_decoding.py -v
+"""
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.asr import decoding
+from src.asr.decoding import PcmCache, _decode_job, decode_to_pcm, file_sha256, load_pcm
+from tests.unit.test_audio import make_wav
+
+
+@pytest.fixture
+def mock_config():
+    with patch("src.asr.decoding.config") as cfg:
+        cfg.pcm_cache_mb = 1
+        yield cfg
+
+
+@pytest.fixture
+def wav_file(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(make_wav(np.full(8000, 0.25, dtype=np.float32), sample_rate=8000))
+    return str(path)
+
+
+def test_decode_resamples_to_16k(wav_file):
+    """Test non-16 kHz WAV comes out as 16 kHz mono float32"""
+    samples = decode_to_pcm(wav_file)
+    assert samples.dtype == np.float32
+    assert len(samples) == 16000
+    # Away from the filter's edge transients the level is unchanged
+    assert np.allclose(samples[100:-100], 0.25, atol=1e-3)
+
+
+def test_decode_resample_does_not_alias(tmp_path):
+    """Test content above 8 kHz is filtered out instead of folding into the speech band"""
+    rate = 48000
+    t = np.arange(rate) / rate
+    path = tmp_path / "hi.wav"
+    path.write_bytes(make_wav((0.5 * np.sin(2 * np.pi * 12000 * t)).astype(np.float32), sample_rate=rate))
+
+    samples = decode_to_pcm(str(path))
+
+    assert len(samples) == 16000
+    # Linear interpolation would leave a 4 kHz alias at about half the input level
+    assert np.abs(samples[1000:-1000]).max() < 0.01
+
+
+def test_cache_roundtrip(tmp_path, mock_config):
+    """Test stored PCM is returned memory-mapped"""
+    cache = PcmCache(str(tmp_path / "pcm"))
+    assert cache.get("abc") is None
+    cache.put("abc", np.arange(10, dtype=np.float32))
+    cached = cache.get("abc")
+    assert isinstance(cached, np.memmap)
+    assert np.array_equal(cached, np.arange(10))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, mock_config):
+    """Test the directory stays within pcm_cache_mb"""
+    cache = PcmCache(str(tmp_path / "pcm"))
+    block = np.zeros(100_000, dtype=np.float32)  # ~0.4 MB each
+    for i, name in enumerate(("a", "b", "c")):
+        cache.put(name, block)
+        path = cache.path_for(name)
+        # Distinct, increasing mtimes regardless of filesystem resolution
+        os.utime(path, (1000 + i, 1000 + i))
+    cache.put("d", block)
+    remaining = sorted(p.stem for p in cache.directory.glob("*.npy"))
+    assert remaining == ["c", "d"]
+
+
+def test_load_pcm_decodes_once(wav_file, tmp_path, mock_config):
+    """Test a second load of the same content skips decoding"""
+    cache = PcmCache(str(tmp_path / "pcm"))
+    with patch.object(decoding, "pcm_cache", cache), \
+         patch("src.asr.decoding.decode_to_pcm", wraps=decode_to_pcm) as decode:
+        first = load_pcm(wav_file)
+        second = load_pcm(wav_file, file_sha256(wav_file))
+    assert decode.call_count == 1
+    assert np.array_equal(first, second)
+
+
+def test_load_pcm_without_cache(wav_file, mock_config):
+    """Test a disabled cache decodes every time"""
+    mock_config.pcm_cache_mb = 0
+    assert len(load_pcm(wav_file)) == 16000
+
+
+def test_decode_job_writes_cache(wav_file, tmp_path, mock_config):
+    """Test the pool task decodes straight into the cache and skips cached content"""
+    directory = str(tmp_path / "pcm")
+    assert _decode_job(wav_file, directory, "h1") == 16000
+    assert PcmCache(directory).path_for("h1").exists()
+    assert _decode_job(wav_file, directory, "h1") == 0
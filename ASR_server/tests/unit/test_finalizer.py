@@ -0,0 +1,105 @@
+"""
+Unit tests for deferred punctuation of stream sessions.
+
+Run: pytest tests/unit/test_finalizer.py -v
+"""
+import json
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from src.utils.redis_client import redis_client
+from src.worker.finalizer import ACTIVE_KEY, SessionFinalizer
+
+
+@pytest.fixture
+def finalizer():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    with patch.object(redis_client, "_client", client), \
+         patch("src.worker.finalizer.config") as mock_config:
+        mock_config.stream_punc_segment_chars = 0
+        mock_config.stream_punc_idle_s = 3
+        fin = SessionFinalizer(lambda text: text + "。")
+        fin.config = mock_config
+        fin.pubsub = client.pubsub()
+        fin.pubsub.subscribe("asr_result_s1")
+        fin.pubsub.get_message()
+        yield fin
+
+
+def published(fin):
+    messages = []
+    while True:
+        msg = fin.pubsub.get_message()
+        if msg is None:
+            return messages
+        messages.append(json.loads(msg["data"]))
+
+
+def test_pause_closes_segment(finalizer):
+    """Test an empty chunk after speech punctuates the pending text once"""
+    assert finalizer.on_chunk("s1", 0, "你好") is None
+    assert finalizer.on_chunk("s1", 1, "世界") is None
+    final = finalizer.on_chunk("s1", 2, "")
+
+    assert final["text"] == "你好世界。"
+    assert (final["segment_start"], final["segment_end"], final["chunk_index"]) == (0, 1, 2)
+    assert published(finalizer) == [final]
+    assert finalizer.on_chunk("s1", 3, "") is None
+
+
+def test_out_of_order_chunks_joined_by_index(finalizer):
+    """Test raw texts are joined in chunk order"""
+    finalizer.on_chunk("s1", 1, "b")
+    finalizer.on_chunk("s1", 0, "a")
+    assert finalizer.on_chunk("s1", 2, "c", is_final=True)["text"] == "abc。"
+
+
+def test_segment_length_limit(finalizer):
+    """Test long runs of speech are closed without waiting for a pause"""
+    finalizer.config.stream_punc_segment_chars = 4
+    assert finalizer.on_chunk("s1", 0, "ab") is None
+    assert finalizer.on_chunk("s1", 1, "cd")["text"] == "abcd。"
+
+
+def test_idle_flush_and_transcript(finalizer):
+    """Test idle sessions are closed and finals form the corrected transcript"""
+    finalizer.on_chunk("s1", 0, "一")
+    finalizer.on_chunk("s1", 1, "")
+    finalizer.on_chunk("s1", 2, "二")
+
+    assert finalizer.flush_idle(now=0) == []
+    finals = finalizer.flush_idle(now=10**10)
+    assert [f["chunk_index"] for f in finals] == [2]
+    assert "".join(f["text"] for f in redis_client.get_stream_finals("s1")) == "一。二。"
+    assert redis_client.client.zcard(ACTIVE_KEY) == 0
+
+
+def test_punctuation_failure_keeps_raw_text(finalizer):
+    """Test a failing punctuation model still publishes the segment"""
+    finalizer.punctuate = lambda text: 1 / 0
+    finalizer.on_chunk("s1", 0, "raw")
+    assert finalizer.finalize("s1")["text"] == "raw"
+
+
+def test_external_pipe_receives_segment(finalizer):
+    """Test closed segments are queued on the caller's pipe, not sent early"""
+    from src.worker.completion import CompletionBatch, CompletionStats, write
+
+    batch = CompletionBatch()
+    finalizer.on_chunk("s1", 0, "你好", pipe=batch)
+    final = finalizer.on_chunk("s1", 1, "世界", is_final=True, pipe=batch)
+
+    assert final["text"] == "你好世界。"
+    assert [name for name, _, _ in batch.commands] == ["publish", "rpush", "expire"]
+    assert redis_client.get_stream_finals("s1") == []
+
+    write(redis_client.client, batch, CompletionStats())
+    assert redis_client.get_stream_finals("s1") == [final]
+    assert published(finalizer) == [final]
+
+    batch = CompletionBatch()
+    finalizer.on_chunk("s1", 2, "再见", pipe=batch)
+    assert finalizer.finalize("s1", pipe=batch)["text"] == "再见。"
+    assert len(batch.commands) == 3
@@ -0,0 +1,127 @@
+"""
+Unit tests for hotword loading, hot reload and the compiled hotword cache.
+
+Run: pytest tests/unit/test_hotwords.py -v
+"""
+import os
+from unittest.mock import patch
+
+import fakeredis
+import torch
+
+from src.asr.hotwords import (
+    HotwordSetCache, HotwordStore, LRUCache, install_compiled_hotwords, parse_hotwords, publish_hotwords
+)
+
+
+def test_parse_hotwords_skips_comments():
+    """Test comment and blank lines are dropped"""
+    text = "# === Section ===\nGPT Claude\n\n  通义千问  \n"
+    assert parse_hotwords(text) == "GPT Claude 通义千问"
+
+
+def test_store_reloads_on_file_change(tmp_path):
+    """Test an edited file is picked up and bumps the version"""
+    path = tmp_path / "hotwords.txt"
+    path.write_text("alpha\n", encoding="utf-8")
+    store = HotwordStore(str(path), redis_getter=lambda: None)
+    assert store.text == "alpha"
+    assert store.reload() is False
+
+    path.write_text("alpha\nbeta\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert store.reload() is True
+    assert store.text == "alpha beta"
+    assert store.version == 2
+
+
+def test_store_redis_override(tmp_path):
+    """Test publishing through Redis overrides and then reverts to the file"""
+    path = tmp_path / "hotwords.txt"
+    path.write_text("alpha\n", encoding="utf-8")
+    client = fakeredis.FakeRedis()
+    store = HotwordStore(str(path), redis_getter=lambda: client)
+
+    publish_hotwords(client, "gamma\ndelta")
+    assert store.reload() is True
+    assert store.text == "gamma delta"
+
+    publish_hotwords(client, None)
+    assert store.reload() is True
+    assert store.text == "alpha"
+
+
+class FakeSeacoModel(torch.nn.Module):
+    """Counts hotword compilation calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.tokenized = 0
+        self.represented = 0
+
+    def generate_hotwords_list(self, hotword_list_or_file, tokenizer=None, frontend=None):
+        self.tokenized += 1
+        return [[ord(c)] for c in hotword_list_or_file.split()]
+
+    def _hotword_representation(self, hotword_pad, hotword_lengths):
+        self.represented += 1
+        return hotword_pad.float()
+
+
+def test_compiled_hotwords_cache():
+    """Test each hotword list is tokenized and encoded only once"""
+    class Auto:
+        model = FakeSeacoModel().eval()
+
+    inner = Auto.model
+    assert install_compiled_hotwords(Auto) is True
+
+    first = inner.generate_hotwords_list("a b")
+    assert inner.generate_hotwords_list("a b") is first
+    inner.generate_hotwords_list("c")
+    assert inner.tokenized == 2
+
+    pad, lengths = torch.tensor([[1, 2]]), torch.tensor([2])
+    with torch.no_grad():
+        inner._hotword_representation(pad, lengths)
+        inner._hotword_representation(pad.clone(), lengths.clone())
+    assert inner.represented == 1
+
+
+def test_lru_cache_size_eviction():
+    """Test least recently used entries are evicted once over the byte budget"""
+    cache = LRUCache(10, len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.get("a")
+    cache.put("c", "xxxx")
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.size == 8
+
+
+def test_hotword_set_cache():
+    """Test sets are fetched once, re-validated by version and dropped when deleted"""
+    sets = {"medical": {"text": "# meds\n阿司匹林\n布洛芬", "version": 1}}
+    fetches = []
+
+    def fetch(set_id):
+        fetches.append(set_id)
+        return sets.get(set_id)
+
+    cache = HotwordSetCache(
+        max_bytes=1024, fetch=fetch,
+        fetch_version=lambda set_id: sets[set_id]["version"] if set_id in sets else None
+    )
+    assert cache.get("medical") == "阿司匹林 布洛芬"
+    assert cache.get("medical") == "阿司匹林 布洛芬"
+    assert fetches == ["medical"]
+    assert cache.get("unknown") is None
+
+    with patch("src.asr.hotwords.config") as mock_config:
+        mock_config.hotwords_reload_interval_s = 1e-9
+        sets["medical"] = {"text": "青霉素", "version": 2}
+        assert cache.get("medical") == "青霉素"
+        del sets["medical"]
+        assert cache.get("medical") is None
@@ -0,0 +1,30 @@
+"""
+Import-time regression test for the API process.
+
+Run: pytest tests/unit/test_import_time.py -v
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import src.asr
+
+ROOT = Path(__file__).parent.parent.parent
+
+
+def test_api_imports_no_worker_modules():
+    """Test the API starts without torch/funasr/numpy (budget is loose for slow CI hosts)"""
+    proc = subprocess.run(
+        [sys.executable, "scripts/check_import_time.py", "--budget-ms", "5000", "--top", "0"],
+        cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+
+def test_asr_package_exports_lazily():
+    """Test src.asr only resolves the recognizer on attribute access"""
+    assert "SpeechRecognizer" in src.asr.__all__
+    with pytest.raises(AttributeError):
+        src.asr.Missing
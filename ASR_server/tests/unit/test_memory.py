@@ -0,0 +1,61 @@
+"""
+Unit tests for the adaptive memory governor.
+
+Run: pytest tests/unit/test_memory.py -v
+"""
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.memory import MemoryGovernor
+
+
+@pytest.fixture
+def governor():
+    with patch("src.utils.memory.config") as mock_config, \
+         patch("src.utils.memory.release_memory") as release:
+        mock_config.memory_mode = "adaptive"
+        mock_config.memory_release_every_n = 0
+        mock_config.memory_growth_mb = 100
+        mock_config.memory_slope_mb_per_task = 1.0
+        mock_config.memory_slope_window = 4
+        gov = MemoryGovernor()
+        gov.rss = [500.0]
+        gov._rss_mb = lambda: gov.rss[0]
+        gov.baseline_mb = 500.0
+        gov.release_mock = release
+        gov.config = mock_config
+        yield gov
+
+
+def test_steady_rss_never_releases(governor):
+    """Test flat memory costs nothing per task"""
+    for _ in range(20):
+        assert governor.after_task() is None
+    governor.release_mock.assert_not_called()
+    assert governor.tasks == 20
+
+
+def test_growth_triggers_release(governor):
+    """Test a jump above baseline releases once"""
+    governor.rss[0] = 650.0
+    assert governor.after_task() == "growth"
+    assert governor.releases == 1
+    assert governor.baseline_mb == 650.0
+
+
+def test_slope_triggers_release(governor):
+    """Test a steady climb is caught before the growth threshold"""
+    reasons = []
+    for i in range(4):
+        governor.rss[0] = 500.0 + 5 * i
+        reasons.append(governor.after_task())
+    assert reasons == [None, None, None, "slope"]
+
+
+def test_every_n_and_heavy(governor):
+    """Test the task budget and heavy tasks force a release"""
+    governor.config.memory_release_every_n = 3
+    assert [governor.after_task() for _ in range(3)] == [None, None, "every_n"]
+    assert governor.after_task(heavy=True) == "heavy"
+    assert governor.stats()["reasons"] == {"every_n": 1, "heavy": 1}
@@ -0,0 +1,83 @@
+"""
+Unit tests for offline-first model resolution.
+
+Run: pytest tests/unit/test_model_loader.py -v
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.asr.model_loader import StartupTimer, attach_sub_models, resolve_all, resolve_local
+
+
+@pytest.fixture
+def caches(tmp_path, monkeypatch):
+    ms, hf = tmp_path / "ms", tmp_path / "hf"
+    ms.mkdir()
+    hf.mkdir()
+    monkeypatch.setenv("MODELSCOPE_CACHE", str(ms))
+    monkeypatch.setenv("HF_HUB_CACHE", str(hf))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    with patch("src.asr.model_loader.config") as cfg:
+        cfg.model_path = None
+        yield ms, hf
+
+
+def add_model(path, marker="config.yaml"):
+    path.mkdir(parents=True)
+    (path / marker).write_text("")
+    return path
+
+
+def test_resolve_modelscope_layouts(caches):
+    """Test both <root>/models/<repo> and <root>/<repo> are found"""
+    ms, _ = caches
+    vad = add_model(ms / "models" / "iic" / "speech_fsmn_vad_zh-cn-16k-common-pytorch")
+    punc = add_model(ms / "iic" / "punc_ct-transformer_cn-en-common-vocab471067-large", "configuration.json")
+    assert resolve_local("fsmn-vad", "ms") == str(vad)
+    assert resolve_local("ct-punc", "ms") == str(punc)
+    assert resolve_local("paraformer-zh", "ms") is None
+
+
+def test_resolve_huggingface_snapshot(caches):
+    """Test the HF cache resolves to a complete snapshot directory"""
+    _, hf = caches
+    (hf / "models--funasr--fsmn-vad" / "snapshots" / "partial").mkdir(parents=True)
+    snapshot = add_model(hf / "models--funasr--fsmn-vad" / "snapshots" / "abc123")
+    assert resolve_local("fsmn-vad", "hf") == str(snapshot)
+
+
+def test_resolve_directory_as_is(tmp_path):
+    """Test a model directory is used directly"""
+    path = add_model(tmp_path / "my-model")
+    assert resolve_local(str(path), "ms") == str(path)
+
+
+def test_resolve_all_needs_every_model(caches):
+    """Test a hub is chosen only when it holds all models"""
+    ms, hf = caches
+    add_model(ms / "models" / "iic" / "speech_fsmn_vad_zh-cn-16k-common-pytorch")
+    add_model(hf / "models--funasr--fsmn-vad" / "snapshots" / "a")
+    add_model(hf / "models--funasr--ct-punc" / "snapshots" / "a")
+    hub, paths = resolve_all(["fsmn-vad", "ct-punc"], ["ms", "hf"])
+    assert hub == "hf"
+    assert set(paths) == {"fsmn-vad", "ct-punc"}
+    assert resolve_all(["fsmn-vad", "paraformer-zh"], ["ms", "hf"]) == (None, {})
+
+
+def test_attach_sub_models_resnapshots():
+    """Test attached kwargs survive AutoModel's per-call reset"""
+    model = MagicMock()
+    attach_sub_models(model, {"vad_model": "vad", "vad_kwargs": {"a": 1}})
+    assert model.vad_model == "vad"
+    model._store_base_configs.assert_called_once()
+
+
+def test_startup_timer():
+    """Test phases and total are reported"""
+    timer = StartupTimer()
+    with timer.phase("load"):
+        pass
+    timings = timer.as_dict()
+    assert set(timings) == {"load", "total"}
+    assert "load=" in timer.summary()
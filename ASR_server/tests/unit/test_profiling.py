@@ -0,0 +1,101 @@
+"""
+Unit tests for opt-in allocation profiling.
+
+Run: pytest tests/unit/test_profiling.py -v
+"""
+import tracemalloc
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from src.utils.profiling import (
+    AllocationProfiler, PROFILE_STREAM, clear_forced_profile, force_profile, recent_profiles
+)
+from src.utils.redis_client import redis_client
+
+
+@pytest.fixture
+def profiler():
+    with patch.object(redis_client, "_client", fakeredis.FakeRedis(decode_responses=True)), \
+         patch("src.utils.profiling.config") as mock_config:
+        mock_config.alloc_profile_mode = "off"
+        mock_config.alloc_profile_sample_n = 1
+        mock_config.alloc_profile_top = 3
+        mock_config.alloc_profile_stream_maxlen = 1000
+        prof = AllocationProfiler()
+        prof.config = mock_config
+        yield prof
+
+
+def test_off_by_default(profiler):
+    """Test unselected tasks never start tracemalloc"""
+    assert profiler.start("t1", "batch") is None
+    assert not tracemalloc.is_tracing()
+    assert profiler.finish(None) is None
+
+
+def test_forced_task_is_profiled_once(profiler):
+    """Test the Redis force flag selects a task and is consumed"""
+    force_profile("t1")
+    session = profiler.start("t1", "batch")
+    assert session is not None and session.reason == "forced"
+    assert tracemalloc.is_tracing()
+
+    data = [bytearray(1024) for _ in range(100)]
+    profile = profiler.finish(session)
+    del data
+
+    assert not tracemalloc.is_tracing()
+    assert profile["peak_mb"] > 0
+    assert profiler.start("t1", "batch") is None
+
+    stored = recent_profiles()
+    assert len(stored) == 1
+    assert stored[0]["task_id"] == "t1"
+    assert stored[0]["reason"] == "forced"
+    assert 0 < len(stored[0]["top"]) <= 3
+
+
+def test_forced_parent_profiles_its_parts(profiler):
+    """Test every batch_part of a forced fanned-out task is profiled until the merge"""
+    force_profile("t1")
+    for index in range(2):
+        session = profiler.start(f"t1#{index}", "batch_part", parent_id="t1")
+        assert session is not None and session.reason == "forced"
+        profiler.finish(session)
+
+    clear_forced_profile("t1")
+    assert profiler.start("t1#2", "batch_part", parent_id="t1") is None
+
+
+def test_sampled_mode(profiler):
+    """Test sampled mode with N=1 profiles every task"""
+    profiler.config.alloc_profile_mode = "sampled"
+    session = profiler.start("t2", "batch_part")
+    assert session.reason == "sampled"
+    profiler.finish(session)
+    assert recent_profiles()[0]["kind"] == "batch_part"
+
+
+def test_existing_tracing_is_left_running(profiler):
+    """Test a profile does not stop tracing someone else started"""
+    force_profile("t3")
+    tracemalloc.start()
+    try:
+        session = profiler.start("t3", "batch")
+        profiler.finish(session)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_stream_is_bounded(profiler):
+    """Test old profiles are trimmed"""
+    profiler.config.alloc_profile_mode = "sampled"
+    profiler.config.alloc_profile_stream_maxlen = 5
+    with patch.object(redis_client.client, "xadd", wraps=redis_client.client.xadd) as xadd:
+        for i in range(3):
+            profiler.finish(profiler.start(f"t{i}", "batch"))
+    assert xadd.call_args.kwargs["maxlen"] == 5
+    assert redis_client.client.xlen(PROFILE_STREAM) == 3
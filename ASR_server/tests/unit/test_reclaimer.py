@@ -0,0 +1,156 @@
+"""
+Unit tests for stale message reclamation and the dead-letter stream
+"""
+import json
+import time
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from src.utils.redis_client import redis_client
+from src.utils.result_cache import INFLIGHT_PREFIX, result_cache
+from src.utils.streams import CONSUMER_GROUP, DLQ_STREAM, STREAM_NAME, streams_client
+from src.worker.affinity import HEARTBEAT_KEY
+from src.worker.reclaimer import StaleReclaimer
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    client.xgroup_create(STREAM_NAME, CONSUMER_GROUP, id="0", mkstream=True)
+    with patch.object(streams_client, "_redis", client), \
+         patch.object(redis_client, "_client", client), \
+         patch("src.worker.reclaimer.config") as cfg:
+        cfg.reclaim_interval_s = 30
+        cfg.reclaim_idle_s = 0
+        cfg.reclaim_stuck_s = 3600
+        cfg.reclaim_max_deliveries = 3
+        cfg.reclaim_batch = 20
+        yield client
+
+
+def deliver(client, consumer: str, task_id: str = "t1", task_type: str = "batch", **payload) -> str:
+    """Publish a task and read it as `consumer` (pending, not acked)"""
+    msg_id = client.xadd(STREAM_NAME, {
+        "type": task_type, "task_id": task_id, "payload": json.dumps({"audio_path": "/a.wav", **payload}),
+        "timestamp": 0, "origin": "test",
+    })
+    client.xreadgroup(CONSUMER_GROUP, consumer, {STREAM_NAME: ">"})
+    time.sleep(0.01)
+    return msg_id
+
+
+def pending(client):
+    return client.xpending_range(STREAM_NAME, CONSUMER_GROUP, min="-", max="+", count=10)
+
+
+def test_reclaims_from_dead_worker(fake_redis):
+    msg_id = deliver(fake_redis, "worker-dead")
+    reclaimer = StaleReclaimer("worker-2")
+
+    messages = reclaimer.reclaim()
+
+    assert [m.msg_id for m in messages] == [msg_id]
+    assert messages[0].task_id == "t1"
+    entry = pending(fake_redis)[0]
+    assert (entry["consumer"], entry["times_delivered"]) == ("worker-2", 2)
+    assert reclaimer.stats() == {"claimed": 1, "dead_lettered": 0, "dropped": 0}
+
+
+def test_stale_stream_chunk_is_dropped_not_replayed(fake_redis):
+    deliver(fake_redis, "worker-dead", task_id="s1", task_type="stream")
+    batch_id = deliver(fake_redis, "worker-dead", task_id="t1")
+    reclaimer = StaleReclaimer("worker-2")
+
+    messages = reclaimer.reclaim()
+
+    assert [m.msg_id for m in messages] == [batch_id]
+    assert [e["message_id"] for e in pending(fake_redis)] == [batch_id]
+    assert streams_client.get_dead_letters() == []
+    assert reclaimer.stats()["dropped"] == 1
+
+
+def test_live_worker_keeps_its_messages(fake_redis):
+    deliver(fake_redis, "worker-1")
+    fake_redis.set(HEARTBEAT_KEY.format("worker-1"), "{}")
+
+    assert StaleReclaimer("worker-2").reclaim() == []
+    assert pending(fake_redis)[0]["consumer"] == "worker-1"
+
+
+def test_restarted_worker_reclaims_its_previous_run(fake_redis):
+    msg_id = deliver(fake_redis, "worker-1")
+    fake_redis.set(HEARTBEAT_KEY.format("worker-1"), "{}")
+    reclaimer = StaleReclaimer("worker-1")  # started after the delivery
+
+    assert [m.msg_id for m in reclaimer.reclaim()] == [msg_id]
+
+
+def test_exhausted_message_is_dead_lettered(fake_redis):
+    msg_id = deliver(fake_redis, "worker-dead")
+    for _ in range(2):
+        fake_redis.xclaim(STREAM_NAME, CONSUMER_GROUP, "worker-dead", min_idle_time=0, message_ids=[msg_id])
+    time.sleep(0.01)
+    reclaimer = StaleReclaimer("worker-2")
+
+    assert reclaimer.reclaim() == []
+
+    assert pending(fake_redis) == []
+    dead = streams_client.get_dead_letters()
+    assert len(dead) == 1
+    assert (dead[0]["task_id"], dead[0]["original_id"], dead[0]["deliveries"]) == ("t1", msg_id, "3")
+    assert dead[0]["consumer"] == "worker-dead"
+    assert redis_client.get_task_result("t1")["status"] == "failed"
+    assert reclaimer.stats()["dead_lettered"] == 1
+
+
+def test_dead_lettered_leader_answers_duplicates(fake_redis):
+    assert result_cache.lookup_or_claim("k", "t1") == (None, None)
+    assert result_cache.lookup_or_claim("k", "t2") == (None, "t1")
+    msg_id = deliver(fake_redis, "worker-dead", cache_key="k")
+    for _ in range(2):
+        fake_redis.xclaim(STREAM_NAME, CONSUMER_GROUP, "worker-dead", min_idle_time=0, message_ids=[msg_id])
+    time.sleep(0.01)
+
+    StaleReclaimer("worker-2").reclaim()
+
+    attached = redis_client.get_task_result("t2")
+    assert (attached["status"], attached["deduplicated_from"]) == ("failed", "t1")
+    assert fake_redis.get(f"{INFLIGHT_PREFIX}k") is None
+
+
+def test_reclaimed_leader_renews_its_claim(fake_redis):
+    result_cache.lookup_or_claim("k", "t1")
+    result_cache.lookup_or_claim("k", "t2")
+    fake_redis.delete(f"{INFLIGHT_PREFIX}k")  # claim expired while the worker was dead
+    deliver(fake_redis, "worker-dead", cache_key="k")
+
+    StaleReclaimer("worker-2").reclaim()
+
+    assert fake_redis.get(f"{INFLIGHT_PREFIX}k") == "t1"
+    assert fake_redis.ttl(f"{INFLIGHT_PREFIX}k:waiters") > 0
+    # The retry answers the duplicate when it finishes
+    assert result_cache.complete("k", "t1", {"status": "done", "text": "hi"}) == ["t2"]
+
+
+def test_replay_dead_letter(fake_redis):
+    msg_id = deliver(fake_redis, "worker-dead")
+    msg = streams_client.claim_messages([msg_id], "worker-2", 0)[0]
+    dlq_id = streams_client.dead_letter(msg, 3, "worker-dead")
+
+    new_id = streams_client.replay_dead_letter(dlq_id)
+
+    assert fake_redis.xlen(DLQ_STREAM) == 0
+    fields = fake_redis.xrange(STREAM_NAME, min=new_id, max=new_id)[0][1]
+    assert fields["task_id"] == "t1"
+    assert "original_id" not in fields and "deliveries" not in fields
+    assert streams_client.replay_dead_letter(dlq_id) is None
+    assert streams_client.get_dead_letter("not-an-id") is None
+
+
+def test_due_respects_interval(fake_redis):
+    reclaimer = StaleReclaimer("worker-2")
+    assert reclaimer.due()
+    reclaimer.reclaim()
+    assert not reclaimer.due()
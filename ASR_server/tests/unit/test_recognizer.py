@@ -92,3 +92,192 @@ def test_recognize_exception(recognizer, mock_auto_model):
         
     assert res["status"] == "failed"
     assert "Model Crash" in res["error"]
+
+def test_recognize_bytes_in_memory(recognizer, mock_auto_model):
+    """Test WAV bytes are decoded in memory and duration comes from samples"""
+    import struct
+    import numpy as np
+    
+    mock_instance = mock_auto_model.return_value
+    mock_instance.generate.return_value = [{"text": "hi"}]
+    
+    pcm = np.zeros(8000, dtype="<i2").tobytes()
+    wav = (b"RIFF" + struct.pack("<I", 36 + len(pcm)) + b"WAVE"
+           + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+           + b"data" + struct.pack("<I", len(pcm)) + pcm)
+    
+    res = recognizer.recognize(wav)
+    
+    assert res["status"] == "success"
+    assert res["duration"] == 0.5
+    kwargs = mock_instance.generate.call_args.kwargs
+    assert isinstance(kwargs["input"], np.ndarray)
+    assert kwargs["fs"] == 16000
+
+def test_recognize_batch(recognizer, mock_auto_model):
+    """Test several clips go through a single batched inference call"""
+    import numpy as np
+    
+    mock_instance = mock_auto_model.return_value
+    mock_instance.punc_model = None
+    mock_instance.inference.return_value = [{"text": "a"}, {"text": "b"}]
+    
+    clips = [np.zeros(16000, dtype=np.float32), np.zeros(8000, dtype=np.float32)]
+    res = recognizer.recognize_batch(clips)
+    
+    assert [r["text"] for r in res] == ["a", "b"]
+    assert [r["duration"] for r in res] == [1.0, 0.5]
+    mock_instance.inference.assert_called_once()
+    assert mock_instance.inference.call_args.kwargs["batch_size"] == 2
+
+def test_recognize_progressive(recognizer, mock_auto_model):
+    """Test long audio is recognized span by span with progress callbacks"""
+    import numpy as np
+    
+    mock_instance = mock_auto_model.return_value
+    mock_instance.vad_segments.return_value = [[0, 1000], [1000, 2000], [2000, 3000]]
+    mock_instance.generate.side_effect = [[{"text": "a"}], [{"text": "b"}], [{"text": "c"}]]
+    
+    updates = []
+    res = recognizer.recognize_progressive(
+        np.zeros(48000, dtype=np.float32), 16000, segment_s=1,
+        on_progress=lambda done, total, text: updates.append((done, total, text))
+    )
+    
+    assert res == {"status": "success", "text": "abc", "duration": 3.0}
+    assert updates == [(1, 3, "a"), (2, 3, "ab"), (3, 3, "abc")]
+
+def test_recognize_batch_raw(recognizer, mock_auto_model):
+    """Test punctuate=False skips the punctuation pass, even for one clip"""
+    import numpy as np
+    
+    mock_instance = mock_auto_model.return_value
+    mock_instance.punc_model = object()
+    mock_instance.inference.return_value = [{"text": "raw"}]
+    
+    res = recognizer.recognize_batch([np.zeros(16000, dtype=np.float32)], punctuate=False)
+    
+    assert res[0]["text"] == "raw"
+    mock_instance.generate.assert_not_called()
+    mock_instance.inference.assert_called_once()
+
+def test_punctuate(recognizer, mock_auto_model):
+    """Test punctuation runs over accumulated text"""
+    mock_instance = mock_auto_model.return_value
+    mock_instance.punc_model = object()
+    mock_instance.inference.return_value = [{"text": "你好。"}]
+    
+    assert recognizer.punctuate("你好") == "你好。"
+    assert recognizer.punctuate("") == ""
+    assert mock_instance.inference.call_args.kwargs["model"] is mock_instance.punc_model
+
+def test_recognize_language_model(recognizer, mock_auto_model):
+    """Test a mapped language loads its own ASR model without VAD/punc"""
+    import numpy as np
+    
+    mock_auto_model.return_value.generate.return_value = [{"text": "hello", "duration": 1.0}]
+    with patch("src.asr.registry.config") as mock_config, \
+         patch("src.asr.recognizer.resolve_local", return_value=None):
+        mock_config.language_models = "en=paraformer-en"
+        mock_config.model_memory_mb = 0
+        res = recognizer.recognize(np.zeros(16000, dtype=np.float32), language="en")
+    
+    assert res["text"] == "hello"
+    assert mock_auto_model.call_args.kwargs["model"] == "paraformer-en"
+    assert "vad_model" not in mock_auto_model.call_args.kwargs
+    assert recognizer.models.resident() == ["test_model", "paraformer-en"]
+
+def test_recognize_task_batching(recognizer, mock_auto_model):
+    """Test per-task batch parameters reach generate()"""
+    import numpy as np
+    
+    mock_instance = mock_auto_model.return_value
+    mock_instance.generate.return_value = [{"text": "ok", "duration": 1.0}]
+    recognizer.recognize(np.zeros(16000, dtype=np.float32), batch_size_s=120, merge_length_s=8)
+    
+    kwargs = mock_instance.generate.call_args.kwargs
+    assert (kwargs["batch_size_s"], kwargs["merge_length_s"]) == (120, 8)
+
+def test_init_offline_first_skips_probe(mock_auto_model):
+    """Test cached snapshots are loaded in parallel without the network probe"""
+    SpeechRecognizer._instance = None
+    local = {"asr": "/cache/asr", "vad": "/cache/vad", "punc": "/cache/punc"}
+    
+    with patch("src.asr.recognizer.config") as mock_config, \
+         patch("src.asr.recognizer.resolve_all", return_value=("ms", local)), \
+         patch.object(SpeechRecognizer, "_detect_network_region") as probe, \
+         patch("builtins.open", mock_open(read_data="")), \
+         patch("os.path.exists", return_value=True):
+        mock_config.model_name, mock_config.vad_model, mock_config.punc_model = "asr", "vad", "punc"
+        mock_config.model_source = "offline_first"
+        mock_config.model_hub = "auto"
+        mock_config.model_path = None
+        mock_config.backend = "torch"
+        mock_config.model_parallel_load = True
+        rec = SpeechRecognizer()
+    
+    probe.assert_not_called()
+    assert rec.hub == "ms"
+    loaded = sorted(call.kwargs["model"] for call in mock_auto_model.call_args_list)
+    assert loaded == ["/cache/asr", "/cache/punc", "/cache/vad"]
+    assert {"resolve", "asr", "vad", "punc", "load", "hotwords", "total"} <= set(rec.startup_timings)
+
+def test_init_offline_requires_cache(mock_auto_model):
+    """Test offline mode fails fast when a model is not cached"""
+    SpeechRecognizer._instance = None
+    
+    with patch("src.asr.recognizer.config") as mock_config, \
+         patch("src.asr.recognizer.resolve_all", return_value=(None, {})):
+        mock_config.model_source = "offline"
+        mock_config.model_hub = "auto"
+        with pytest.raises(RuntimeError, match="offline"):
+            SpeechRecognizer()
+    SpeechRecognizer._instance = None
+
+def test_init_from_snapshot(mock_auto_model):
+    """Test a matching snapshot replaces resolving and building the models"""
+    SpeechRecognizer._instance = None
+    pipeline = MagicMock()
+    
+    with patch("src.asr.recognizer.config") as mock_config, \
+         patch("src.asr.recognizer.read_manifest", return_value={"hub": "hf"}), \
+         patch("src.asr.recognizer.mismatch", return_value=None), \
+         patch("src.asr.recognizer.load_snapshot", return_value=pipeline) as load, \
+         patch("src.asr.recognizer.resolve_all") as resolve, \
+         patch("builtins.open", mock_open(read_data="")), \
+         patch("os.path.exists", return_value=True):
+        mock_config.model_snapshot = "/snap"
+        mock_config.backend = "torch"
+        mock_config.use_gpu = False
+        rec = SpeechRecognizer()
+    
+    load.assert_called_once_with("/snap", "cpu")
+    resolve.assert_not_called()
+    mock_auto_model.assert_not_called()
+    assert rec.model is pipeline
+    assert rec.hub == "hf"
+    assert "snapshot" in rec.startup_timings
+    SpeechRecognizer._instance = None
+
+def test_init_snapshot_mismatch_falls_back(mock_auto_model):
+    """Test a snapshot built for other models is ignored"""
+    SpeechRecognizer._instance = None
+    
+    with patch("src.asr.recognizer.config") as mock_config, \
+         patch("src.asr.recognizer.read_manifest", return_value={}), \
+         patch("src.asr.recognizer.mismatch", return_value="built for other models"), \
+         patch("src.asr.recognizer.load_snapshot") as load, \
+         patch("src.asr.recognizer.resolve_all", return_value=("ms", {})), \
+         patch("builtins.open", mock_open(read_data="")), \
+         patch("os.path.exists", return_value=True):
+        mock_config.model_snapshot = "/snap"
+        mock_config.model_source = "offline_first"
+        mock_config.model_hub = "auto"
+        mock_config.backend = "torch"
+        mock_config.model_parallel_load = False
+        rec = SpeechRecognizer()
+    
+    load.assert_not_called()
+    mock_auto_model.assert_called_once()
+    assert rec.hub == "ms"
+    SpeechRecognizer._instance = None
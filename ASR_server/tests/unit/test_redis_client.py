@@ -45,3 +45,29 @@ def test_add_to_history(client, mock_redis):
     
     mock_inst.lpush.assert_called_once()
     mock_inst.ltrim.assert_called_once()
+
+def test_save_task_part(client, mock_redis):
+    """Test storing a fan-out part returns the number of parts so far"""
+    mock_inst = mock_redis.return_value
+    pipe = mock_inst.pipeline.return_value
+    pipe.execute.return_value = [1, True, 3]
+    
+    stored = client.save_task_part("t1", 2, {"status": "success", "text": "hi"})
+    
+    assert stored == 3
+    pipe.hset.assert_called_once()
+    assert pipe.hset.call_args[0][:2] == ("asr:task:t1:parts", "2")
+
+def test_save_task_progress_never_replaces_final_result():
+    """Test progress is only written while the task is still processing"""
+    import fakeredis
+    client = RedisClient()
+    with patch.object(client, "_client", fakeredis.FakeRedis(decode_responses=True)):
+        client.save_task_result("t1", {"status": "processing", "created_at": "then"})
+        
+        assert client.save_task_progress("t1", {"status": "processing", "progress": 50})
+        assert client.get_task_result("t1") == {"status": "processing", "progress": 50, "created_at": "then"}
+        
+        client.save_task_result("t1", {"status": "done", "text": "hi"})
+        assert not client.save_task_progress("t1", {"status": "processing", "progress": 90})
+        assert client.get_task_result("t1")["status"] == "done"
@@ -0,0 +1,75 @@
+"""
+Unit tests for the per-language model registry.
+
+Run: pytest tests/unit/test_registry.py -v
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.asr.registry import ModelRegistry, parse_language_models
+
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def mock_config():
+    with patch("src.asr.registry.config") as cfg:
+        cfg.language_models = "en=paraformer-en, YUE=model-yue,bad"
+        cfg.model_memory_mb = 0
+        yield cfg
+
+
+@pytest.fixture
+def registry(mock_config):
+    default = SimpleNamespace(vad_model="vad", vad_kwargs={}, punc_model="punc", punc_kwargs={})
+    sizes = {"paraformer-en": 30 * MB, "model-yue": 40 * MB}
+    loader = MagicMock(side_effect=lambda name: SimpleNamespace(name=name))
+    with patch("src.asr.registry.model_nbytes", side_effect=lambda m: sizes[m.name]), \
+         patch("src.asr.registry.release_memory"):
+        yield ModelRegistry("paraformer-zh", default, loader)
+
+
+def test_parse_language_models():
+    """Test the mapping spec ignores malformed entries"""
+    assert parse_language_models("en=a, ja = b,,x,=c") == {"en": "a", "ja": "b"}
+
+
+def test_resolve(registry):
+    """Test unmapped and missing languages fall back to the default model"""
+    assert registry.resolve("EN") == "paraformer-en"
+    assert registry.resolve("yue") == "model-yue"
+    assert registry.resolve("zh") == "paraformer-zh"
+    assert registry.resolve(None) == "paraformer-zh"
+
+
+def test_lazy_load_shares_sub_models(registry):
+    """Test extra models load once and reuse the default VAD/punc"""
+    assert registry.for_language("zh") is registry.default_model
+    model = registry.for_language("en")
+    assert registry.for_language("en") is model
+    assert registry.loader.call_count == 1
+    assert (model.vad_model, model.punc_model) == ("vad", "punc")
+    assert registry.resident() == ["paraformer-zh", "paraformer-en"]
+
+
+def test_lru_eviction_under_budget(registry, mock_config):
+    """Test the least recently used model goes when the budget is exceeded"""
+    mock_config.language_models = "en=paraformer-en,yue=model-yue,ja=paraformer-en2"
+    mock_config.model_memory_mb = 75
+    with patch("src.asr.registry.model_nbytes", return_value=30 * MB):
+        registry.get("paraformer-en")
+        registry.get("model-yue")
+        registry.get("paraformer-en")  # yue is now least recently used
+        registry.get("paraformer-en2")
+    assert registry.resident() == ["paraformer-zh", "paraformer-en", "paraformer-en2"]
+    assert registry.stats()["evictions"] == 1
+
+
+def test_new_model_kept_even_over_budget(registry, mock_config):
+    """Test a model larger than the budget is still usable"""
+    mock_config.model_memory_mb = 10
+    registry.get("paraformer-en")
+    assert "paraformer-en" in registry.resident()
@@ -0,0 +1,93 @@
+"""
+Unit tests for the content-hash result cache and in-flight deduplication.
+
+Run: pytest tests/unit/test_result_cache.py -v
+"""
+import fakeredis
+import pytest
+from unittest.mock import patch
+
+from src.utils.redis_client import redis_client
+from src.utils.result_cache import ResultCache, build_cache_key
+
+
+@pytest.fixture
+def cache():
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    with patch.object(redis_client, "_client", fake):
+        yield ResultCache()
+
+
+def test_single_flight_and_cache_hit(cache):
+    """Test duplicates attach to the leader and later uploads hit the cache"""
+    assert cache.lookup_or_claim("k", "t1") == (None, None)
+    assert cache.lookup_or_claim("k", "t2") == (None, "t1")
+
+    waiters = cache.complete("k", "t1", {"task_id": "t1", "status": "done", "text": "hi", "duration": 1.0})
+
+    assert waiters == ["t2"]
+    attached = redis_client.get_task_result("t2")
+    assert attached["status"] == "done"
+    assert attached["text"] == "hi"
+    assert attached["deduplicated_from"] == "t1"
+
+    cached, leader = cache.lookup_or_claim("k", "t3")
+    assert leader is None
+    assert cached["text"] == "hi"
+
+
+def test_failed_leader_is_not_cached(cache):
+    """Test failures are passed to waiters but never cached"""
+    cache.lookup_or_claim("k", "t1")
+    cache.lookup_or_claim("k", "t2")
+    cache.complete("k", "t1", {"status": "failed", "error": "boom"})
+
+    assert redis_client.get_task_result("t2")["status"] == "failed"
+    # Next upload runs the job again as the new leader
+    assert cache.lookup_or_claim("k", "t3") == (None, None)
+
+
+def test_waiter_that_becomes_leader_leaves_the_waiters(cache):
+    """Test a submitter that ends up leading is not answered as its own waiter"""
+    real_pipeline = redis_client.client.pipeline
+
+    def leader_gone():
+        # The previous leader fails between the claim attempt and the attach
+        redis_client.client.delete("asr:inflight:k")
+        return real_pipeline()
+
+    cache.lookup_or_claim("k", "t1")
+    with patch.object(redis_client.client, "pipeline", side_effect=leader_gone):
+        assert cache.lookup_or_claim("k", "t2") == (None, None)
+
+    assert redis_client.client.get("asr:inflight:k") == "t2"
+    assert redis_client.client.lrange("asr:inflight:k:waiters", 0, -1) == []
+
+
+def test_size_eviction(cache):
+    """Test least recently used entries are evicted beyond the limit"""
+    with patch("src.utils.result_cache.config") as mock_config:
+        mock_config.result_cache_ttl_s = 60
+        mock_config.result_cache_max_entries = 2
+        cache.put("a", {"status": "done", "text": "a"})
+        cache.put("b", {"status": "done", "text": "b"})
+        cache.get("a")
+        cache.put("c", {"status": "done", "text": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a")["text"] == "a"
+    assert cache.get("c")["text"] == "c"
+
+
+def test_cache_key_covers_decoding_options():
+    """Test uploads decoded with different options never share a cache entry"""
+    with patch("src.utils.result_cache.hotword_tag", return_value="g-x"), \
+            patch("src.utils.result_cache.config") as mock_config:
+        mock_config.batch_mode = "fixed"
+        mock_config.batch_size = 500
+        mock_config.merge_length_s = 15
+        default = build_cache_key("h", "zh")
+
+        assert build_cache_key("h", "zh", batch_size=500, merge_length_s=15) == default
+        assert build_cache_key("h", "zh", merge_length_s=5) != default
+        assert build_cache_key("h", "zh", batch_size=60) != default
@@ -0,0 +1,52 @@
+"""
+Unit tests for the energy-based silence prefilter.
+
+Run: pytest tests/unit/test_silence.py -v
+"""
+from unittest.mock import patch
+
+import fakeredis
+import numpy as np
+import pytest
+
+from src.asr.silence import frame_energy_db, is_silent, speech_ms
+from src.utils.redis_client import redis_client
+
+
+def tone(seconds: float, amplitude: float, sample_rate: int = 16000) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_frame_energy_db():
+    """Test a full-scale sine is about -3 dBFS and digital silence hits the floor"""
+    db = frame_energy_db(np.concatenate([tone(0.1, 1.0), np.zeros(1600, dtype=np.float32)]), 16000)
+    assert len(db) == 10
+    assert db[:5] == pytest.approx(-3.0, abs=0.2)
+    assert (db[5:] == -120.0).all()
+
+
+def test_dc_offset_is_not_speech():
+    """Test a constant offset carries no energy"""
+    assert speech_ms(np.full(16000, 0.3, dtype=np.float32), 16000, -50) == 0
+
+
+@pytest.mark.parametrize("samples,silent", [
+    (np.zeros(16000, dtype=np.float32), True),
+    (np.array([], dtype=np.float32), True),
+    (tone(1.0, 0.001), True),   # ~-63 dBFS room noise
+    (tone(1.0, 0.1), False),    # ~-23 dBFS speech level
+    (np.concatenate([np.zeros(15200, dtype=np.float32), tone(0.05, 0.1)]), True),  # 50 ms click
+])
+def test_is_silent(samples, silent):
+    """Test silence decisions with explicit thresholds"""
+    assert is_silent(samples, 16000, threshold_db=-50, min_speech_ms=100) is silent
+
+
+def test_silence_skip_counters():
+    """Test skipped chunks accumulate per session"""
+    with patch.object(redis_client, "_client", fakeredis.FakeRedis(decode_responses=True)):
+        redis_client.add_silence_skip("s1", 0.5)
+        redis_client.add_silence_skip("s1", 0.25)
+        assert redis_client.get_silence_stats("s1") == {"chunks": 2, "audio_s": 0.75}
+        assert redis_client.get_silence_stats("s2") == {"chunks": 0, "audio_s": 0.0}
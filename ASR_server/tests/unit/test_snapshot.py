@@ -0,0 +1,76 @@
+"""
+Unit tests for pipeline snapshots
+"""
+import json
+
+import pytest
+import torch
+
+from src.asr.snapshot import (
+    MANIFEST_FILE, PIPELINE_FILE, library_versions, load_snapshot, mismatch, read_manifest, write_snapshot
+)
+
+MODELS = {"asr": "paraformer-zh", "vad": "fsmn-vad", "punc": "ct-punc"}
+
+
+class FakePipeline:
+    """Stands in for a FunASR AutoModel (module-level so it pickles)"""
+
+    def __init__(self):
+        self.model = torch.nn.Linear(4, 2)
+        self.kwargs = {"device": "cpu"}
+        self.vad_model = torch.nn.Linear(2, 1)
+        self.vad_kwargs = {"device": "cpu"}
+        self.stored = 0
+
+    def _store_base_configs(self):
+        self.stored += 1
+
+
+def test_round_trip(tmp_path):
+    pipeline = FakePipeline()
+    manifest = write_snapshot(pipeline, str(tmp_path / "snap"), MODELS, "ms")
+
+    assert manifest["models"] == MODELS
+    assert manifest["hub"] == "ms"
+    assert manifest["bytes"] == (tmp_path / "snap" / PIPELINE_FILE).stat().st_size
+    assert read_manifest(str(tmp_path / "snap")) == manifest
+    assert not list((tmp_path / "snap").glob(".*.tmp"))
+
+    loaded = load_snapshot(str(tmp_path / "snap"))
+    assert isinstance(loaded, FakePipeline)
+    assert torch.equal(loaded.model.weight, pipeline.model.weight)
+    assert loaded.kwargs == {"device": "cpu"}
+    assert loaded.stored == 0
+
+
+def test_mismatch(tmp_path):
+    write_snapshot(FakePipeline(), str(tmp_path), MODELS, "hf")
+    manifest = read_manifest(str(tmp_path))
+
+    assert mismatch(manifest, MODELS) is None
+    assert "no manifest" == mismatch(read_manifest(str(tmp_path / "missing")), MODELS)
+    assert "built for" in mismatch(manifest, {**MODELS, "asr": "paraformer-en"})
+    assert "built with" in mismatch({**manifest, "versions": {"torch": "0.1", "funasr": "0.1"}}, MODELS)
+    assert "format" in mismatch({**manifest, "format": 0}, MODELS)
+
+
+def test_corrupt_manifest(tmp_path):
+    (tmp_path / MANIFEST_FILE).write_text("{not json")
+    assert read_manifest(str(tmp_path)) is None
+
+
+def test_versions_recorded(tmp_path):
+    write_snapshot(FakePipeline(), str(tmp_path), MODELS, "ms")
+    data = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    assert data["versions"] == library_versions()
+    assert data["versions"]["torch"] == torch.__version__
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available")
+def test_load_to_gpu(tmp_path):
+    write_snapshot(FakePipeline(), str(tmp_path), MODELS, "ms")
+    loaded = load_snapshot(str(tmp_path), device="cuda")
+    assert loaded.model.weight.is_cuda
+    assert loaded.kwargs["device"] == "cuda"
+    assert loaded.stored == 1
@@ -0,0 +1,110 @@
+"""
+Unit tests for online streaming recognition.
+
+Run: pytest tests/unit/test_streaming.py -v
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.asr.streaming import StreamingRecognizer, parse_chunk_size, state_nbytes
+
+
+class FakeStreamingModel:
+    """Emits one token per decoded stride and grows the cache like a real model"""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, input, cache, is_final, **kwargs):
+        self.calls.append((len(input), is_final))
+        cache.setdefault("frames", [])
+        cache["frames"].append(np.zeros(len(input), dtype=np.float32))
+        return [{"text": f"w{len(cache['frames'])}"}]
+
+
+@pytest.fixture
+def streaming():
+    with patch("src.asr.streaming.config") as mock_config:
+        mock_config.streaming_chunk_size = "0,10,5"
+        mock_config.streaming_encoder_look_back = 4
+        mock_config.streaming_decoder_look_back = 1
+        mock_config.streaming_session_idle_s = 60
+        mock_config.streaming_cache_mb = 0
+        mock_config.streaming_max_sessions = 0
+        rec = StreamingRecognizer(model=FakeStreamingModel())
+        rec.config = mock_config
+        yield rec
+
+
+def test_parse_chunk_size():
+    """Test chunk size parsing"""
+    assert parse_chunk_size("0,10,5") == [0, 10, 5]
+    with pytest.raises(ValueError):
+        parse_chunk_size("10")
+
+
+def test_state_nbytes():
+    """Test nested cache size estimate"""
+    cache = {"a": np.zeros(10, dtype=np.float32), "b": [np.zeros(4, dtype=np.int16)], "c": "x"}
+    assert state_nbytes(cache) == 48
+
+
+def test_tail_is_buffered_until_next_chunk(streaming):
+    """Test only whole 600 ms strides are decoded and context carries over"""
+    stride = streaming.stride
+    first = streaming.feed("s1", np.zeros(stride + 100, dtype=np.float32))
+    assert first["text"] == "w1"
+    assert len(streaming.sessions["s1"].pending) == 100
+
+    second = streaming.feed("s1", np.zeros(stride - 100, dtype=np.float32))
+    assert second["text"] == "w2"
+    assert second["session_text"] == "w1w2"
+    assert streaming.model.calls == [(stride, False), (stride, False)]
+
+
+def test_final_flushes_and_closes(streaming):
+    """Test is_final decodes buffered audio and drops the session"""
+    streaming.feed("s1", np.zeros(100, dtype=np.float32))
+    result = streaming.feed("s1", np.zeros(100, dtype=np.float32), is_final=True)
+    assert result["text"] == "w1"
+    assert streaming.model.calls == [(200, True)]
+    assert "s1" not in streaming.sessions
+    assert streaming.evictions["closed"] == 1
+
+
+def test_sessions_are_independent(streaming):
+    """Test per-session cache state"""
+    stride = streaming.stride
+    streaming.feed("a", np.zeros(stride, dtype=np.float32))
+    streaming.feed("a", np.zeros(stride, dtype=np.float32))
+    result = streaming.feed("b", np.zeros(stride, dtype=np.float32))
+    assert result["text"] == "w1"
+
+
+def test_idle_sessions_evicted(streaming):
+    """Test sessions without chunks for streaming_session_idle_s are dropped"""
+    streaming.feed("old", np.zeros(10, dtype=np.float32))
+    streaming.sessions["old"].last_used -= 120
+    streaming.feed("new", np.zeros(10, dtype=np.float32))
+    assert list(streaming.sessions) == ["new"]
+    assert streaming.evictions["idle"] == 1
+
+
+def test_memory_cap_evicts_least_recent(streaming):
+    """Test the session and memory caps evict least recently used first"""
+    streaming.config.streaming_max_sessions = 2
+    for sid in ("a", "b", "c"):
+        streaming.feed(sid, np.zeros(streaming.stride, dtype=np.float32))
+    assert list(streaming.sessions) == ["b", "c"]
+    assert streaming.evictions["memory"] == 1
+    assert streaming.stats()["sessions"] == 2
+
+
+def test_decode_error_reported(streaming):
+    """Test model failures come back as an error result"""
+    streaming.model.generate = lambda **kwargs: (_ for _ in ()).throw(RuntimeError("boom"))
+    result = streaming.feed("s1", np.zeros(streaming.stride, dtype=np.float32))
+    assert result["status"] == "failed"
+    assert "boom" in result["error"]
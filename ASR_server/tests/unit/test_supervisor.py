@@ -0,0 +1,148 @@
+"""
+Unit tests for the pre-fork supervisor.
+
+Run: pytest tests/unit/test_supervisor.py -v
+"""
+import json
+import os
+import signal
+import time
+from types import SimpleNamespace
+from unittest.mock import call, patch
+
+import fakeredis
+import pytest
+import torch
+
+from src.utils.redis_client import redis_client
+from src.worker.supervisor import (
+    MAX_BACKOFF_S, MIN_UPTIME_S, ChildState, Supervisor, share_model_memory
+)
+
+
+def test_share_model_memory():
+    """Test torch sub-models are moved to shared memory"""
+    model = SimpleNamespace(
+        model=torch.nn.Linear(4, 4),
+        vad_model=torch.nn.Linear(2, 2),
+        punc_model=None,
+    )
+    
+    moved = share_model_memory(model)
+    
+    assert moved == 2
+    assert all(p.is_shared() for p in model.model.parameters())
+    assert all(p.is_shared() for p in model.vad_model.parameters())
+
+
+def make_supervisor(*children: ChildState) -> Supervisor:
+    supervisor = Supervisor(len(children), "worker", "asr_tasks", "asr_workers")
+    supervisor.children = {c.name: c for c in children}
+    return supervisor
+
+
+def fork_child(exit_code: int = 0, sig: int = 0) -> int:
+    pid = os.fork()
+    if pid == 0:
+        if sig:
+            os.kill(os.getpid(), sig)
+        os._exit(exit_code)
+    return pid
+
+
+def reap_only(*pids):
+    """os.waitpid stand-in that blocks on the given children only, in order"""
+    remaining = list(pids)
+    real_waitpid = os.waitpid
+
+    def waitpid(pid, options):
+        if not remaining:
+            raise ChildProcessError()
+        return real_waitpid(remaining.pop(0), 0)
+    return waitpid
+
+
+def test_reap_classifies_exit_codes_and_signals():
+    """Test exit codes and killing signals are recorded as the last exit"""
+    exited = ChildState("worker-1", pid=fork_child(exit_code=3), started_at=time.time())
+    killed = ChildState("worker-2", pid=fork_child(sig=signal.SIGKILL), started_at=time.time())
+    supervisor = make_supervisor(exited, killed)
+
+    with patch("src.worker.supervisor.os.waitpid", side_effect=reap_only(exited.pid, killed.pid)):
+        supervisor._reap()
+
+    assert exited.last_exit == "exit 3"
+    assert killed.last_exit == f"signal {signal.SIGKILL}"
+    assert exited.pid == killed.pid == 0
+    assert exited.status == killed.status == "restarting"
+
+
+@pytest.mark.parametrize("uptime, restarts, expected_restarts, expected_delay", [
+    (0, 0, 1, 2),                            # crashed right after start
+    (0, 2, 3, 8),                            # keeps crashing: exponential
+    (0, 10, 11, MAX_BACKOFF_S),              # capped
+    (MIN_UPTIME_S, 10, 1, 0),                # ran long enough: start over
+])
+def test_reap_restart_backoff(uptime, restarts, expected_restarts, expected_delay):
+    """Test restarts back off only while a child keeps dying young"""
+    now = time.time()
+    child = ChildState("worker-1", pid=4242, started_at=now - uptime, restarts=restarts)
+    supervisor = make_supervisor(child)
+
+    with patch("src.worker.supervisor.os.waitpid", side_effect=[(4242, 1 << 8), (0, 0)]):
+        supervisor._reap()
+
+    assert child.restarts == expected_restarts
+    assert child.next_start - now == pytest.approx(expected_delay, abs=1)
+    assert child.last_exit == "exit 1"
+
+
+def test_reap_after_shutdown_does_not_restart():
+    """Test children exiting during shutdown are marked stopped"""
+    child = ChildState("worker-1", pid=4242, started_at=time.time())
+    supervisor = make_supervisor(child)
+    supervisor.running = False
+
+    with patch("src.worker.supervisor.os.waitpid", side_effect=[(4242, 0), (0, 0)]):
+        supervisor._reap()
+
+    assert child.status == "stopped"
+    assert child.restarts == 0
+
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    with patch.object(redis_client, "_client", client):
+        yield client
+
+
+def test_stop_escalates_to_sigkill(fake_redis):
+    """Test children ignoring SIGTERM are killed once the timeout passes"""
+    child = ChildState("worker-1", pid=4242, started_at=time.time())
+    supervisor = make_supervisor(child)
+
+    with patch("src.worker.supervisor.os.kill") as kill, \
+            patch("src.worker.supervisor.os.waitpid", return_value=(0, 0)):
+        supervisor.stop(timeout=0)
+
+    assert kill.call_args_list == [call(4242, signal.SIGTERM), call(4242, signal.SIGKILL)]
+    assert child.pid == 0
+    assert child.status == "stopped"
+
+
+def test_status_hash(fake_redis):
+    """Test per-child status is published to asr:supervisor:<id>"""
+    child = ChildState("worker-1", pid=4242, status="running", restarts=2, cores="0-3")
+    supervisor = make_supervisor(child)
+
+    supervisor._publish_status()
+
+    key = f"asr:supervisor:{supervisor.supervisor_id}"
+    assert supervisor.status_key == key
+    status = json.loads(fake_redis.hget(key, "worker-1"))
+    assert status["pid"] == 4242
+    assert status["status"] == "running"
+    assert status["restarts"] == 2
+    assert status["cores"] == "0-3"
+    assert 0 < fake_redis.ttl(key) <= 60